@@ -0,0 +1,152 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config import settings
+
+# Rough chars-per-token ratio for budget estimates; good enough for English/JSON with Llama/Qwen tokenizers.
+CHARS_PER_TOKEN = 4
+# Per-message overhead (role, separators) in the chat template.
+MESSAGE_OVERHEAD_TOKENS = 4
+# Longest tool output kept verbatim for the turn that has not been answered yet (matches the previous cap).
+TOOL_RESULT_CHARS = 800
+# How many identifiers a digest keeps from a list result (ticket ids, asset tags, ...).
+DIGEST_MAX_IDS = 10
+_ID_KEYS = ("id", "ticket_id", "patch_id", "change_request_id", "asset_tag")
+
+
+def estimate_tokens(messages: list[dict[str, Any]]) -> int:
+    chars = 0
+    for m in messages:
+        chars += len(m.get("content") or "")
+        if m.get("tool_calls"):
+            chars += len(json.dumps(m["tool_calls"]))
+    return chars // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+
+def _digest_value(value: Any) -> str:
+    if isinstance(value, list):
+        ids = [str(v.get(k)) for v in value if isinstance(v, dict) for k in _ID_KEYS if k in v][:DIGEST_MAX_IDS]
+        if ids:
+            more = "" if len(value) <= len(ids) else ", ..."
+            return f"[{len(value)}: {', '.join(ids)}{more}]"
+        return f"[{len(value)} items]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{k}={_digest_value(v)}" for k, v in list(value.items())[:6]) + "}"
+    text = str(value)
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+def digest_tool_result(out: Any) -> str:
+    """One-line summary of a run_tool result: status, scalar fields, list sizes and the ids the model may reuse."""
+    if not isinstance(out, dict):
+        return _digest_value(out)
+    if not out.get("success"):
+        return f"error: {_digest_value(out.get('error'))}"
+    if out.get("dry_run"):
+        return "ok (dry run)"
+    result = out.get("result")
+    if isinstance(result, dict):
+        return "ok " + " ".join(f"{k}={_digest_value(v)}" for k, v in result.items())
+    return f"ok {_digest_value(result)}"
+
+
+@dataclass
+class AgentContext:
+    """
+    Conversation state for one agent run. The full history is kept in `history`; `prompt()` builds what is
+    actually sent: system prompt, goal, a rolling progress note, and the most recent turns. Tool outputs of
+    turns the model has already answered are replaced by digests, and the oldest turns are dropped
+    (their outcome lives on in the progress note) until the prompt fits the token budget.
+    """
+
+    system_prompt: str
+    goal: str
+    required_tools: list[str] | None = None
+    token_budget: int = field(default_factory=lambda: settings.agent_context_token_budget)
+    keep_turns: int = field(default_factory=lambda: settings.agent_context_keep_turns)
+    history: list[dict[str, Any]] = field(default_factory=list)
+    completed_tools: list[str] = field(default_factory=list)
+    # Tools whose latest call returned an error; a later successful call moves them to completed_tools.
+    failed_tools: list[str] = field(default_factory=list)
+    artifacts: list[str] = field(default_factory=list)
+    last_results: dict[str, str] = field(default_factory=dict)
+    # Each turn is a list of history indices: an assistant message plus its tool replies, or a user nudge.
+    _turns: list[list[int]] = field(default_factory=list)
+    _digests: dict[int, str] = field(default_factory=dict)
+
+    def add_assistant(self, message: dict[str, Any]) -> None:
+        self._turns.append([len(self.history)])
+        self.history.append(message)
+
+    def add_user(self, content: str) -> None:
+        self._turns.append([len(self.history)])
+        self.history.append({"role": "user", "content": content})
+
+    def add_tool_result(self, tool_call_id: str, tool: str, args: dict[str, Any], out: Any, artifact_paths: list[str]) -> None:
+        index = len(self.history)
+        self._turns[-1].append(index)
+        self.history.append({"role": "tool", "tool_call_id": tool_call_id, "content": str(out)[:TOOL_RESULT_CHARS]})
+        digest = digest_tool_result(out)
+        self._digests[index] = f"[{tool} result, compacted] {digest}"
+        if isinstance(out, dict) and not out.get("success"):
+            if tool not in self.completed_tools and tool not in self.failed_tools:
+                self.failed_tools.append(tool)
+        else:
+            if tool in self.failed_tools:
+                self.failed_tools.remove(tool)
+            if tool not in self.completed_tools:
+                self.completed_tools.append(tool)
+        self.last_results[tool] = digest
+        for path in artifact_paths:
+            if path not in self.artifacts:
+                self.artifacts.append(path)
+
+    def last_assistant_content(self) -> str:
+        if self.history and self.history[-1].get("role") == "assistant":
+            return self.history[-1].get("content") or ""
+        return ""
+
+    def progress_note(self) -> str | None:
+        if not self.completed_tools and not self.failed_tools and not self.artifacts:
+            return None
+        lines = ["Progress so far (older turns are compacted; this note is authoritative):"]
+        lines.append(f"Completed tools: {', '.join(self.completed_tools) or 'none'}.")
+        if self.failed_tools:
+            lines.append(f"Failed tools (returned an error; not completed): {', '.join(self.failed_tools)}.")
+        if self.required_tools:
+            remaining = [t for t in self.required_tools if t not in self.completed_tools]
+            lines.append(f"Required tools still to call (in order): {', '.join(remaining) or 'none'}.")
+        if self.artifacts:
+            lines.append(f"Artifacts: {', '.join(self.artifacts)}.")
+        lines.extend(f"- {tool}: {digest}" for tool, digest in self.last_results.items())
+        return "\n".join(lines)
+
+    def _render_turn(self, turn: list[int], compact: bool) -> list[dict[str, Any]]:
+        rendered = []
+        for i in turn:
+            message = self.history[i]
+            if compact and i in self._digests:
+                message = {**message, "content": self._digests[i]}
+            rendered.append(message)
+        return rendered
+
+    def prompt(self) -> list[dict[str, Any]]:
+        """Messages for the next model call, within token_budget where possible."""
+        head = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.goal},
+        ]
+        note = self.progress_note()
+        # Tool outputs are consumed once the model has replied after them, i.e. every turn but the last.
+        turns = [self._render_turn(t, compact=k < len(self._turns) - 1) for k, t in enumerate(self._turns)]
+        first_kept = 0
+        protected = max(1, self.keep_turns)
+        while first_kept < len(turns) - protected:
+            body = [m for t in turns[first_kept:] for m in t]
+            prefix = head + ([{"role": "system", "content": note}] if note and first_kept else [])
+            if estimate_tokens(prefix + body) <= self.token_budget:
+                break
+            first_kept += 1
+        prefix = head + ([{"role": "system", "content": note}] if note and first_kept else [])
+        return prefix + [m for t in turns[first_kept:] for m in t]
@@ -0,0 +1,114 @@
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+from app.agent.tools import is_read_only_tool, run_tool
+from app.core.config import settings
+from app.db.timing import query_time_ms, query_timing_enabled
+
+# Progress callback for streamed runs: emit(event_type, data). Must be safe to call from worker threads.
+EventSink = Callable[[str, dict[str, Any]], None]
+
+
+def no_events(event_type: str, data: dict[str, Any]) -> None:
+    pass
+
+
+@dataclass
+class ToolCall:
+    id: str
+    name: str
+    args: dict[str, Any] = field(default_factory=dict)
+    # Filled in by execute_tool_calls; db_ms only when query timing is enabled (see app.db.timing).
+    duration_ms: float | None = None
+    db_ms: float | None = None
+
+
+def action_record(call: ToolCall, out: dict[str, Any]) -> dict[str, Any]:
+    """Entry for a run's actions_taken list."""
+    record = {"tool": call.name, "args": call.args, "result": out, "duration_ms": call.duration_ms}
+    if call.db_ms is not None:
+        record["db_ms"] = call.db_ms
+    return record
+
+
+def parse_tool_calls(tool_calls: list[Any]) -> list[ToolCall]:
+    """Normalize OpenAI tool_calls into ToolCall entries; unparseable arguments become {}."""
+    calls: list[ToolCall] = []
+    for tc in tool_calls:
+        name = getattr(tc.function, "name", "") or ""
+        try:
+            args = json.loads(tc.function.arguments) if getattr(tc.function, "arguments", None) else {}
+        except Exception:
+            args = {}
+        calls.append(ToolCall(id=tc.id, name=name, args=args if isinstance(args, dict) else {}))
+    return calls
+
+
+def plan_batches(calls: list[ToolCall]) -> list[list[ToolCall]]:
+    """
+    Split one turn's calls into batches that run in order. Consecutive read-only calls share a batch;
+    each mutating call is its own batch, so it sees every earlier call's effects and none of the later ones.
+    """
+    batches: list[list[ToolCall]] = []
+    current: list[ToolCall] = []
+    for call in calls:
+        if is_read_only_tool(call.name):
+            current.append(call)
+            continue
+        if current:
+            batches.append(current)
+            current = []
+        batches.append([call])
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _timed_run(db: Session, user_id: int | None, call: ToolCall, dry_run: bool) -> dict[str, Any]:
+    start = time.perf_counter()
+    db_start = query_time_ms()
+    out = run_tool(db, user_id, call.name, call.args, dry_run=dry_run)
+    call.duration_ms = (time.perf_counter() - start) * 1000.0
+    if query_timing_enabled():
+        call.db_ms = query_time_ms() - db_start
+    return out
+
+
+def _run_in_own_session(bind: Any, user_id: int | None, call: ToolCall, dry_run: bool) -> dict[str, Any]:
+    with Session(bind=bind) as session:
+        return _timed_run(session, user_id, call, dry_run)
+
+
+def execute_tool_calls(
+    db: Session,
+    user_id: int | None,
+    calls: list[ToolCall],
+    dry_run: bool = True,
+    max_workers: int | None = None,
+) -> list[tuple[ToolCall, dict[str, Any]]]:
+    """
+    Run one turn's tool calls and return (call, result) pairs in the order the model requested them.
+    Read-only batches run on a thread pool, one session per call; mutating calls run on db.
+    """
+    workers = max_workers or settings.agent_tool_workers
+    results: list[tuple[ToolCall, dict[str, Any]]] = []
+    for batch in plan_batches(calls):
+        if len(batch) == 1 or workers <= 1:
+            results.extend((call, _timed_run(db, user_id, call, dry_run)) for call in batch)
+            continue
+        bind = db.get_bind()
+        with ThreadPoolExecutor(max_workers=min(workers, len(batch)), thread_name_prefix="agent-tool") as pool:
+            # Each worker runs in a copy of the caller's context so it logs into the run's audit buffer.
+            futures = [
+                pool.submit(contextvars.copy_context().run, _run_in_own_session, bind, user_id, call, dry_run)
+                for call in batch
+            ]
+            outs = [f.result() for f in futures]
+        results.extend(zip(batch, outs))
+    return results
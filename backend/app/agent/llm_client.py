@@ -1,16 +1,317 @@
-from openai import OpenAI
+import asyncio
+import itertools
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
 
 from app.core.config import settings
 
+# Errors that mean "this server cannot serve the request right now": try another endpoint.
+FAILOVER_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+# Of those, the ones that say the server itself is unreachable; a 5xx or 429 may be about this one request
+# or a brief overload, so it fails over without taking the endpoint out of rotation.
+EJECT_ERRORS = (APIConnectionError, APITimeoutError)
+
+
+class NoHealthyEndpointError(RuntimeError):
+    pass
+
 
-def get_llm_client() -> OpenAI:
-    base_url = settings.ollama_base_url.rstrip("/")
+def _base_url(url: str) -> str:
+    base_url = url.rstrip("/")
     if not base_url.endswith("/v1"):
         base_url = f"{base_url}/v1" if "/v1" not in base_url else base_url
-    return OpenAI(
-        base_url=base_url,
-        api_key="ollama",
-    )
+    return base_url
+
+
+def configured_endpoints() -> list[str]:
+    """LLM_ENDPOINTS (comma-separated OpenAI-compatible base URLs), falling back to OLLAMA_BASE_URL."""
+    urls = [u.strip() for u in settings.llm_endpoints.split(",") if u.strip()]
+    return [_base_url(u) for u in urls or [settings.ollama_base_url]]
+
+
+@dataclass
+class LLMEndpoint:
+    """One OpenAI-compatible server. Its clients are created once and reused, so HTTP connections stay alive."""
+
+    base_url: str
+    max_concurrency: int
+    max_retries: int = 2
+    in_flight: int = 0
+    healthy: bool = True
+    retry_at: float = 0.0
+    failures: int = 0
+    served: int = 0
+    _client: OpenAI | None = field(default=None, repr=False)
+    _async_clients: weakref.WeakKeyDictionary = field(default_factory=weakref.WeakKeyDictionary, repr=False)
+
+    def client(self) -> OpenAI:
+        if self._client is None:
+            self._client = OpenAI(
+                base_url=self.base_url,
+                api_key="ollama",
+                timeout=settings.llm_request_timeout_seconds,
+                max_retries=self.max_retries,
+            )
+        return self._client
+
+    def async_client(self) -> AsyncOpenAI:
+        # httpx async connection pools belong to one event loop; keep one client per loop.
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncOpenAI(
+                base_url=self.base_url,
+                api_key="ollama",
+                timeout=settings.llm_request_timeout_seconds,
+                max_retries=self.max_retries,
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "served": self.served,
+            "failures": self.failures,
+        }
+
+
+class LLMPool:
+    """
+    Process-wide pool of LLM endpoints. Requests are routed least-loaded (default) or round-robin among
+    healthy endpoints with a free concurrency slot; a request that fails with a connection, timeout, 5xx or
+    429 error is retried on the next one. Connection errors and timeouts also mark the endpoint unhealthy,
+    except for the last healthy one, which keeps serving (its client retries with backoff) rather than
+    leaving the pool with nothing. Unhealthy endpoints are probed (GET /models) once their cooldown has
+    passed before taking traffic again.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        max_concurrency: int = 2,
+        routing: str = "least_loaded",
+        cooldown_seconds: float = 30.0,
+        acquire_timeout_seconds: float = 300.0,
+    ) -> None:
+        if routing not in ("least_loaded", "round_robin"):
+            raise ValueError(f"Unknown LLM routing strategy: {routing}")
+        # With a single endpoint there is nothing to fail over to, so let the client retry in place.
+        max_retries = 0 if len(urls) > 1 else 2
+        self.endpoints = [LLMEndpoint(base_url=u, max_concurrency=max_concurrency, max_retries=max_retries) for u in urls]
+        self.routing = routing
+        self.cooldown_seconds = cooldown_seconds
+        self.acquire_timeout_seconds = acquire_timeout_seconds
+        self._cond = threading.Condition()
+        self._rr = itertools.count()
+
+    def _probe(self, endpoint: LLMEndpoint) -> bool:
+        try:
+            return httpx.get(f"{endpoint.base_url}/models", timeout=2.0).status_code < 500
+        except httpx.HTTPError:
+            return False
+
+    def _revive_due(self, now: float) -> None:
+        # Called with the lock released: probing does network I/O.
+        with self._cond:
+            due = [e for e in self.endpoints if not e.healthy and e.retry_at <= now]
+            for e in due:
+                e.retry_at = now + self.cooldown_seconds
+        for e in due:
+            if self._probe(e):
+                with self._cond:
+                    e.healthy = True
+                    self._cond.notify_all()
+
+    def _pick(self, exclude: set[str]) -> LLMEndpoint | None:
+        candidates = [
+            e for e in self.endpoints
+            if e.healthy and e.base_url not in exclude and e.in_flight < e.max_concurrency
+        ]
+        if not candidates:
+            return None
+        if self.routing == "round_robin":
+            return candidates[next(self._rr) % len(candidates)]
+        start = next(self._rr) % len(candidates)
+        rotated = candidates[start:] + candidates[:start]
+        return min(rotated, key=lambda e: e.in_flight / e.max_concurrency)
+
+    def acquire(self, exclude: set[str] | None = None) -> LLMEndpoint:
+        """Reserve a slot on an endpoint, waiting while every healthy endpoint is at its concurrency limit."""
+        exclude = exclude or set()
+        deadline = time.monotonic() + self.acquire_timeout_seconds
+        while True:
+            self._revive_due(time.monotonic())
+            with self._cond:
+                endpoint = self._pick(exclude)
+                if endpoint is not None:
+                    endpoint.in_flight += 1
+                    return endpoint
+                if not any(e.healthy for e in self.endpoints if e.base_url not in exclude):
+                    raise NoHealthyEndpointError("No healthy LLM endpoint available")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise NoHealthyEndpointError("Timed out waiting for a free LLM endpoint slot")
+                self._cond.wait(timeout=min(remaining, 1.0))
+
+    def release(self, endpoint: LLMEndpoint, failed: bool = False, eject: bool = False) -> None:
+        with self._cond:
+            endpoint.in_flight -= 1
+            if failed:
+                endpoint.failures += 1
+                if eject and any(e.healthy for e in self.endpoints if e is not endpoint):
+                    endpoint.healthy = False
+                    endpoint.retry_at = time.monotonic() + self.cooldown_seconds
+            else:
+                endpoint.served += 1
+            self._cond.notify_all()
+
+    def _release_failed(self, endpoint: LLMEndpoint, error: Exception) -> None:
+        self.release(endpoint, failed=True, eject=isinstance(error, EJECT_ERRORS))
+
+    async def _aacquire(self, exclude: set[str]) -> LLMEndpoint:
+        # acquire() may block on the concurrency limit or probe endpoints; keep that off the event loop.
+        # The thread cannot be interrupted, so if the awaiting task is cancelled (client disconnect) the
+        # slot it goes on to reserve is handed back when it arrives.
+        future = asyncio.ensure_future(asyncio.to_thread(self.acquire, exclude))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+
+            def release_orphan(f: asyncio.Future) -> None:
+                if not f.cancelled() and f.exception() is None:
+                    self.release(f.result())
+
+            future.add_done_callback(release_orphan)
+            raise
+
+    def create_chat_completion(self, **kwargs: Any) -> Any:
+        tried: set[str] = set()
+        while True:
+            endpoint = self.acquire(exclude=tried)
+            try:
+                response = endpoint.client().chat.completions.create(**kwargs)
+            except FAILOVER_ERRORS as e:
+                self._release_failed(endpoint, e)
+                tried.add(endpoint.base_url)
+                if len(tried) >= len(self.endpoints):
+                    raise
+                continue
+            except Exception:
+                self.release(endpoint)
+                raise
+            self.release(endpoint)
+            return response
+
+    async def acreate_chat_completion(self, **kwargs: Any) -> Any:
+        tried: set[str] = set()
+        while True:
+            endpoint = await self._aacquire(tried)
+            try:
+                response = await endpoint.async_client().chat.completions.create(**kwargs)
+            except FAILOVER_ERRORS as e:
+                self._release_failed(endpoint, e)
+                tried.add(endpoint.base_url)
+                if len(tried) >= len(self.endpoints):
+                    raise
+                continue
+            except BaseException:
+                self.release(endpoint)
+                raise
+            self.release(endpoint)
+            return response
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._cond:
+            return [e.snapshot() for e in self.endpoints]
+
+
+class _Completions:
+    def __init__(self, pool: LLMPool) -> None:
+        self._pool = pool
+
+    def create(self, **kwargs: Any) -> Any:
+        return self._pool.create_chat_completion(**kwargs)
+
+
+class _AsyncCompletions:
+    def __init__(self, pool: LLMPool) -> None:
+        self._pool = pool
+
+    async def create(self, **kwargs: Any) -> Any:
+        return await self._pool.acreate_chat_completion(**kwargs)
+
+
+class _Chat:
+    def __init__(self, completions: Any) -> None:
+        self.completions = completions
+
+
+class PooledLLMClient:
+    """OpenAI-client-shaped facade: client.chat.completions.create(...) is routed through the pool."""
+
+    def __init__(self, pool: LLMPool) -> None:
+        self.chat = _Chat(_Completions(pool))
+
+    def close(self) -> None:
+        # Connections belong to the pool and are reused by later runs.
+        pass
+
+
+class AsyncPooledLLMClient:
+    def __init__(self, pool: LLMPool) -> None:
+        self.chat = _Chat(_AsyncCompletions(pool))
+
+    async def close(self) -> None:
+        pass
+
+
+_pool: LLMPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_llm_pool() -> LLMPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = LLMPool(
+                configured_endpoints(),
+                max_concurrency=settings.llm_endpoint_max_concurrency,
+                routing=settings.llm_routing,
+                cooldown_seconds=settings.llm_endpoint_cooldown_seconds,
+            )
+        return _pool
+
+
+def reset_llm_pool() -> None:
+    """Drop the process pool so the next request rebuilds it from current settings (benchmarks, tests)."""
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def get_llm_client() -> PooledLLMClient:
+    return PooledLLMClient(get_llm_pool())
+
+
+def get_async_llm_client() -> AsyncPooledLLMClient:
+    return AsyncPooledLLMClient(get_llm_pool())
 
 
 def get_llm_model() -> str:
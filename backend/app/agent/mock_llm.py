@@ -0,0 +1,231 @@
+"""
+Deterministic OpenAI-compatible chat server for benchmarks and tests: it replays a scripted sequence of
+tool-call turns instead of running a model, so orchestrator and tool overhead can be measured without Ollama.
+
+Run standalone:  python -m app.agent.mock_llm --port 11500 --latency-ms 200
+then point the backend at it with LLM_ENDPOINTS=http://localhost:11500/v1
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from app.agent.context import CHARS_PER_TOKEN
+
+_CALL_ID = re.compile(r"^mock-(\d+)-\d+$")
+
+
+@dataclass(frozen=True)
+class FromResult:
+    """Argument taken from the previous turn's result of `tool`: every regex match fans out into its own call."""
+
+    tool: str
+    pattern: str
+    cast: type = str
+
+
+@dataclass(frozen=True)
+class ScriptedCall:
+    tool: str
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+# The daily_ops preset as a model would ideally drive it: independent reads batched into one turn, fan-out
+# over their results in the next. refresh_public_dataset is left out because it downloads over the network.
+DAILY_OPS_SCRIPT: list[list[ScriptedCall]] = [
+    [
+        ScriptedCall("get_case_metrics"),
+        ScriptedCall("triage_tickets"),
+        ScriptedCall("sla_sweep"),
+        ScriptedCall("inventory_compliance_check"),
+    ],
+    [
+        ScriptedCall("resolve_ticket", {"ticket_id": FromResult("triage_tickets", r"'id': (\d+)", int)}),
+        ScriptedCall("escalate_overdue_tickets"),
+        ScriptedCall(
+            "create_patch_record",
+            {
+                "title": "Remediate out-of-compliance device",
+                "patch_type": "device",
+                "device_asset_tag": FromResult("inventory_compliance_check", r"'asset_tag': '([^']+)'"),
+            },
+        ),
+    ],
+    [
+        ScriptedCall("generate_monthly_operations_report"),
+        ScriptedCall("generate_revenue_at_risk_report"),
+        ScriptedCall("generate_audit_report"),
+        ScriptedCall("generate_custom_query_csv", {"entity": "cases"}),
+        ScriptedCall(
+            "create_change_request",
+            {
+                "title": "New ordinance requires new disposition code",
+                "requested_by": "Court Manager",
+                "current_process": "Manual disposition codes in legacy system",
+                "proposed_change": "Add new disposition code to case management for ordinance compliance.",
+            },
+        ),
+    ],
+    [
+        ScriptedCall(
+            "generate_change_request_docs",
+            {"change_request_id": FromResult("create_change_request", r"'change_request_id': (\d+)", int)},
+        ),
+    ],
+]
+
+SCRIPTS = {"daily_ops": DAILY_OPS_SCRIPT}
+
+
+def script_tools(script: list[list[ScriptedCall]]) -> list[str]:
+    return list(dict.fromkeys(c.tool for turn in script for c in turn))
+
+
+def _last_step(messages: list[dict[str, Any]]) -> int:
+    for m in reversed(messages):
+        for tc in m.get("tool_calls") or []:
+            match = _CALL_ID.match(tc.get("id", ""))
+            if match:
+                return int(match.group(1))
+    return -1
+
+
+def _previous_results(messages: list[dict[str, Any]], step: int) -> dict[str, list[str]]:
+    """Tool name -> raw result contents of the turn `step` (the turn just before the one being generated)."""
+    names: dict[str, str] = {}
+    for m in messages:
+        for tc in m.get("tool_calls") or []:
+            if tc.get("id", "").startswith(f"mock-{step}-"):
+                names[tc["id"]] = tc["function"]["name"]
+    results: dict[str, list[str]] = {}
+    for m in messages:
+        if m.get("role") == "tool" and m.get("tool_call_id") in names:
+            results.setdefault(names[m["tool_call_id"]], []).append(m.get("content") or "")
+    return results
+
+
+def _expand(call: ScriptedCall, previous: dict[str, list[str]]) -> list[dict[str, Any]]:
+    fan_out = {k: v for k, v in call.args.items() if isinstance(v, FromResult)}
+    if not fan_out:
+        return [dict(call.args)]
+    key, source = next(iter(fan_out.items()))
+    values = [source.cast(v) for text in previous.get(source.tool, []) for v in re.findall(source.pattern, text)]
+    return [{**call.args, key: v} for v in values]
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        script: list[list[ScriptedCall]] | None = None,
+        latency_ms: float = 0.0,
+        model: str = "mock-llm",
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.script = DAILY_OPS_SCRIPT if script is None else script
+        self.latency_ms = latency_ms
+        self.model = model
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def start(self) -> "MockLLMServer":
+        threading.Thread(target=self.serve_forever, name="mock-llm", daemon=True).start()
+        return self
+
+    def complete(self, body: dict[str, Any]) -> dict[str, Any]:
+        messages = body.get("messages") or []
+        step = _last_step(messages) + 1
+        message: dict[str, Any] = {"role": "assistant", "content": ""}
+        if step < len(self.script):
+            previous = _previous_results(messages, step - 1)
+            args_list = [(c.tool, args) for c in self.script[step] for args in _expand(c, previous)]
+            message["tool_calls"] = [
+                {"id": f"mock-{step}-{k}", "type": "function", "function": {"name": tool, "arguments": json.dumps(args)}}
+                for k, (tool, args) in enumerate(args_list)
+            ]
+            finish_reason = "tool_calls"
+        else:
+            message["content"] = f"Mock run complete after {len(self.script)} scripted turn(s)."
+            finish_reason = "stop"
+        prompt_tokens = len(json.dumps(messages)) // CHARS_PER_TOKEN
+        completion_tokens = len(json.dumps(message)) // CHARS_PER_TOKEN
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+        return {
+            "id": f"chatcmpl-mock-{step}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or self.model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: MockLLMServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": self.server.model, "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000.0)
+        self._send_json(200, self.server.complete(body))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deterministic OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--script", choices=sorted(SCRIPTS), default="daily_ops")
+    args = parser.parse_args()
+    server = MockLLMServer((args.host, args.port), script=SCRIPTS[args.script], latency_ms=args.latency_ms)
+    print(f"Mock LLM listening on {server.base_url} (script={args.script}, latency={args.latency_ms}ms)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
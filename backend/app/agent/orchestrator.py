@@ -1,16 +1,20 @@
-import json
-from typing import Any
+import asyncio
+from typing import Any, Callable
 
 from sqlalchemy.orm import Session
 
-from app.agent.llm_client import get_llm_client, get_llm_model
-from app.agent.tools import OPENAI_TOOLS, run_tool
+from app.agent.context import AgentContext
+from app.agent.llm_client import get_async_llm_client, get_llm_client, get_llm_model
+from app.agent.executor import EventSink, ToolCall, action_record, execute_tool_calls, no_events, parse_tool_calls
+from app.agent.plans import artifact_paths_from_result
+from app.agent.tools import OPENAI_TOOLS, READ_ONLY_TOOLS
+from app.services.audit_log import buffered_audit
 
-SYSTEM_PROMPT = """You are the CourtOps Analyst Agent. You execute Municipal Court functional analyst duties using ONLY the tools provided.
+SYSTEM_PROMPT = f"""You are the CourtOps Analyst Agent. You execute Municipal Court functional analyst duties using ONLY the tools provided.
 
 RULES:
 - Only call the tools you are given. Do not assume or invent data.
-- Call one tool at a time. Wait for the result before deciding the next step.
+- Read-only tools ({", ".join(sorted(READ_ONLY_TOOLS))}) may be called together in one turn; they run in parallel. Call any other tool only after you have the results it depends on (e.g. create_change_request before generate_change_request_docs).
 - Be audit-friendly: your actions are logged. Prefer clear, deterministic tool use.
 - If a tool fails, report the error and continue with the next logical step when appropriate.
 - When the user asks for a "daily ops demo" or preset, follow the exact sequence: refresh public dataset, triage and resolve access tickets, SLA sweep and escalate, inventory compliance check, create patch records for out-of-compliance assets, generate monthly operations report, generate revenue at risk report, generate audit report, create a change request and generate its docs. Do not skip generate_monthly_operations_report or generate_change_request_docs. Complete all steps before giving your final summary; do not stop after escalation.
@@ -19,6 +23,56 @@ RULES:
 MAX_TURNS = 45
 
 
+def _assistant_message(msg: Any) -> dict[str, Any]:
+    assistant_msg: dict[str, Any] = {"role": "assistant", "content": msg.content or ""}
+    if getattr(msg, "tool_calls", None):
+        assistant_msg["tool_calls"] = [
+            {"id": tc.id, "type": "function", "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
+            for tc in msg.tool_calls
+        ]
+    return assistant_msg
+
+
+def _completion_nudge(require_completion_tools: list[str] | None, actions_taken: list[dict[str, Any]]) -> str | None:
+    if not require_completion_tools:
+        return None
+    called = {a["tool"] for a in actions_taken}
+    missing = [t for t in require_completion_tools if t not in called]
+    if not missing:
+        return None
+    return f"You have not completed all required steps. The following tools must still be called (in order): {', '.join(missing)}. Call the next required tool now. Do not provide a final summary until all are done."
+
+
+def _record_tool_results(
+    results: list[tuple[ToolCall, dict[str, Any]]],
+    context: AgentContext,
+    actions_taken: list[dict[str, Any]],
+    artifact_paths: list[str],
+    emit: EventSink = no_events,
+) -> None:
+    for call, out in results:
+        actions_taken.append(action_record(call, out))
+        emit("tool_result", {"tool_call_id": call.id, "tool": call.name, "result": out})
+        paths = artifact_paths_from_result(out)
+        for path in paths:
+            artifact_paths.append(path)
+            emit("artifact", {"path": path})
+        context.add_tool_result(call.id, call.name, call.args, out, paths)
+
+
+def _run_result(context: AgentContext, actions_taken: list[dict[str, Any]], artifact_paths: list[str], dry_run: bool) -> dict[str, Any]:
+    summary = context.last_assistant_content()
+    if not summary and actions_taken:
+        summary = f"Completed {len(actions_taken)} tool call(s). See actions_taken for details."
+
+    return {
+        "summary": summary,
+        "actions_taken": actions_taken,
+        "artifact_paths": list(dict.fromkeys(artifact_paths)),
+        "dry_run": dry_run,
+    }
+
+
 def run_agent(
     db: Session,
     user_id: int | None,
@@ -29,75 +83,85 @@ def run_agent(
 ) -> dict[str, Any]:
     client = get_llm_client()
     model = get_llm_model()
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": goal},
-    ]
+    context = AgentContext(SYSTEM_PROMPT, goal, required_tools=require_completion_tools)
     actions_taken: list[dict[str, Any]] = []
     artifact_paths: list[str] = []
 
-    for turn in range(MAX_TURNS):
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            tools=OPENAI_TOOLS,
-            tool_choice="auto",
-        )
-        choice = response.choices[0]
-        if not choice.message.content and not choice.message.tool_calls:
-            break
-        msg = choice.message
-        assistant_msg: dict[str, Any] = {"role": "assistant", "content": msg.content or ""}
-        if getattr(msg, "tool_calls", None):
-            assistant_msg["tool_calls"] = [
-                {"id": tc.id, "type": "function", "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
-                for tc in msg.tool_calls
-            ]
-        messages.append(assistant_msg)
-        if not getattr(msg, "tool_calls", None):
-            if require_completion_tools:
-                called = {a["tool"] for a in actions_taken}
-                missing = [t for t in require_completion_tools if t not in called]
-                if missing:
-                    messages.append({
-                        "role": "user",
-                        "content": f"You have not completed all required steps. The following tools must still be called (in order): {', '.join(missing)}. Call the next required tool now. Do not provide a final summary until all are done.",
-                    })
+    with buffered_audit(db.get_bind()):
+        for turn in range(MAX_TURNS):
+            response = client.chat.completions.create(
+                model=model,
+                messages=context.prompt(),
+                tools=OPENAI_TOOLS,
+                tool_choice="auto",
+            )
+            msg = response.choices[0].message
+            if not msg.content and not msg.tool_calls:
+                break
+            context.add_assistant(_assistant_message(msg))
+            if not getattr(msg, "tool_calls", None):
+                nudge = _completion_nudge(require_completion_tools, actions_taken)
+                if nudge:
+                    context.add_user(nudge)
                     continue
-            break
-
-        for tc in msg.tool_calls:
-            name = tc.function.name if hasattr(tc.function, "name") else getattr(tc.function, "name", "")
-            try:
-                args = json.loads(tc.function.arguments) if getattr(tc.function, "arguments", None) else {}
-            except Exception:
-                args = {}
-            out = run_tool(db, user_id, name, args, dry_run=dry_run)
-            result_str = str(out)[:800]
-            actions_taken.append({"tool": name, "args": args, "result": out})
-
-            if isinstance(out, dict):
-                p = out.get("path") or out.get("paths")
-                if isinstance(p, str) and (p.startswith("reports/") or "generated" in p):
-                    artifact_paths.append(p)
-                elif isinstance(p, list):
-                    artifact_paths.extend([x for x in p if isinstance(x, str)])
-
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tc.id,
-                "content": result_str,
-            })
-
-    summary = ""
-    if messages and messages[-1].get("role") == "assistant" and messages[-1].get("content"):
-        summary = messages[-1]["content"]
-    elif actions_taken:
-        summary = f"Completed {len(actions_taken)} tool call(s). See actions_taken for details."
+                break
 
-    return {
-        "summary": summary,
-        "actions_taken": actions_taken,
-        "artifact_paths": list(dict.fromkeys(artifact_paths)),
-        "dry_run": dry_run,
-    }
+            results = execute_tool_calls(db, user_id, parse_tool_calls(msg.tool_calls), dry_run=dry_run)
+            _record_tool_results(results, context, actions_taken, artifact_paths)
+
+    return _run_result(context, actions_taken, artifact_paths, dry_run)
+
+
+async def run_agent_async(
+    session_factory: Callable[[], Session],
+    user_id: int | None,
+    goal: str,
+    dry_run: bool = True,
+    require_completion_tools: list[str] | None = None,
+    emit: EventSink = no_events,
+) -> dict[str, Any]:
+    """
+    Same loop as run_agent, on the async OpenAI client. Tool batches run in a worker thread on a session
+    owned by this run, so the event loop stays free while the model or the database is busy.
+    Each assistant message, tool call, tool result and artifact path is reported through emit.
+    """
+    client = get_async_llm_client()
+    model = get_llm_model()
+    context = AgentContext(SYSTEM_PROMPT, goal, required_tools=require_completion_tools)
+    actions_taken: list[dict[str, Any]] = []
+    artifact_paths: list[str] = []
+    db = session_factory()
+    try:
+        with buffered_audit(db.get_bind()) as audit:
+            for turn in range(MAX_TURNS):
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=context.prompt(),
+                    tools=OPENAI_TOOLS,
+                    tool_choice="auto",
+                )
+                msg = response.choices[0].message
+                if not msg.content and not msg.tool_calls:
+                    break
+                context.add_assistant(_assistant_message(msg))
+                if msg.content:
+                    emit("message", {"turn": turn, "content": msg.content})
+                if not getattr(msg, "tool_calls", None):
+                    nudge = _completion_nudge(require_completion_tools, actions_taken)
+                    if nudge:
+                        context.add_user(nudge)
+                        continue
+                    break
+
+                calls = parse_tool_calls(msg.tool_calls)
+                for call in calls:
+                    emit("tool_call", {"tool_call_id": call.id, "tool": call.name, "args": call.args})
+                results = await asyncio.to_thread(execute_tool_calls, db, user_id, calls, dry_run)
+                _record_tool_results(results, context, actions_taken, artifact_paths, emit)
+            # Write the run's audit rows off the event loop; the block exit then has nothing left to flush.
+            await asyncio.to_thread(audit.flush)
+    finally:
+        await asyncio.to_thread(db.close)
+        await client.close()
+
+    return _run_result(context, actions_taken, artifact_paths, dry_run)
@@ -0,0 +1,312 @@
+"""
+Compiled presets ("plan mode"): a preset is a DAG of run_tool calls executed directly, without an LLM
+round trip per step. A step may fan out into one call per upstream result (e.g. one create_patch_record
+per out-of-compliance device). The LLM is only asked for the closing summary.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+from app.agent.executor import EventSink, ToolCall, action_record, execute_tool_calls, no_events
+from app.agent.llm_client import get_async_llm_client, get_llm_client, get_llm_model
+from app.agent.tools import is_read_only_tool
+from app.services.audit_log import buffered_audit
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on calls produced by a single fan-out step, mirroring the "as practical" limit of the LLM presets.
+MAX_FAN_OUT = 50
+
+ArgsFn = Callable[["PlanContext"], list[dict[str, Any]]]
+
+
+@dataclass
+class PlanStep:
+    id: str
+    tool: str
+    args: dict[str, Any] | ArgsFn = field(default_factory=dict)
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass
+class PlanContext:
+    today: date
+    results: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+
+    def result(self, step_id: str) -> dict[str, Any]:
+        """Payload of the first successful call of a step, or {} if it failed, was skipped or was a dry run."""
+        for out in self.results.get(step_id, []):
+            if out.get("success") and isinstance(out.get("result"), dict):
+                return out["result"]
+        return {}
+
+    def all_results(self, step_id: str) -> list[dict[str, Any]]:
+        return [
+            out["result"]
+            for out in self.results.get(step_id, [])
+            if out.get("success") and isinstance(out.get("result"), dict)
+        ]
+
+
+def plan_levels(steps: list[PlanStep]) -> list[list[PlanStep]]:
+    """Topological levels of the DAG. Within a level, read-only steps come first, then declaration order."""
+    by_id = {s.id: s for s in steps}
+    for s in steps:
+        unknown = [d for d in s.depends_on if d not in by_id]
+        if unknown:
+            raise ValueError(f"Step {s.id} depends on unknown step(s): {', '.join(unknown)}")
+    done: set[str] = set()
+    remaining = list(steps)
+    levels: list[list[PlanStep]] = []
+    while remaining:
+        ready = [s for s in remaining if all(d in done for d in s.depends_on)]
+        if not ready:
+            raise ValueError(f"Plan has a dependency cycle among: {', '.join(s.id for s in remaining)}")
+        ready.sort(key=lambda s: not is_read_only_tool(s.tool))
+        levels.append(ready)
+        done.update(s.id for s in ready)
+        remaining = [s for s in remaining if s.id not in done]
+    return levels
+
+
+def _step_args(step: PlanStep, ctx: PlanContext) -> list[dict[str, Any]]:
+    if callable(step.args):
+        return step.args(ctx)[:MAX_FAN_OUT]
+    return [dict(step.args)]
+
+
+def artifact_paths_from_result(out: Any) -> list[str]:
+    """Report and generated-doc paths returned by a tool call."""
+    if not isinstance(out, dict):
+        return []
+    payload = out.get("result") if isinstance(out.get("result"), dict) else out
+    p = payload.get("path") or payload.get("paths")
+    if isinstance(p, str) and (p.startswith("reports/") or "generated" in p):
+        return [p]
+    if isinstance(p, list):
+        return [x for x in p if isinstance(x, str)]
+    return []
+
+
+def run_plan(
+    db: Session,
+    user_id: int | None,
+    steps: list[PlanStep],
+    dry_run: bool = True,
+    today: date | None = None,
+    emit: EventSink = no_events,
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """Execute a plan level by level. Returns (actions_taken, artifact_paths) in execution order."""
+    ctx = PlanContext(today=today or date.today())
+    actions_taken: list[dict[str, Any]] = []
+    artifact_paths: list[str] = []
+    with buffered_audit(db.get_bind()):
+        for level in plan_levels(steps):
+            calls: list[ToolCall] = []
+            owners: list[str] = []
+            for step in level:
+                ctx.results[step.id] = []
+                for i, args in enumerate(_step_args(step, ctx)):
+                    calls.append(ToolCall(id=f"{step.id}:{i}", name=step.tool, args=args))
+                    owners.append(step.id)
+            for call in calls:
+                emit("tool_call", {"tool_call_id": call.id, "tool": call.name, "args": call.args})
+            for step_id, (call, out) in zip(owners, execute_tool_calls(db, user_id, calls, dry_run=dry_run)):
+                ctx.results[step_id].append(out)
+                actions_taken.append(action_record(call, out))
+                emit("tool_result", {"tool_call_id": call.id, "tool": call.name, "result": out})
+                for path in artifact_paths_from_result(out):
+                    artifact_paths.append(path)
+                    emit("artifact", {"path": path})
+    return actions_taken, list(dict.fromkeys(artifact_paths))
+
+
+def _resolve_access_tickets(ctx: PlanContext) -> list[dict[str, Any]]:
+    return [{"ticket_id": t["id"]} for t in ctx.result("triage").get("access_issues", [])]
+
+
+def _patch_non_compliant_devices(ctx: PlanContext) -> list[dict[str, Any]]:
+    return [
+        {
+            "title": f"Remediate {d['asset_tag']} ({d['reason'].replace('_', ' ')})",
+            "patch_type": "device",
+            "device_asset_tag": d["asset_tag"],
+        }
+        for d in ctx.result("inventory").get("devices", [])
+    ]
+
+
+def _schedule_first_patch(ctx: PlanContext) -> list[dict[str, Any]]:
+    created = ctx.all_results("create_patches")
+    return [{"patch_id": created[0]["patch_id"], "status": "scheduled"}] if created else []
+
+
+def _change_request_docs(ctx: PlanContext) -> list[dict[str, Any]]:
+    crid = ctx.result("change_request").get("change_request_id")
+    return [{"change_request_id": crid}] if crid else []
+
+
+def _period(ctx: PlanContext) -> list[dict[str, Any]]:
+    return [{"period": ctx.today.strftime("%Y-%m")}]
+
+
+CHANGE_REQUEST_ARGS = {
+    "title": "New ordinance requires new disposition code",
+    "requested_by": "Court Manager",
+    "current_process": "Manual disposition codes in legacy system",
+    "proposed_change": "Add new disposition code to case management for ordinance compliance.",
+}
+
+_TICKET_WORK = ("resolve_access", "escalate")
+_REPORT_INPUTS = ("refresh", *_TICKET_WORK, "create_patches")
+
+DAILY_OPS_DEMO_PLAN = [
+    PlanStep("refresh", "refresh_public_dataset", {"source_id": "somerville"}),
+    PlanStep("triage", "triage_tickets"),
+    PlanStep("sla", "sla_sweep"),
+    PlanStep("inventory", "inventory_compliance_check"),
+    PlanStep("resolve_access", "resolve_ticket", _resolve_access_tickets, ("triage",)),
+    PlanStep("escalate", "escalate_overdue_tickets", depends_on=("sla",)),
+    PlanStep("create_patches", "create_patch_record", _patch_non_compliant_devices, ("inventory",)),
+    PlanStep("monthly_report", "generate_monthly_operations_report", _period, _REPORT_INPUTS),
+    PlanStep("revenue_report", "generate_revenue_at_risk_report", _period, _REPORT_INPUTS),
+    PlanStep("audit_report", "generate_audit_report", _period, ("monthly_report", "revenue_report")),
+    PlanStep("change_request", "create_change_request", CHANGE_REQUEST_ARGS, ("audit_report",)),
+    PlanStep("change_request_docs", "generate_change_request_docs", _change_request_docs, ("change_request",)),
+]
+
+DAILY_OPS_ROBUST_PLAN = [
+    PlanStep("refresh", "refresh_public_dataset", {"source_id": "somerville"}),
+    PlanStep("case_metrics", "get_case_metrics"),
+    PlanStep("triage", "triage_tickets"),
+    PlanStep("sla", "sla_sweep"),
+    PlanStep("inventory", "inventory_compliance_check"),
+    PlanStep("resolve_access", "resolve_ticket", _resolve_access_tickets, ("triage",)),
+    PlanStep("escalate", "escalate_overdue_tickets", depends_on=("sla",)),
+    PlanStep("create_patches", "create_patch_record", _patch_non_compliant_devices, ("inventory",)),
+    PlanStep("schedule_patch", "mark_patch_status", _schedule_first_patch, ("create_patches",)),
+    PlanStep("monthly_report", "generate_monthly_operations_report", _period, _REPORT_INPUTS),
+    PlanStep("revenue_report", "generate_revenue_at_risk_report", _period, _REPORT_INPUTS),
+    PlanStep("custom_query", "generate_custom_query_csv", {"entity": "cases"}, _REPORT_INPUTS),
+    PlanStep(
+        "audit_report",
+        "generate_audit_report",
+        _period,
+        ("monthly_report", "revenue_report", "custom_query", "schedule_patch"),
+    ),
+    PlanStep(
+        "change_request",
+        "create_change_request",
+        {
+            **CHANGE_REQUEST_ARGS,
+            "impact_users": "Clerks and judges selecting dispositions",
+            "impact_data": "New disposition code value on case records",
+            "impact_security": "No change to access roles",
+        },
+        ("audit_report",),
+    ),
+    PlanStep("change_request_docs", "generate_change_request_docs", _change_request_docs, ("change_request",)),
+]
+
+PRESET_PLANS: dict[str, list[PlanStep]] = {
+    "daily_ops_demo": DAILY_OPS_DEMO_PLAN,
+    "daily_ops_robust": DAILY_OPS_ROBUST_PLAN,
+}
+
+SUMMARY_PROMPT = """You are the CourtOps Analyst Agent. The preset below has already been executed; the tool results are final.
+Write a brief summary of what was accomplished, list the artifact paths (reports/..., docs/generated/...), and end with recommended next steps.
+Do not invent results that are not in the tool log."""
+
+
+def _fallback_summary(preset: str, actions_taken: list[dict[str, Any]], artifact_paths: list[str]) -> str:
+    failed = [a["tool"] for a in actions_taken if not a["result"].get("success")]
+    lines = [f"Preset {preset} completed {len(actions_taken)} tool call(s) in plan mode."]
+    if failed:
+        lines.append(f"Failed: {', '.join(dict.fromkeys(failed))}.")
+    if artifact_paths:
+        lines.append(f"Artifacts: {', '.join(artifact_paths)}.")
+    return " ".join(lines)
+
+
+def _summary_messages(preset: str, actions_taken: list[dict[str, Any]], artifact_paths: list[str]) -> list[dict[str, str]]:
+    log = [{"tool": a["tool"], "args": a["args"], "result": str(a["result"])[:300]} for a in actions_taken]
+    return [
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {"role": "user", "content": json.dumps({"preset": preset, "tool_log": log, "artifact_paths": artifact_paths}, default=str)},
+    ]
+
+
+def summarize_plan_run(preset: str, actions_taken: list[dict[str, Any]], artifact_paths: list[str]) -> str:
+    """Single LLM call for the closing summary; falls back to a deterministic summary if the LLM is unavailable."""
+    try:
+        response = get_llm_client().chat.completions.create(
+            model=get_llm_model(),
+            messages=_summary_messages(preset, actions_taken, artifact_paths),
+        )
+        content = response.choices[0].message.content
+        if content:
+            return content
+    except Exception as e:
+        logger.warning("Plan summary LLM call failed for %s; using the fallback summary: %s", preset, e)
+    return _fallback_summary(preset, actions_taken, artifact_paths)
+
+
+async def summarize_plan_run_async(preset: str, actions_taken: list[dict[str, Any]], artifact_paths: list[str]) -> str:
+    client = get_async_llm_client()
+    try:
+        response = await client.chat.completions.create(
+            model=get_llm_model(),
+            messages=_summary_messages(preset, actions_taken, artifact_paths),
+        )
+        content = response.choices[0].message.content
+        if content:
+            return content
+    except Exception as e:
+        logger.warning("Plan summary LLM call failed for %s; using the fallback summary: %s", preset, e)
+    finally:
+        await client.close()
+    return _fallback_summary(preset, actions_taken, artifact_paths)
+
+
+def run_preset_plan(
+    db: Session,
+    user_id: int | None,
+    preset: str,
+    dry_run: bool = True,
+) -> dict[str, Any]:
+    """Run a compiled preset and return the same shape as run_agent."""
+    actions_taken, artifact_paths = run_plan(db, user_id, PRESET_PLANS[preset], dry_run=dry_run)
+    return {
+        "summary": summarize_plan_run(preset, actions_taken, artifact_paths),
+        "actions_taken": actions_taken,
+        "artifact_paths": artifact_paths,
+        "dry_run": dry_run,
+    }
+
+
+async def run_preset_plan_async(
+    session_factory: Callable[[], Session],
+    user_id: int | None,
+    preset: str,
+    dry_run: bool = True,
+    emit: EventSink = no_events,
+) -> dict[str, Any]:
+    """run_preset_plan for streamed runs: the plan runs in a worker thread, the summary on the async client."""
+
+    def run_in_thread() -> tuple[list[dict[str, Any]], list[str]]:
+        with session_factory() as db:
+            return run_plan(db, user_id, PRESET_PLANS[preset], dry_run=dry_run, emit=emit)
+
+    actions_taken, artifact_paths = await asyncio.to_thread(run_in_thread)
+    return {
+        "summary": await summarize_plan_run_async(preset, actions_taken, artifact_paths),
+        "actions_taken": actions_taken,
+        "artifact_paths": artifact_paths,
+        "dry_run": dry_run,
+    }
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+# Finished runs kept in memory for late subscribers and status polling; oldest are evicted first.
+MAX_FINISHED_RUNS = 100
+
+TERMINAL_EVENTS = ("run_completed", "run_failed")
+
+
+@dataclass
+class AgentRun:
+    """One background agent run and its ordered event log. emit() may be called from any thread."""
+
+    id: str
+    user_id: int | None
+    preset: str | None
+    execution: str
+    dry_run: bool
+    status: str = "queued"
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: datetime | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    events: list[dict[str, Any]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _loop: asyncio.AbstractEventLoop | None = field(default=None, repr=False)
+    _changed: asyncio.Event | None = field(default=None, repr=False)
+    _task: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def emit(self, event_type: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self.events.append({"id": len(self.events), "event": event_type, "data": data})
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self) -> None:
+        # Wake every current subscriber; later waiters get a fresh Event.
+        if self._changed is not None:
+            self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def stream(self, after: int = -1) -> AsyncIterator[dict[str, Any]]:
+        """Yield events with id > after, then follow the log until the run finishes."""
+        next_id = after + 1
+        while True:
+            changed = self._changed
+            with self._lock:
+                pending = self.events[next_id:]
+            for event in pending:
+                yield event
+            next_id += len(pending)
+            if pending and pending[-1]["event"] in TERMINAL_EVENTS:
+                return
+            if self.finished and next_id >= len(self.events):
+                return
+            if changed is None:
+                return
+            await changed.wait()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "run_id": self.id,
+            "status": self.status,
+            "preset": self.preset,
+            "execution": self.execution,
+            "dry_run": self.dry_run,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "event_count": len(self.events),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class AgentRunRegistry:
+    """In-process registry of agent runs. Runs execute as asyncio tasks on the server's event loop."""
+
+    def __init__(self, max_finished: int = MAX_FINISHED_RUNS) -> None:
+        self.max_finished = max_finished
+        self._runs: dict[str, AgentRun] = {}
+
+    def get(self, run_id: str) -> AgentRun | None:
+        return self._runs.get(run_id)
+
+    def start(
+        self,
+        job: Callable[[AgentRun], Awaitable[dict[str, Any]]],
+        user_id: int | None,
+        preset: str | None,
+        execution: str,
+        dry_run: bool,
+    ) -> AgentRun:
+        """Register a run and schedule job(run) on the running loop. Must be called from the event loop."""
+        loop = asyncio.get_running_loop()
+        run = AgentRun(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            preset=preset,
+            execution=execution,
+            dry_run=dry_run,
+            _loop=loop,
+            _changed=asyncio.Event(),
+        )
+        self._runs[run.id] = run
+        self._prune()
+        run._task = loop.create_task(self._execute(run, job))
+        return run
+
+    async def _execute(self, run: AgentRun, job: Callable[[AgentRun], Awaitable[dict[str, Any]]]) -> None:
+        run.status = "running"
+        run.emit("run_started", {"run_id": run.id, "preset": run.preset, "execution": run.execution, "dry_run": run.dry_run})
+        try:
+            run.result = await job(run)
+            run.status = "succeeded"
+            run.finished_at = datetime.utcnow()
+            run.emit("run_completed", run.result)
+        except Exception as e:
+            run.error = str(e)[:500]
+            run.status = "failed"
+            run.finished_at = datetime.utcnow()
+            run.emit("run_failed", {"error": run.error})
+
+    def _prune(self) -> None:
+        finished = sorted((r for r in self._runs.values() if r.finished), key=lambda r: r.finished_at)
+        for run in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._runs[run.id]
+
+
+def format_sse(event: dict[str, Any]) -> str:
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+agent_runs = AgentRunRegistry()
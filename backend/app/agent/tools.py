@@ -1,12 +1,17 @@
-import csv
-from collections import defaultdict
+import asyncio
+import copy
+import threading
+import time
+from collections import OrderedDict
 from datetime import date, datetime, timedelta
-from io import StringIO
 from pathlib import Path
 from typing import Any
 
+from pydantic import ValidationError
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models import (
     Case,
     CaseStatus,
@@ -20,15 +25,21 @@ from app.models import (
 )
 from app.models.change_requests import ChangeRequestStatus
 from app.models.patches import PatchStatus, PatchType
-from app.services.audit_log import log_agent_tool
+from app.schemas.reports import QuerySpec
+from app.services import data_versions
+from app.services.audit_log import _args_hash, flush_audit_buffer, log_agent_tool
+from app.services.case_metrics import read_case_monthly_metrics
 from app.services.docs_generator import generate_change_request_docs
-from app.services.public_data_connector import download_somerville_citations
+from app.services.exports import ExportFormat, write_query_export
+from app.services.public_data_sources import SOURCES as PUBLIC_DATA_SOURCES, refresh_all_sources, refresh_source
+from app.services.query_builder import QUERY_ENTITIES, compile_query
 from app.services.reporting import (
     ensure_report_dir,
     generate_audit_report,
     run_monthly_report,
     run_revenue_at_risk_report,
 )
+from app.services.sla import bulk_escalate_overdue, overdue_ticket_ids
 
 REPORT_ROOT = Path(__file__).resolve().parents[2] / "reports"
 DOCS_GENERATED = Path(__file__).resolve().parents[2] / "docs" / "generated"
@@ -51,15 +62,92 @@ TOOL_WHITELIST = frozenset({
     "generate_change_request_docs",
 })
 
+# Tools that only read the database, with the tables each one reads. Read-only calls in the same turn may
+# run concurrently, and their results are cached until one of those tables changes. Every other whitelisted
+# tool mutates state (rows, report files, public data cache) and runs alone.
+READ_ONLY_TOOL_TABLES: dict[str, tuple[str, ...]] = {
+    "get_case_metrics": ("cases", "case_monthly_rollup"),
+    "triage_tickets": ("tickets",),
+    "sla_sweep": ("tickets",),
+    "inventory_compliance_check": ("devices",),
+}
+READ_ONLY_TOOLS = frozenset(READ_ONLY_TOOL_TABLES)
+# Tools that query audit_events: the run's buffered audit rows are written before they run.
+AUDIT_READING_TOOLS = frozenset({"generate_audit_report"})
+MUTATING_TOOLS = TOOL_WHITELIST - READ_ONLY_TOOLS
+
+# Tables written by mutating tools. Session commits bump versions on their own; bumping here as well keeps
+# invalidation explicit for writes that bypass the ORM unit of work.
+MUTATING_TOOL_TABLES: dict[str, tuple[str, ...]] = {
+    "resolve_ticket": ("tickets",),
+    "escalate_overdue_tickets": ("tickets",),
+    "create_patch_record": ("patches",),
+    "mark_patch_status": ("patches",),
+    "create_change_request": ("change_requests",),
+}
+
+
+def is_read_only_tool(tool_name: str) -> bool:
+    return tool_name in READ_ONLY_TOOLS
+
+
+class ToolResultCache:
+    """
+    LRU + TTL cache of read-only tool results keyed by (tool, args hash, day). An entry also records the
+    version snapshot of the tables the tool reads and is ignored once any of them has changed.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str, str], tuple[float, tuple[int, ...], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(tool_name: str, arguments: dict[str, Any]) -> tuple[str, str, str]:
+        # Results such as inventory_compliance_check depend on today's date, not just on the data.
+        return (tool_name, _args_hash(arguments), date.today().isoformat())
+
+    def get(self, key: tuple[str, str, str], versions: tuple[int, ...]) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic() or entry[1] != versions:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[2])
+
+    def put(self, key: tuple[str, str, str], versions: tuple[int, ...], result: Any) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, versions, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+tool_result_cache = ToolResultCache(settings.agent_tool_cache_size, settings.agent_tool_cache_ttl_seconds)
+
 OPENAI_TOOLS = [
     {
         "type": "function",
         "function": {
             "name": "refresh_public_dataset",
-            "description": "Refresh the public data cache. Use source_id 'somerville' for Somerville traffic citations.",
+            "description": "Refresh the public data cache (only re-downloads changed data). Use source_id 'somerville' for Somerville traffic citations, or 'all' to refresh every registered source in parallel.",
             "parameters": {
                 "type": "object",
-                "properties": {"source_id": {"type": "string", "description": "Dataset source, e.g. somerville"}},
+                "properties": {"source_id": {"type": "string", "description": "Dataset source, e.g. somerville, or all"}},
                 "required": ["source_id"],
             },
         },
@@ -180,10 +268,13 @@ OPENAI_TOOLS = [
         "type": "function",
         "function": {
             "name": "generate_audit_report",
-            "description": "Generate monthly audit report (text) under reports/YYYY-MM.",
+            "description": "Generate the audit report (text) for every event in a month under reports/YYYY-MM: counts by action, user and entity, plus an optional appendix listing each event.",
             "parameters": {
                 "type": "object",
-                "properties": {"period": {"type": "string"}},
+                "properties": {
+                    "period": {"type": "string", "description": "YYYY-MM; defaults to the current month"},
+                    "include_detail": {"type": "boolean", "description": "Append every event of the month (default true)"},
+                },
             },
         },
     },
@@ -191,11 +282,19 @@ OPENAI_TOOLS = [
         "type": "function",
         "function": {
             "name": "generate_custom_query_csv",
-            "description": "Generate a Crystal Reports–style CSV for an entity (cases, tickets, or devices) and write to reports/{period}/.",
+            "description": "Generate a Crystal Reports–style export for an entity (cases, tickets, or devices) and write to reports/{period}/. Defaults to CSV; parquet, arrow, and jsonl are also available.",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "entity": {"type": "string", "enum": ["cases", "tickets", "devices"], "description": "Entity to export"},
+                    "format": {"type": "string", "enum": ["csv", "parquet", "arrow", "jsonl"], "description": "Optional file format (default csv)"},
+                    "columns": {"type": "array", "items": {"type": "string"}, "description": "Optional column names; defaults to the curated set"},
+                    "filters": {
+                        "type": "object",
+                        "description": "Optional filters: status (list), date_from, date_to (YYYY-MM-DD), court, charge_type, category, priority, location",
+                    },
+                    "sort": {"type": "string", "description": "Optional sort column; prefix with - for descending"},
+                    "limit": {"type": "integer", "description": "Optional maximum number of rows"},
                     "period": {"type": "string", "description": "Optional YYYY-MM for report folder"},
                 },
                 "required": ["entity"],
@@ -250,11 +349,26 @@ def run_tool(
         log_agent_tool(db, user_id, tool_name, arguments, "dry_run: no execution")
         return {"success": True, "dry_run": True, "message": "No changes made (dry run)."}
 
+    cache_key = versions = None
+    if tool_name in READ_ONLY_TOOL_TABLES:
+        cache_key = tool_result_cache.key(tool_name, arguments)
+        versions = data_versions.snapshot(READ_ONLY_TOOL_TABLES[tool_name])
+        cached = tool_result_cache.get(cache_key, versions)
+        if cached is not None:
+            log_agent_tool(db, user_id, tool_name, arguments, f"cache hit: {str(cached)[:490]}")
+            return {"success": True, "result": cached, "cached": True}
+
     try:
+        if tool_name in AUDIT_READING_TOOLS:
+            flush_audit_buffer()
         result = _execute_tool(db, tool_name, arguments)
         if isinstance(result, dict) and "error" in result and result.get("success") is not True:
             log_agent_tool(db, user_id, tool_name, arguments, f"error: {result['error']}")
             return {"success": False, "error": result["error"]}
+        if cache_key is not None:
+            tool_result_cache.put(cache_key, versions, result)
+        elif tool_name in MUTATING_TOOL_TABLES:
+            data_versions.bump(*MUTATING_TOOL_TABLES[tool_name])
         summary = str(result)[:500]
         log_agent_tool(db, user_id, tool_name, arguments, summary)
         return {"success": True, "result": result}
@@ -269,41 +383,35 @@ def _execute_tool(db: Session, tool_name: str, args: dict[str, Any]) -> Any:
 
     if tool_name == "refresh_public_dataset":
         source_id = (args.get("source_id") or "somerville").strip().lower()
-        if source_id != "somerville":
-            return {"message": f"Unknown source_id: {source_id}. Only somerville is supported."}
-        try:
-            path = download_somerville_citations(force=True)
-            return {"path": str(path), "source_id": source_id}
-        except Exception as e:
-            err = str(e).lower()
+        if source_id == "all":
+            stats = asyncio.run(refresh_all_sources(force=True))
+            return {"sources": [s.as_dict() for s in stats]}
+        if source_id not in PUBLIC_DATA_SOURCES:
+            return {"message": f"Unknown source_id: {source_id}. Known sources: {', '.join(sorted(PUBLIC_DATA_SOURCES))}."}
+        stats = refresh_source(source_id)
+        if stats.status == "failed":
+            err = (stats.error or "").lower()
             if "timeout" in err or "timed out" in err:
                 return {"error": "Download timed out (external source may be slow). Continue with remaining steps."}
-            return {"error": f"Download failed ({e}). Continue with remaining steps."}
+            return {"error": f"Download failed ({stats.error}). Continue with remaining steps."}
+        return {"path": str(PUBLIC_DATA_SOURCES[source_id].data_path), **stats.as_dict()}
 
     if tool_name == "get_case_metrics":
-        cases = db.query(Case).all()
-        grouped: dict[str, list[Case]] = defaultdict(list)
-        for case in cases:
-            key = case.filing_date.strftime("%Y-%m")
-            grouped[key].append(case)
-        months_sorted = sorted(grouped.keys(), reverse=True)[:3]
-        summary_months = []
-        for month in months_sorted:
-            cs = grouped[month]
-            total = len(cs)
-            disposed = [c for c in cs if c.status in (CaseStatus.DISPOSED, CaseStatus.DISMISSED, CaseStatus.PAID)]
-            non_disposed = total - len(disposed)
-            disposed_pct = (len(disposed) / total * 100.0) if total > 0 else 0.0
-            avg_age = sum(c.case_age_days() for c in cs) / total if total > 0 else 0.0
-            summary_months.append({
-                "month": month,
-                "total_cases": total,
-                "disposed": len(disposed),
-                "non_disposed": non_disposed,
-                "disposed_pct": round(disposed_pct, 1),
-                "avg_case_age_days": round(avg_age, 1),
-            })
-        fta_count = sum(1 for c in cases if c.status == CaseStatus.FTA)
+        # Read-only: this runs concurrently with other read tools, so it must not refresh (write) the rollup.
+        # Months changed since the last beat refresh are aggregated from cases on the fly.
+        months = read_case_monthly_metrics(db, refresh=False)[-3:]
+        summary_months = [
+            {
+                "month": m["month"],
+                "total_cases": m["total_cases"],
+                "disposed": m["disposed_cases"],
+                "non_disposed": m["non_disposed_cases"],
+                "disposed_pct": round(m["disposed_pct"], 1),
+                "avg_case_age_days": round(m["avg_case_age_days"], 1),
+            }
+            for m in reversed(months)
+        ]
+        fta_count = db.query(func.count(Case.id)).filter(Case.status == CaseStatus.FTA).scalar()
         return {
             "last_3_months": summary_months,
             "fta_count": fta_count,
@@ -335,28 +443,12 @@ def _execute_tool(db: Session, tool_name: str, args: dict[str, Any]) -> Any:
         return {"ticket_id": tid, "status": "resolved"}
 
     if tool_name == "sla_sweep":
-        overdue = [
-            t
-            for t in db.query(Ticket)
-            .filter(Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS]))
-            .all()
-            if t.is_overdue()
-        ]
-        return {"overdue_count": len(overdue), "ticket_ids": [t.id for t in overdue]}
+        ticket_ids = overdue_ticket_ids(db)
+        return {"overdue_count": len(ticket_ids), "ticket_ids": ticket_ids}
 
     if tool_name == "escalate_overdue_tickets":
-        overdue = [
-            t
-            for t in db.query(Ticket)
-            .filter(Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS]))
-            .all()
-            if t.is_overdue()
-        ]
-        for t in overdue:
-            t.priority = TicketPriority.HIGH
-            db.add(t)
-        db.commit()
-        return {"escalated_count": len(overdue), "ticket_ids": [t.id for t in overdue]}
+        ticket_ids = bulk_escalate_overdue(db, priority=TicketPriority.HIGH)
+        return {"escalated_count": len(ticket_ids), "ticket_ids": ticket_ids}
 
     if tool_name == "inventory_compliance_check":
         risky = []
@@ -422,7 +514,7 @@ def _execute_tool(db: Session, tool_name: str, args: dict[str, Any]) -> Any:
 
     if tool_name == "generate_audit_report":
         period = (args.get("period") or today.strftime("%Y-%m")).strip()
-        path = generate_audit_report(db, period=period)
+        path = generate_audit_report(db, period=period, include_detail=args.get("include_detail", True) is not False)
         try:
             rel = path.relative_to(REPORT_ROOT.parent)
         except ValueError:
@@ -432,30 +524,27 @@ def _execute_tool(db: Session, tool_name: str, args: dict[str, Any]) -> Any:
     if tool_name == "generate_custom_query_csv":
         entity = (args.get("entity") or "cases").strip().lower()
         period = (args.get("period") or today.strftime("%Y-%m")).strip()
-        if entity not in ("cases", "tickets", "devices"):
+        if entity not in QUERY_ENTITIES:
             return {"error": "Unsupported entity; use cases, tickets, or devices"}
-        ensure_report_dir(period)
-        buffer = StringIO()
-        writer = csv.writer(buffer)
-        if entity == "cases":
-            writer.writerow(["case_number", "status", "court", "filing_date", "disposition_date", "fine_amount"])
-            for c in db.query(Case).limit(500):
-                writer.writerow([c.case_number, c.status.value, c.court, c.filing_date, c.disposition_date, c.fine_amount])
-        elif entity == "tickets":
-            writer.writerow(["id", "title", "category", "priority", "status", "created_at", "due_at"])
-            for t in db.query(Ticket).limit(500):
-                writer.writerow(
-                    [t.id, t.title, t.category.value, t.priority.value, t.status.value, t.created_at, t.due_at]
-                )
-        elif entity == "devices":
-            writer.writerow(["asset_tag", "type", "location", "assigned_user", "warranty_end", "last_patch_date"])
-            for d in db.query(Device).limit(500):
-                writer.writerow(
-                    [d.asset_tag, d.type, d.location, d.assigned_user, d.warranty_end, d.last_patch_date]
-                )
-        out_path = REPORT_ROOT / period / f"{entity}_export.csv"
-        out_path.write_text(buffer.getvalue(), encoding="utf-8")
-        return {"period": period, "path": f"reports/{period}/{entity}_export.csv"}
+        try:
+            fmt = ExportFormat((args.get("format") or "csv").strip().lower())
+        except ValueError:
+            return {"error": "Unsupported format; use csv, parquet, arrow, or jsonl"}
+        try:
+            spec = QuerySpec(
+                entity=entity,
+                columns=args.get("columns") or None,
+                filters=args.get("filters") or {},
+                sort=args.get("sort") or None,
+                limit=args.get("limit") or None,
+            )
+            compile_query(spec)
+        except (ValidationError, ValueError) as e:
+            return {"error": f"Invalid query: {e}"}
+        report_dir = ensure_report_dir(period)
+        filename = f"{entity}_export.{fmt.value}"
+        write_query_export(db, spec, fmt, report_dir / filename)
+        return {"period": period, "format": fmt.value, "path": f"reports/{period}/{filename}"}
 
     if tool_name == "create_change_request":
         required = ["title", "requested_by", "current_process", "proposed_change"]
@@ -1,12 +1,14 @@
-from typing import Annotated
+from typing import Annotated, Any, Sequence
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Response, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import Select
 from sqlalchemy.orm import Session
 
 from app.core.security import decode_token
 from app.db.session import get_db
 from app.models import User, UserRole
+from app.services.pagination import estimated_row_count, keyset_page
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -36,3 +38,34 @@ def require_role(required_role: UserRole):
 
     return _checker
 
+
+class PageParams:
+    """Keyset pagination query parameters shared by the list endpoints."""
+
+    def __init__(
+        self,
+        limit: int = Query(200, ge=1, le=500),
+        cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page"),
+    ) -> None:
+        self.limit = limit
+        self.cursor = cursor
+
+
+def paginate(
+    db: Session,
+    response: Response,
+    stmt: Select,
+    model: Any,
+    key_columns: Sequence[Any],
+    page: PageParams,
+    descending: bool = False,
+) -> list[Any]:
+    """Run one keyset page and expose X-Next-Cursor / X-Total-Count (estimated) headers."""
+    try:
+        items, next_cursor = keyset_page(db, stmt, key_columns, page.limit, page.cursor, descending)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(estimated_row_count(db, model))
+    return items
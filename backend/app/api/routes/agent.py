@@ -1,13 +1,17 @@
-from typing import Any
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.models import User, UserRole
-from app.agent.orchestrator import run_agent
+from app.agent.llm_client import get_llm_pool
+from app.agent.orchestrator import run_agent, run_agent_async
+from app.agent.plans import PRESET_PLANS, run_preset_plan, run_preset_plan_async
+from app.agent.runs import AgentRun, agent_runs, format_sse
 from app.core.config import settings
 
 
@@ -77,6 +81,8 @@ class AgentRunRequest(BaseModel):
     mode: str = "demo"
     dry_run: bool = True
     preset: str | None = "daily_ops_demo"
+    # "llm": the model drives every step. "plan": run the preset's compiled tool DAG and only ask the model for the summary.
+    execution: Literal["llm", "plan"] = "llm"
 
 
 class AgentRunResponse(BaseModel):
@@ -86,6 +92,12 @@ class AgentRunResponse(BaseModel):
     dry_run: bool
 
 
+class AgentRunStarted(BaseModel):
+    run_id: str
+    status: str
+    events_url: str
+
+
 def _can_run_agent(user: User, dry_run: bool) -> bool:
     if user.role in (UserRole.ANALYST, UserRole.IT_SUPPORT, UserRole.SUPERVISOR):
         return True
@@ -94,17 +106,18 @@ def _can_run_agent(user: User, dry_run: bool) -> bool:
     return False
 
 
-@router.post("/run", response_model=AgentRunResponse)
-def agent_run(
-    body: AgentRunRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> AgentRunResponse:
-    if not _can_run_agent(current_user, body.dry_run):
+def _resolve_run(body: AgentRunRequest, user: User) -> tuple[str, list[str] | None]:
+    """Check permissions and resolve (goal, require_completion_tools) for a run request."""
+    if not _can_run_agent(user, body.dry_run):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only Analyst, IT Support, or Supervisor can run the agent with dry_run=false. Read-only may run with dry_run=true only.",
         )
+    if body.execution == "plan" and body.preset not in PRESET_PLANS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"execution=plan requires a preset: {', '.join(PRESET_PLANS)}",
+        )
     goal = body.goal.strip() if body.goal else ""
     require_completion_tools = None
     if body.preset == "daily_ops_demo":
@@ -115,6 +128,19 @@ def agent_run(
         require_completion_tools = DAILY_OPS_ROBUST_REQUIRED_TOOLS
     if not goal:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="goal or preset required")
+    return goal, require_completion_tools
+
+
+@router.post("/run", response_model=AgentRunResponse)
+def agent_run(
+    body: AgentRunRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> AgentRunResponse:
+    goal, require_completion_tools = _resolve_run(body, current_user)
+    if body.execution == "plan":
+        result = run_preset_plan(db, current_user.id, body.preset, dry_run=body.dry_run)
+        return AgentRunResponse(**result)
     result = run_agent(
         db=db,
         user_id=current_user.id,
@@ -131,10 +157,72 @@ def agent_run(
     )
 
 
+@router.post("/runs", response_model=AgentRunStarted, status_code=status.HTTP_202_ACCEPTED)
+async def start_agent_run(
+    body: AgentRunRequest,
+    current_user: User = Depends(get_current_user),
+) -> AgentRunStarted:
+    """Start an agent run in the background. Progress is streamed from GET /agent/runs/{run_id}/events."""
+    goal, require_completion_tools = _resolve_run(body, current_user)
+    user_id = current_user.id
+
+    async def job(run: AgentRun) -> dict[str, Any]:
+        if body.execution == "plan":
+            return await run_preset_plan_async(SessionLocal, user_id, body.preset, dry_run=body.dry_run, emit=run.emit)
+        return await run_agent_async(
+            SessionLocal,
+            user_id,
+            goal,
+            dry_run=body.dry_run,
+            require_completion_tools=require_completion_tools,
+            emit=run.emit,
+        )
+
+    run = agent_runs.start(job, user_id=user_id, preset=body.preset, execution=body.execution, dry_run=body.dry_run)
+    return AgentRunStarted(run_id=run.id, status=run.status, events_url=f"/agent/runs/{run.id}/events")
+
+
+def _get_run(run_id: str, user: User) -> AgentRun:
+    run = agent_runs.get(run_id)
+    if run is None or (run.user_id != user.id and user.role != UserRole.SUPERVISOR):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+    return run
+
+
+@router.get("/runs/{run_id}")
+def get_agent_run(
+    run_id: str,
+    current_user: User = Depends(get_current_user),
+) -> dict[str, Any]:
+    return _get_run(run_id, current_user).snapshot()
+
+
+@router.get("/runs/{run_id}/events")
+async def stream_agent_run_events(
+    run_id: str,
+    last_event_id: int = Header(-1),
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Server-sent events: run_started, message, tool_call, tool_result, artifact, then run_completed or run_failed.
+    Reconnecting clients send Last-Event-ID to resume after the last event they saw."""
+    run = _get_run(run_id, current_user)
+
+    async def events():
+        async for event in run.stream(after=last_event_id):
+            yield format_sse(event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/status")
-def agent_status() -> dict[str, str]:
+def agent_status() -> dict[str, Any]:
     return {
         "status": "ok",
         "llm_provider": settings.llm_provider,
         "model": settings.ollama_model,
+        "endpoints": get_llm_pool().snapshot(),
     }
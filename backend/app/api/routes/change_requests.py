@@ -1,9 +1,10 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
+from app.api.deps import PageParams, get_current_user, paginate
 from app.db.session import get_db
 from app.models import ChangeRequest
 from app.schemas.change_requests import ChangeRequestCreate, ChangeRequestRead
@@ -15,10 +16,14 @@ router = APIRouter(prefix="/change-requests", tags=["change_requests"])
 
 @router.get("/", response_model=List[ChangeRequestRead])
 def list_change_requests(
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     _user=Depends(get_current_user),
 ) -> List[ChangeRequest]:
-    return db.query(ChangeRequest).order_by(ChangeRequest.created_at.desc()).all()
+    return paginate(
+        db, response, select(ChangeRequest), ChangeRequest, [ChangeRequest.created_at, ChangeRequest.id], page, descending=True
+    )
 
 
 @router.post("/", response_model=ChangeRequestRead)
@@ -1,9 +1,10 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
+from app.api.deps import PageParams, get_current_user, paginate
 from app.db.session import get_db
 from app.models import Device
 from app.schemas.inventory import DeviceRead
@@ -14,8 +15,10 @@ router = APIRouter(prefix="/inventory", tags=["inventory"])
 
 @router.get("/", response_model=List[DeviceRead])
 def list_devices(
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     _user=Depends(get_current_user),
 ) -> List[Device]:
-    return db.query(Device).order_by(Device.asset_tag).all()
+    return paginate(db, response, select(Device), Device, [Device.asset_tag, Device.id], page)
 
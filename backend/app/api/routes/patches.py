@@ -1,9 +1,10 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
+from app.api.deps import PageParams, get_current_user, paginate
 from app.db.session import get_db
 from app.models import Patch
 from app.schemas.patches import PatchRead
@@ -14,8 +15,10 @@ router = APIRouter(prefix="/patches", tags=["patches"])
 
 @router.get("/", response_model=List[PatchRead])
 def list_patches(
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     _user=Depends(get_current_user),
 ) -> List[Patch]:
-    return db.query(Patch).order_by(Patch.requested_date.desc()).limit(200).all()
+    return paginate(db, response, select(Patch), Patch, [Patch.requested_date, Patch.id], page, descending=True)
 
@@ -1,18 +1,26 @@
+from itertools import groupby
+from operator import attrgetter
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
-from app.db.session import get_db
-from app.models import Case, Device, Ticket
-from app.services.reporting import (
-    get_revenue_at_risk_cases,
-    run_monthly_report,
-    run_revenue_at_risk_report,
+from app.db.session import SessionLocal, get_db
+from app.schemas.reports import QueryPage, QuerySpec
+from app.services.exports import (
+    COLUMNAR_FORMATS,
+    EXPORT_MEDIA_TYPES,
+    ExportFormat,
+    iter_csv,
+    pyarrow_available,
+    stream_query_export,
 )
+from app.services.query_builder import QUERY_ENTITIES, compile_query, run_query_page
+from app.services.report_jobs import get_report_job, submit_report_job
+from app.services.reporting import iter_revenue_at_risk_rows
 
 
 REPORT_ROOT = Path(__file__).resolve().parents[3] / "reports"
@@ -20,14 +28,34 @@ REPORT_ROOT = Path(__file__).resolve().parents[3] / "reports"
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
-@router.post("/monthly/generate")
+def _job_response(job: dict, deduplicated: bool) -> dict:
+    verb = "already in progress" if deduplicated else "queued"
+    return {
+        **job,
+        "deduplicated": deduplicated,
+        "status_url": f"/reports/jobs/{job['job_id']}",
+        "message": f"Report for {job['period']} {verb}. Refresh the list once it completes.",
+    }
+
+
+@router.post("/monthly/generate", status_code=202)
 def generate_monthly_report_now(
-    db: Session = Depends(get_db),
     _user=Depends(get_current_user),
 ) -> dict:
-    """Generate the monthly operations report bundle for the current month. Creates PDF and summary under reports/YYYY-MM."""
-    period = run_monthly_report(db, period=None)
-    return {"period": period, "message": f"Report generated for {period}. Refresh the list to download."}
+    """Queue the monthly operations report bundle (PDF + summary under reports/YYYY-MM) for the current month."""
+    return _job_response(*submit_report_job("monthly"))
+
+
+@router.get("/jobs/{job_id}")
+def report_job_status(
+    job_id: str,
+    _user=Depends(get_current_user),
+) -> dict:
+    """Status of a queued report: queued, running, succeeded (with the PDF file name) or failed (with the error)."""
+    job = get_report_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
 
 
 @router.get("/monthly")
@@ -67,18 +95,13 @@ def download_monthly_pdf(
     return FileResponse(pdf, media_type="application/pdf", filename=pdf.name)
 
 
-@router.post("/revenue-at-risk/generate")
+@router.post("/revenue-at-risk/generate", status_code=202)
 def generate_revenue_at_risk_now(
     min_days_overdue: int = 90,
-    db: Session = Depends(get_db),
     _user=Depends(get_current_user),
 ) -> dict:
-    """Generate the Revenue at Risk (FTA) report for the current period. Creates PDF under reports/YYYY-MM."""
-    from datetime import date
-
-    period = date.today().strftime("%Y-%m")
-    path = run_revenue_at_risk_report(db, period=period, min_days_overdue=min_days_overdue)
-    return {"period": period, "path": path.name, "message": "Revenue at Risk report generated. Refresh to download."}
+    """Queue the Revenue at Risk (FTA) report for the current period. Creates PDF under reports/YYYY-MM."""
+    return _job_response(*submit_report_job("revenue_at_risk", params={"min_days_overdue": min_days_overdue}))
 
 
 @router.get("/revenue-at-risk/{period}/pdf")
@@ -98,73 +121,86 @@ def download_revenue_at_risk_pdf(
 def revenue_at_risk_csv(
     min_days_overdue: int = 90,
     _user=Depends(get_current_user),
-    db: Session = Depends(get_db),
 ) -> StreamingResponse:
     """Crystal Reports-style CSV: Citation, Defendant, Days Overdue, Outstanding Bal., grouped by violation type."""
-    import csv
-    from io import StringIO
-
-    buffer = StringIO()
-    writer = csv.writer(buffer)
-    writer.writerow(["Group", "Citation", "Defendant", "Violation", "Days Overdue", "Outstanding Bal."])
-    grouped = get_revenue_at_risk_cases(db, min_days_overdue=min_days_overdue)
-    for group_name, rows, subtotal in grouped:
-        for case, days_overdue, outstanding in rows:
-            writer.writerow(
-                [group_name, case.case_number, case.defendant_name, case.charge_type, days_overdue, f"{outstanding:.2f}"]
-            )
-        writer.writerow([group_name, "", "Subtotal", "", "", f"{subtotal:.2f}"])
-    total = sum(t for _, _, t in grouped)
-    writer.writerow(["", "", "TOTAL REVENUE AT RISK", "", "", f"{total:.2f}"])
-    buffer.seek(0)
+
+    def rows() -> Iterator[list[list]]:
+        db = SessionLocal()
+        try:
+            total = 0.0
+            grouped = groupby(iter_revenue_at_risk_rows(db, min_days_overdue=min_days_overdue), key=attrgetter("group_name"))
+            for group_name, group_rows in grouped:
+                batch = []
+                for r in group_rows:
+                    batch.append([group_name, r.case_number, r.defendant_name, r.charge_type, r.days_overdue, f"{r.outstanding:.2f}"])
+                    subtotal = r.subtotal
+                batch.append([group_name, "", "Subtotal", "", "", f"{subtotal:.2f}"])
+                total += subtotal
+                yield batch
+            yield [["", "", "TOTAL REVENUE AT RISK", "", "", f"{total:.2f}"]]
+        finally:
+            db.close()
+
+    header = ["Group", "Citation", "Defendant", "Violation", "Days Overdue", "Outstanding Bal."]
     return StreamingResponse(
-        buffer,
+        iter_csv(header, rows()),
         media_type="text/csv",
         headers={"Content-Disposition": 'attachment; filename="revenue_at_risk_fta.csv"'},
     )
 
 
+def _validated_spec(spec: QuerySpec) -> QuerySpec:
+    try:
+        compile_query(spec, paginate=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return spec
+
+
+def _export_response(spec: QuerySpec, export_format: ExportFormat) -> StreamingResponse:
+    if export_format in COLUMNAR_FORMATS and not pyarrow_available():
+        raise HTTPException(status_code=501, detail=f"{export_format.value} export requires pyarrow")
+    return StreamingResponse(
+        stream_query_export(_validated_spec(spec), export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{spec.entity}_report.{export_format.value}"'},
+    )
+
+
+@router.get("/custom-query")
 @router.get("/custom-query.csv")
-def custom_query_csv(
+def custom_query_export(
     entity: str,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
     _user=Depends(get_current_user),
-    db: Session = Depends(get_db),
 ) -> StreamingResponse:
     """
     Very small 'Crystal Reports style' custom query builder:
-    caller chooses an entity (cases, tickets, devices) and gets a CSV export
-    of a curated subset of fields.
+    caller chooses an entity (cases, tickets, devices) and gets an export
+    of a curated subset of fields as csv, parquet, arrow or jsonl. Rows are
+    streamed from a server-side cursor.
     """
-    import csv
-    from io import StringIO
-
-    buffer = StringIO()
-    writer = csv.writer(buffer)
-
     entity = entity.lower()
-    if entity == "cases":
-        writer.writerow(["case_number", "status", "court", "filing_date", "disposition_date", "fine_amount"])
-        for c in db.query(Case).limit(500):
-            writer.writerow([c.case_number, c.status.value, c.court, c.filing_date, c.disposition_date, c.fine_amount])
-    elif entity == "tickets":
-        writer.writerow(["id", "title", "category", "priority", "status", "created_at", "due_at"])
-        for t in db.query(Ticket).limit(500):
-            writer.writerow(
-                [t.id, t.title, t.category.value, t.priority.value, t.status.value, t.created_at, t.due_at]
-            )
-    elif entity == "devices":
-        writer.writerow(["asset_tag", "type", "location", "assigned_user", "warranty_end", "last_patch_date"])
-        for d in db.query(Device).limit(500):
-            writer.writerow(
-                [d.asset_tag, d.type, d.location, d.assigned_user, d.warranty_end, d.last_patch_date]
-            )
-    else:
+    if entity not in QUERY_ENTITIES:
         raise HTTPException(status_code=400, detail="Unsupported entity")
+    return _export_response(QuerySpec(entity=entity), export_format)
 
-    buffer.seek(0)
-    return StreamingResponse(
-        buffer,
-        media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{entity}_report.csv"'},
-    )
 
+@router.post("/custom-query", response_model=QueryPage)
+def custom_query_page(
+    spec: QuerySpec,
+    db: Session = Depends(get_db),
+    _user=Depends(get_current_user),
+) -> QueryPage:
+    """Run a declarative query spec (columns, filters, sort) and return one keyset page of rows."""
+    return QueryPage(**run_query_page(db, _validated_spec(spec)))
+
+
+@router.post("/custom-query/export")
+def custom_query_spec_export(
+    spec: QuerySpec,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    _user=Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream every row matching a declarative query spec in the requested format."""
+    return _export_response(spec, export_format)
@@ -1,12 +1,14 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, require_role
+from app.api.deps import PageParams, get_current_user, paginate, require_role
 from app.db.session import get_db
 from app.models import Ticket, TicketStatus, User, UserRole
 from app.schemas.ticket import TicketCreate, TicketRead, TicketUpdate
+from app.services.sla import overdue_ticket_count
 
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
@@ -14,11 +16,13 @@ router = APIRouter(prefix="/tickets", tags=["tickets"])
 
 @router.get("/", response_model=List[TicketRead])
 def list_tickets(
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> List[Ticket]:
     # For now, all authenticated users can list tickets.
-    return db.query(Ticket).order_by(Ticket.created_at.desc()).limit(200).all()
+    return paginate(db, response, select(Ticket), Ticket, [Ticket.created_at, Ticket.id], page, descending=True)
 
 
 @router.post("/", response_model=TicketRead, status_code=status.HTTP_201_CREATED)
@@ -83,14 +87,7 @@ def sla_summary(
 ) -> dict:
     total = db.query(Ticket).count()
     open_tickets = db.query(Ticket).filter(Ticket.status != TicketStatus.CLOSED).count()
-    overdue = (
-        db.query(Ticket)
-        .filter(
-            Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS]),
-        )
-        .all()
-    )
-    overdue_count = sum(1 for t in overdue if t.is_overdue())
+    overdue_count = overdue_ticket_count(db)
     return {
         "total": total,
         "open": open_tickets,
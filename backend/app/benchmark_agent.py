@@ -0,0 +1,188 @@
+"""
+Agent throughput benchmark: drives run_agent against the scripted mock LLM (app.agent.mock_llm) over seeded
+SQLite databases of increasing size, so regressions in the orchestrator or tools.py show up without Ollama.
+
+    python -m app.benchmark_agent --sizes 1,2,4 --runs 5 --latency-ms 0
+
+Size N seeds N times the demo data volume (cases, tickets, devices). Tools run for real (not dry run), but
+the reports and docs they write go to the benchmark's temp directory rather than the repo's reports/ and
+docs/generated/. The LLM endpoint setting is restored on exit.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.agent.llm_client import reset_llm_pool
+from app.agent.mock_llm import MockLLMServer
+from app.agent import tools
+from app.agent.orchestrator import run_agent
+from app.agent.tools import tool_result_cache
+from app.core.config import settings
+from app.db.session import Base
+from app.db.timing import enable_query_timing
+from app.services import docs_generator, reporting
+from app.seed_demo_data import (
+    create_cases,
+    create_change_requests,
+    create_demo_agent_guarantee,
+    create_devices,
+    create_patches,
+    create_tickets,
+    create_users,
+)
+
+BENCHMARK_GOAL = "Run the full daily operations demo."
+
+
+def seed_database(url: str, size: int, seed: int = 42) -> None:
+    random.seed(seed)
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        create_users(db)
+        create_cases(db, count=600 * size)
+        create_tickets(db, count=150 * size)
+        create_devices(db, count=60 * size)
+        create_demo_agent_guarantee(db)
+        create_patches(db)
+        create_change_requests(db)
+    finally:
+        db.close()
+        engine.dispose()
+
+
+@contextmanager
+def redirected_outputs(root: Path) -> Iterator[None]:
+    """Point the report and docs output directories at root/reports and root/docs/generated, restoring them after."""
+    targets = [
+        (reporting, "REPORT_ROOT", root / "reports"),
+        (tools, "REPORT_ROOT", root / "reports"),
+        (tools, "DOCS_GENERATED", root / "docs" / "generated"),
+        (docs_generator, "DOCS_ROOT", root / "docs" / "generated"),
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in targets]
+    try:
+        for module, name, path in targets:
+            setattr(module, name, path)
+        yield
+    finally:
+        for module, name, path in saved:
+            setattr(module, name, path)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def benchmark_size(server: MockLLMServer, url: str, runs: int, keep_cache: bool = False) -> dict[str, Any]:
+    engine = create_engine(url)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    tool_ms: dict[str, list[float]] = defaultdict(list)
+    tool_db_ms: dict[str, list[float]] = defaultdict(list)
+    failures = 0
+    run_seconds: list[float] = []
+    server.reset_stats()
+    tool_result_cache.clear()
+    try:
+        for _ in range(runs):
+            if not keep_cache:
+                tool_result_cache.clear()
+            db = session_factory()
+            start = time.perf_counter()
+            try:
+                result = run_agent(db, None, BENCHMARK_GOAL, dry_run=False)
+            finally:
+                db.close()
+            run_seconds.append(time.perf_counter() - start)
+            for action in result["actions_taken"]:
+                tool_ms[action["tool"]].append(action["duration_ms"])
+                tool_db_ms[action["tool"]].append(action.get("db_ms", 0.0))
+                failures += not action["result"].get("success")
+    finally:
+        engine.dispose()
+
+    stats = dict(server.stats)
+    total = sum(run_seconds)
+    return {
+        "runs": runs,
+        "runs_per_second": runs / total if total else 0.0,
+        "mean_run_ms": statistics.mean(run_seconds) * 1000.0,
+        "llm_requests": stats["requests"],
+        "prompt_tokens_per_run": stats["prompt_tokens"] / runs,
+        "completion_tokens_per_run": stats["completion_tokens"] / runs,
+        "tool_failures": failures,
+        "cache_hits": tool_result_cache.hits,
+        "tools": {
+            name: {
+                "calls": len(values),
+                "mean_ms": statistics.mean(values),
+                "p95_ms": _percentile(values, 95),
+                "mean_db_ms": statistics.mean(tool_db_ms[name]),
+            }
+            for name, values in sorted(tool_ms.items())
+        },
+    }
+
+
+def _print_report(size: int, report: dict[str, Any]) -> None:
+    print(
+        f"\n== size x{size}: {report['runs']} run(s), {report['runs_per_second']:.2f} runs/s, "
+        f"mean {report['mean_run_ms']:.0f} ms/run, {report['llm_requests']} LLM requests, "
+        f"~{report['prompt_tokens_per_run']:.0f} prompt + {report['completion_tokens_per_run']:.0f} completion tokens/run, "
+        f"{report['tool_failures']} tool failure(s)"
+    )
+    print(f"{'tool':<38}{'calls':>7}{'mean ms':>10}{'p95 ms':>10}{'db ms':>10}")
+    for name, t in report["tools"].items():
+        print(f"{name:<38}{t['calls']:>7}{t['mean_ms']:>10.1f}{t['p95_ms']:>10.1f}{t['mean_db_ms']:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark run_agent against the mock LLM")
+    parser.add_argument("--sizes", default="1,2,4", help="Comma-separated seed multipliers")
+    parser.add_argument("--runs", type=int, default=3, help="Agent runs per size")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated model latency per request")
+    parser.add_argument("--keep-cache", action="store_true", help="Let read-only tool results be cached across runs")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    enable_query_timing()
+    server = MockLLMServer(latency_ms=args.latency_ms).start()
+    llm_endpoints = settings.llm_endpoints
+    settings.llm_endpoints = server.base_url
+    reset_llm_pool()
+    results: dict[str, Any] = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="courtops-bench-") as tmp, redirected_outputs(Path(tmp)):
+            for size in sizes:
+                url = f"sqlite:///{Path(tmp) / f'bench-x{size}.db'}"
+                seed_database(url, size)
+                results[f"x{size}"] = report = benchmark_size(server, url, args.runs, keep_cache=args.keep_cache)
+                _print_report(size, report)
+    finally:
+        server.shutdown()
+        server.server_close()
+        settings.llm_endpoints = llm_endpoints
+        reset_llm_pool()
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,15 @@ celery_app = Celery(
     "courtops_agent",
     broker=settings.redis_url,
     backend=settings.redis_url,
+    include=[
+        "app.tasks.audit_retention",
+        "app.tasks.case_rollups",
+        "app.tasks.daily_checks",
+        "app.tasks.monthly_reports",
+        "app.tasks.public_data",
+        "app.tasks.report_jobs",
+        "app.tasks.weekly_checks",
+    ],
 )
 
 celery_app.conf.update(
@@ -20,6 +29,23 @@ celery_app.conf.update(
             "task": "app.tasks.weekly_checks.run_weekly_checks",
             "schedule": 60 * 60 * 24 * 7,
         },
+        "case-monthly-rollup-refresh": {
+            "task": "app.tasks.case_rollups.refresh_case_rollups",
+            "schedule": 60 * 15,
+        },
+        "case-monthly-rollup-rebuild": {
+            "task": "app.tasks.case_rollups.refresh_case_rollups",
+            "schedule": 60 * 60 * 24,
+            "kwargs": {"full": True},
+        },
+        "audit-partition-maintenance": {
+            "task": "app.tasks.audit_retention.maintain_audit_store",
+            "schedule": 60 * 60 * 24,
+        },
+        "public-data-refresh": {
+            "task": "app.tasks.public_data.refresh_public_data",
+            "schedule": 60 * 60,
+        },
         "monthly-report-generation": {
             "task": "app.tasks.monthly_reports.run_monthly_reports",
             "schedule": 60 * 60 * 24 * 30,
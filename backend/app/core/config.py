@@ -20,6 +20,43 @@ class Settings(BaseSettings):
     llm_provider: str = "ollama"
     ollama_base_url: str = "http://localhost:11434/v1/"
     ollama_model: str = "qwen3:8b"
+    # Comma-separated OpenAI-compatible base URLs; empty means just OLLAMA_BASE_URL.
+    llm_endpoints: str = ""
+    llm_routing: str = "least_loaded"
+    llm_endpoint_max_concurrency: int = 2
+    llm_endpoint_cooldown_seconds: float = 30.0
+    llm_request_timeout_seconds: float = 300.0
+
+    agent_tool_workers: int = 4
+    # Approximate prompt budget (messages only, excluding tool schemas) for the agent loop.
+    agent_context_token_budget: int = 4000
+    agent_context_keep_turns: int = 2
+    # Read-only agent tool results are reused until a table they read changes, or for at most this long.
+    agent_tool_cache_ttl_seconds: float = 60.0
+    agent_tool_cache_size: int = 256
+    # Agent tool audit rows are written in batches: at this many rows, after this long, or when the run ends.
+    audit_buffer_max_rows: int = 50
+    audit_buffer_max_age_seconds: float = 5.0
+    # Months of audit events kept in the database (including the current one); older months are archived.
+    audit_retention_months: int = 12
+    audit_partition_months_ahead: int = 2
+
+    # Public dataset downloads: per-read timeout, and attempts (each resuming the partial file) per refresh.
+    public_data_timeout_seconds: float = 120.0
+    public_data_max_attempts: int = 3
+    # Base delay between attempts after a 429/5xx or dropped connection, doubled per attempt (Retry-After wins).
+    public_data_retry_backoff_seconds: float = 2.0
+    # Sources downloaded at the same time by a refresh-all.
+    public_data_max_concurrency: int = 4
+
+    # Report PDFs render on the Celery worker. Identical requests share one job while its lock is held;
+    # the lock outlives any sane render, job records outlive the Celery result backend's default expiry.
+    report_job_lock_seconds: int = 900
+    report_job_ttl_seconds: int = 60 * 60 * 24
+    # Render in a background thread of the API process instead of on the Celery worker, for deployments
+    # where the worker cannot write to the reports/ directory the API serves.
+    report_jobs_inline: bool = False
+    report_jobs_inline_workers: int = 1
 
     class Config:
         env_file = ".env"
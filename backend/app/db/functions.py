@@ -0,0 +1,48 @@
+"""Portable SQL expressions used by the reporting queries.
+
+Production runs on PostgreSQL; local tools and tests run on SQLite. Each
+construct below compiles to the native form on PostgreSQL and to an equivalent
+expression elsewhere so the same query works on both.
+"""
+from sqlalchemy import Date, Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+
+EPOCH_JULIAN_DAY = 2440587.5
+
+
+class month_start(FunctionElement):
+    """First day of the month containing the given date."""
+
+    type = Date()
+    inherit_cache = True
+    name = "month_start"
+
+
+@compiles(month_start, "postgresql")
+def _pg_month_start(element, compiler, **kw):
+    return "date_trunc('month', %s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(month_start)
+def _default_month_start(element, compiler, **kw):
+    return "date(%s, 'start of month')" % compiler.process(element.clauses, **kw)
+
+
+class epoch_days(FunctionElement):
+    """Whole days between 1970-01-01 and the given date."""
+
+    type = Integer()
+    inherit_cache = True
+    name = "epoch_days"
+
+
+@compiles(epoch_days, "postgresql")
+def _pg_epoch_days(element, compiler, **kw):
+    return "(%s - DATE '1970-01-01')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(epoch_days)
+def _default_epoch_days(element, compiler, **kw):
+    return "CAST(julianday(%s) - %s AS INTEGER)" % (compiler.process(element.clauses, **kw), EPOCH_JULIAN_DAY)
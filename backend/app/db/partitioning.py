@@ -0,0 +1,141 @@
+"""Monthly range partitioning for append-only tables.
+
+A table opts in with ``postgresql_partition_by="RANGE (<column>)"`` and
+``info={"partition_key": "<column>", "append_only": True}``. On PostgreSQL,
+create_all then emits a partitioned parent (primary key extended with the
+partition key, as PostgreSQL requires), a DEFAULT partition so inserts never
+fail, and partitions for the coming months. On SQLite the same table is created
+as a single ordinary table and every helper here is a no-op.
+
+Deployments created before a table opted in still have it as an ordinary table,
+since create_all never alters an existing one. The maintenance helpers check the
+live table and skip it, with a warning, until it is migrated.
+"""
+import logging
+import re
+from datetime import date
+
+from sqlalchemy import Table, event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateTable
+
+# Rows may only be deleted from an append-only table inside a transaction that has set this flag
+# (SET LOCAL courtops.archiving = 'on'), i.e. by the archival job.
+ARCHIVING_SETTING = "courtops.archiving"
+
+logger = logging.getLogger(__name__)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    return f"{table_name}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(table: Table) -> bool:
+    return bool(table.info.get("partition_key"))
+
+
+def is_partitioned_in_database(conn: Connection, table: Table) -> bool:
+    """Whether the live table is a partitioned parent; the model's info only says it should be."""
+    if conn.dialect.name != "postgresql" or not is_partitioned(table):
+        return False
+    partitioned = conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)"), {"name": table.name}
+    ).first()
+    if partitioned is None:
+        logger.warning("%s is not partitioned in the database; skipping partition maintenance", table.name)
+        return False
+    return True
+
+
+@compiles(CreateTable, "postgresql")
+def _create_partitioned_table(element, compiler, **kw):
+    ddl = compiler.visit_create_table(element, **kw)
+    key = element.element.info.get("partition_key")
+    if key:
+        ddl = re.sub(r"PRIMARY KEY \(([^)]*)\)", lambda m: f"PRIMARY KEY ({m.group(1)}, {key})", ddl, count=1)
+    return ddl
+
+
+def month_partition_ddl(table_name: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table_name, month)} PARTITION OF {table_name} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def append_only_ddl(table_name: str) -> list[str]:
+    function = f"{table_name}_append_only"
+    return [
+        f"""CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' AND current_setting('{ARCHIVING_SETTING}', true) = 'on' THEN
+        RETURN OLD;
+    END IF;
+    RAISE EXCEPTION '{table_name} is append-only';
+END;
+$$ LANGUAGE plpgsql""",
+        f"DROP TRIGGER IF EXISTS {function} ON {table_name}",
+        f"CREATE TRIGGER {function} BEFORE UPDATE OR DELETE ON {table_name} FOR EACH ROW EXECUTE FUNCTION {function}()",
+    ]
+
+
+def ensure_month_partitions(conn: Connection, table: Table, first: date, months: int) -> list[str]:
+    """Create partitions for `months` months starting at `first`. Returns the names of the partitions created."""
+    if not is_partitioned_in_database(conn, table):
+        return []
+    key = table.info["partition_key"]
+    default = f"{table.name}_default"
+    has_default = conn.execute(text("SELECT to_regclass(:name)"), {"name": default}).scalar() is not None
+    created = []
+    for i in range(months):
+        month = add_months(first.replace(day=1), i)
+        name = partition_name(table.name, month)
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            continue
+        # PostgreSQL refuses a new partition whose range already has rows in the DEFAULT partition;
+        # those months stay in the default partition until archived.
+        if has_default and conn.execute(
+            text(f"SELECT 1 FROM {default} WHERE {key} >= :start AND {key} < :end LIMIT 1"),
+            {"start": month, "end": add_months(month, 1)},
+        ).first():
+            continue
+        conn.execute(text(month_partition_ddl(table.name, month)))
+        created.append(name)
+    return created
+
+
+def existing_month_partitions(conn: Connection, table: Table) -> dict[date, str]:
+    """Month -> partition name for the table's monthly partitions (PostgreSQL only)."""
+    if not is_partitioned_in_database(conn, table):
+        return {}
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :parent"
+        ),
+        {"parent": table.name},
+    ).scalars()
+    pattern = re.compile(rf"^{re.escape(table.name)}_y(\d{{4}})m(\d{{2}})$")
+    partitions = {}
+    for name in rows:
+        match = pattern.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+@event.listens_for(Table, "after_create")
+def _create_initial_partitions(table: Table, conn: Connection, **kw) -> None:
+    if conn.dialect.name != "postgresql" or not is_partitioned(table):
+        return
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table.name}_default PARTITION OF {table.name} DEFAULT"))
+    ensure_month_partitions(conn, table, date.today().replace(day=1), months=3)
+    if table.info.get("append_only"):
+        for statement in append_only_ddl(table.name):
+            conn.execute(text(statement))
@@ -0,0 +1,39 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Opt-in per-thread accumulator of time spent in DBAPI cursor.execute, for benchmarks and profiling.
+_local = threading.local()
+_enabled = False
+_enable_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    _local.total = getattr(_local, "total", 0.0) + elapsed
+
+
+def enable_query_timing() -> None:
+    """Start timing queries on every engine in this process. Idempotent."""
+    global _enabled
+    with _enable_lock:
+        if _enabled:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _enabled = True
+
+
+def query_timing_enabled() -> bool:
+    return _enabled
+
+
+def query_time_ms() -> float:
+    """Total query time recorded on the current thread, in milliseconds."""
+    return getattr(_local, "total", 0.0) * 1000.0
@@ -2,7 +2,7 @@ from .user import User, UserRole
 from .audit import AuditEvent, AuditAction
 from .ticket import Ticket, TicketCategory, TicketPriority, TicketStatus
 from .inventory import Device, DeviceStatus
-from .cases import Case, CaseStatus
+from .cases import Case, CaseMonthlyRollup, CaseStatus, ChargeTypeGroup
 from .patches import Patch, PatchStatus, PatchType
 from .change_requests import ChangeRequest, ChangeRequestStatus
 
@@ -18,7 +18,9 @@ __all__ = [
     "Device",
     "DeviceStatus",
     "Case",
+    "CaseMonthlyRollup",
     "CaseStatus",
+    "ChargeTypeGroup",
     "Patch",
     "PatchStatus",
     "PatchType",
@@ -1,9 +1,10 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import DateTime, Enum as SqlEnum, Integer, String, Text
+from sqlalchemy import DateTime, Enum as SqlEnum, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
+import app.db.partitioning  # noqa: F401  (registers the PostgreSQL partitioning DDL hooks)
 from app.db.session import Base
 
 
@@ -18,6 +19,15 @@ class AuditAction(str, Enum):
 
 class AuditEvent(Base):
     __tablename__ = "audit_events"
+    # Monthly RANGE partitions on PostgreSQL, a single table elsewhere (see app.db.partitioning).
+    __table_args__ = (
+        # Serves the daily failed-login scan (one action over a time range).
+        Index("ix_audit_events_action_created_at", "action", "created_at"),
+        {
+            "postgresql_partition_by": "RANGE (created_at)",
+            "info": {"partition_key": "created_at", "append_only": True},
+        },
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
@@ -1,8 +1,25 @@
 from datetime import date, datetime, timedelta
 from enum import Enum
 
-from sqlalchemy import Date, DateTime, Enum as SqlEnum, Float, Integer, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Date,
+    DateTime,
+    Enum as SqlEnum,
+    Float,
+    Index,
+    Integer,
+    String,
+    case as sa_case,
+    event,
+    func,
+    inspect,
+    or_,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from app.db.session import Base
 
@@ -20,6 +37,11 @@ class CaseStatus(str, Enum):
 
 class Case(Base):
     __tablename__ = "cases"
+    __table_args__ = (
+        Index("ix_cases_status_filing_date", "status", "filing_date"),
+        Index("ix_cases_court_filing_date", "court", "filing_date"),
+        Index("ix_cases_filing_date_id", "filing_date", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     case_number: Mapped[str] = mapped_column(String(64), unique=True, index=True)
@@ -39,7 +61,7 @@ class Case(Base):
     amount_paid: Mapped[float] = mapped_column(Float, default=0.0)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     def case_age_days(self) -> int:
         return (date.today() - self.filing_date).days
@@ -61,11 +83,84 @@ class Case(Base):
         return max(0, (date.today() - due).days)
 
 
+class CaseMonthlyRollup(Base):
+    """Per filing-month case sums, refreshed incrementally from cases.updated_at."""
+
+    __tablename__ = "case_monthly_rollup"
+
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)
+    total_cases: Mapped[int] = mapped_column(Integer, default=0)
+    disposed_cases: Mapped[int] = mapped_column(Integer, default=0)
+    filing_day_sum: Mapped[int] = mapped_column(BigInteger, default=0)
+    ttd_day_sum: Mapped[int] = mapped_column(BigInteger, default=0)
+    ttd_count: Mapped[int] = mapped_column(Integer, default=0)
+    source_updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ChargeTypeGroup(Base):
+    """Violation group for each distinct charge type, classified once by violation_group() when a case is written."""
+
+    __tablename__ = "charge_type_groups"
+
+    charge_type: Mapped[str] = mapped_column(String(128), primary_key=True)
+    violation_group: Mapped[str] = mapped_column(String(64), index=True)
+
+
+VIOLATION_GROUP_ORDER = ("Traffic Violations (High Priority)", "City Ordinance (Code Enforcement)", "Other")
+DEFAULT_VIOLATION_GROUP = "Other"
+
+# Group -> substrings of the lower-cased charge type, checked in order; the first group that matches wins.
+VIOLATION_GROUP_KEYWORDS = (
+    ("Traffic Violations (High Priority)", ("speeding", "parking", "registration", "insurance", "traffic")),
+    ("City Ordinance (Code Enforcement)", ("ordinance", "code enforcement", "properties", "city ordinance")),
+)
+
+
 def violation_group(charge_type: str) -> str:
     ct = (charge_type or "").strip().lower()
-    if any(x in ct for x in ("speeding", "parking", "registration", "insurance", "traffic")):
-        return "Traffic Violations (High Priority)"
-    if any(x in ct for x in ("ordinance", "code enforcement", "properties", "city ordinance")):
-        return "City Ordinance (Code Enforcement)"
-    return "Other"
-
+    for group, keywords in VIOLATION_GROUP_KEYWORDS:
+        if any(x in ct for x in keywords):
+            return group
+    return DEFAULT_VIOLATION_GROUP
+
+
+def violation_group_expr(charge_type: ColumnElement[str]) -> ColumnElement[str]:
+    """violation_group() as a SQL expression, for rows whose charge type is not in charge_type_groups yet."""
+    ct = func.lower(func.trim(func.coalesce(charge_type, "")))
+    return sa_case(
+        *[(or_(*[ct.contains(x, autoescape=True) for x in keywords]), group) for group, keywords in VIOLATION_GROUP_KEYWORDS],
+        else_=DEFAULT_VIOLATION_GROUP,
+    )
+
+
+# Classify on write: a flush that adds a case, or changes its charge type, inserts any charge type
+# charge_type_groups does not know yet, so revenue-at-risk reads never have to. ON CONFLICT DO NOTHING
+# lets concurrent writers classify the same new charge type without failing each other's flush.
+_INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+@event.listens_for(Session, "before_flush")
+def _classify_new_charge_types(session: Session, flush_context, instances) -> None:
+    charge_types = {
+        obj.charge_type
+        for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Case)
+        and obj.charge_type is not None
+        and (obj in session.new or inspect(obj).attrs.charge_type.history.has_changes())
+    }
+    if not charge_types:
+        return
+    known = session.execute(
+        select(ChargeTypeGroup.charge_type).where(ChargeTypeGroup.charge_type.in_(charge_types))
+    ).scalars()
+    unseen = sorted(charge_types.difference(known))
+    if not unseen:
+        return
+    conn = session.connection()
+    insert = _INSERT_BY_DIALECT.get(conn.dialect.name)
+    if insert is None:
+        # Other dialects: leave new charge types to sync_charge_type_groups in the daily rollup rebuild.
+        return
+    rows = [{"charge_type": ct, "violation_group": violation_group(ct)} for ct in unseen]
+    conn.execute(insert(ChargeTypeGroup).values(rows).on_conflict_do_nothing(index_elements=["charge_type"]))
@@ -1,7 +1,7 @@
 from datetime import datetime, date
 from enum import Enum
 
-from sqlalchemy import Date, DateTime, Enum as SqlEnum, Integer, String
+from sqlalchemy import Date, DateTime, Enum as SqlEnum, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.session import Base
@@ -16,6 +16,7 @@ class DeviceStatus(str, Enum):
 
 class Device(Base):
     __tablename__ = "devices"
+    __table_args__ = (Index("ix_devices_asset_tag_id", "asset_tag", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     asset_tag: Mapped[str] = mapped_column(String(64), unique=True, index=True)
@@ -1,7 +1,7 @@
 from datetime import datetime, date
 from enum import Enum
 
-from sqlalchemy import Date, DateTime, Enum as SqlEnum, Integer, String, Text
+from sqlalchemy import Date, DateTime, Enum as SqlEnum, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.session import Base
@@ -22,6 +22,7 @@ class PatchStatus(str, Enum):
 
 class Patch(Base):
     __tablename__ = "patches"
+    __table_args__ = (Index("ix_patches_requested_date_id", "requested_date", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(200))
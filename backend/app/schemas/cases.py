@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 from app.models.cases import CaseStatus
 
@@ -36,18 +36,10 @@ class CaseRead(CaseBase):
     class Config:
         from_attributes = True
 
+    @field_validator("outstanding_balance", "days_overdue", mode="before")
     @classmethod
-    def model_validate(cls, obj, **kwargs):
-        inst = super().model_validate(obj, **kwargs)
-        if hasattr(obj, "outstanding_balance") and callable(obj.outstanding_balance):
-            inst.outstanding_balance = obj.outstanding_balance()
-        elif hasattr(obj, "outstanding_balance"):
-            inst.outstanding_balance = obj.outstanding_balance
-        if hasattr(obj, "days_overdue") and callable(obj.days_overdue):
-            inst.days_overdue = obj.days_overdue()
-        elif hasattr(obj, "days_overdue"):
-            inst.days_overdue = obj.days_overdue
-        return inst
+    def _call_model_method(cls, value):
+        return value() if callable(value) else value
 
 
 class CaseMetrics(BaseModel):
@@ -0,0 +1,31 @@
+from datetime import date
+from typing import Any, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class QueryFilters(BaseModel):
+    status: Optional[List[str]] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    court: Optional[str] = None
+    charge_type: Optional[str] = None
+    category: Optional[str] = None
+    priority: Optional[str] = None
+    location: Optional[str] = None
+
+
+class QuerySpec(BaseModel):
+    entity: Literal["cases", "tickets", "devices"]
+    columns: Optional[List[str]] = None
+    filters: QueryFilters = Field(default_factory=QueryFilters)
+    sort: Optional[str] = None
+    limit: Optional[int] = Field(default=None, ge=1)
+    cursor: Optional[str] = None
+
+
+class QueryPage(BaseModel):
+    entity: str
+    columns: List[str]
+    rows: List[dict[str, Any]]
+    next_cursor: Optional[str] = None
@@ -57,12 +57,13 @@ CODE_CHARGES = ["City Ordinance (Code Enforcement)"]
 OTHER_CHARGES = ["Parking"]
 
 
-def create_cases(db: Session, months: int = 6) -> None:
+def create_cases(db: Session, months: int = 6, count: int = 600) -> None:
     today = date.today()
     all_charges = TRAFFIC_CHARGES + CODE_CHARGES + OTHER_CHARGES
     traffic_range = (0, len(TRAFFIC_CHARGES) - 1)
     code_range = (len(TRAFFIC_CHARGES), len(TRAFFIC_CHARGES) + len(CODE_CHARGES) - 1)
-    for i in range(600):
+    case_numbers: set[str] = set()
+    for i in range(count):
         days_ago = random.randint(0, months * 30)
         filing_date = today - timedelta(days=days_ago)
         status = random.choice(list(CaseStatus))
@@ -82,6 +83,7 @@ def create_cases(db: Session, months: int = 6) -> None:
             citation_prefix = "P"
             citation_num = 2000 + i
         case_number = f"{citation_prefix}{citation_num:06d}"
+        case_numbers.add(case_number)
 
         hearing_date = filing_date + timedelta(days=random.randint(7, 60))
         if status in {CaseStatus.FTA, CaseStatus.WARRANT} and i % 12 == 0:
@@ -121,6 +123,9 @@ def create_cases(db: Session, months: int = 6) -> None:
         ("E009905", "Davis, R.", "Speeding > 10mph", 195.00, 100),
     ]
     for i, (citation, defendant, charge, fine, days_ago) in enumerate(fta_seed):
+        if citation in case_numbers:
+            # Large benchmark seeds can generate the same citation number.
+            continue
         filing_date = today - timedelta(days=days_ago + 30)
         hearing_date = today - timedelta(days=days_ago)
         case = Case(
@@ -142,12 +147,12 @@ def create_cases(db: Session, months: int = 6) -> None:
     db.commit()
 
 
-def create_tickets(db: Session, months: int = 6) -> None:
+def create_tickets(db: Session, months: int = 6, count: int = 150) -> None:
     users = db.query(User).all()
     if not users:
         return
     today = datetime.utcnow()
-    for i in range(150):
+    for i in range(count):
         created_at = today - timedelta(hours=random.randint(0, months * 30 * 24))
         requester = random.choice(users)
         assignee = random.choice(users)
@@ -172,8 +177,8 @@ def create_tickets(db: Session, months: int = 6) -> None:
     db.commit()
 
 
-def create_devices(db: Session) -> None:
-    for i in range(60):
+def create_devices(db: Session, count: int = 60) -> None:
+    for i in range(count):
         warranty_end = date.today() + timedelta(days=random.randint(-180, 365))
         last_patch = date.today() + timedelta(days=random.randint(-120, 0))
         device = Device(
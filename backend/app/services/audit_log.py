@@ -1,32 +1,157 @@
 import hashlib
 import json
-from typing import Any
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Iterator
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models import AuditEvent
 from app.models.audit import AuditAction
 
+logger = logging.getLogger(__name__)
 
 def _args_hash(args: dict[str, Any]) -> str:
     return hashlib.sha256(json.dumps(args, sort_keys=True, default=str).encode()).hexdigest()[:16]
 
 
+class AuditBuffer:
+    """
+    Collects audit rows and writes them with one multi-row INSERT on their own session, once max_rows are
+    pending or the oldest pending row is max_age_seconds old (a timer thread flushes it even if nothing else
+    is logged), and always when the buffered_audit block exits. Safe to add to from the agent's tool worker
+    threads.
+    """
+
+    def __init__(self, bind: Any, max_rows: int, max_age_seconds: float) -> None:
+        self.bind = bind
+        self.max_rows = max_rows
+        self.max_age_seconds = max_age_seconds
+        self.written = 0
+        self._rows: list[dict[str, Any]] = []
+        self._oldest = 0.0
+        self._timer: threading.Timer | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _arm_timer(self) -> None:
+        # Called with the lock held, when the first row of a batch is pending.
+        if self._timer is None and not self._closed and self.max_age_seconds > 0:
+            self._timer = threading.Timer(self.max_age_seconds, self._flush_on_age)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_age(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Timed audit buffer flush failed; %d row(s) kept for the next flush", len(self._rows))
+
+    def add(self, row: dict[str, Any]) -> None:
+        """Queue a row, flushing if due. A failed flush is logged, not raised: audit must not fail the tool."""
+        with self._lock:
+            if not self._rows:
+                self._oldest = time.monotonic()
+                self._arm_timer()
+            self._rows.append(row)
+            due = len(self._rows) >= self.max_rows or time.monotonic() - self._oldest >= self.max_age_seconds
+        if due:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit buffer flush failed; %d row(s) kept for the next flush", len(self._rows))
+
+    def flush(self) -> int:
+        with self._lock:
+            rows, self._rows = self._rows, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not rows:
+            return 0
+        try:
+            with Session(bind=self.bind) as session:
+                session.execute(insert(AuditEvent).values(rows))
+                session.commit()
+        except Exception:
+            # Keep the rows so the next (timed or closing) flush retries them.
+            with self._lock:
+                self._rows[:0] = rows
+                self._arm_timer()
+            raise
+        with self._lock:
+            self.written += len(rows)
+        return len(rows)
+
+    def close(self) -> int:
+        """Final flush; no timer is armed afterwards."""
+        with self._lock:
+            self._closed = True
+        return self.flush()
+
+
+_current_buffer: ContextVar[AuditBuffer | None] = ContextVar("audit_buffer", default=None)
+
+
+@contextmanager
+def buffered_audit(
+    bind: Any,
+    max_rows: int | None = None,
+    max_age_seconds: float | None = None,
+) -> Iterator[AuditBuffer]:
+    """
+    Buffer log_agent_tool rows for the duration of the block (an agent run). Rows are flushed when the block
+    exits, including on error. Worker threads see the buffer only if they run in a copy of this context.
+    """
+    buffer = AuditBuffer(
+        bind,
+        max_rows=max_rows or settings.audit_buffer_max_rows,
+        max_age_seconds=settings.audit_buffer_max_age_seconds if max_age_seconds is None else max_age_seconds,
+    )
+    token = _current_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _current_buffer.reset(token)
+        buffer.close()
+
+
+def flush_audit_buffer() -> int:
+    """Write the current run's pending audit rows now, e.g. before a tool reads audit_events."""
+    buffer = _current_buffer.get()
+    return buffer.flush() if buffer is not None else 0
+
+
 def log_agent_tool(
     db: Session,
     user_id: int | None,
     tool_name: str,
     args: dict[str, Any],
     result_summary: str,
-) -> AuditEvent:
-    event = AuditEvent(
-        user_id=user_id,
-        action=AuditAction.AGENT_TOOL,
-        entity_type="agent_tool",
-        entity_id=tool_name,
-        event_metadata=json.dumps({"args_hash": _args_hash(args), "result_summary": result_summary[:500]}),
-        ip_address=None,
-    )
+) -> AuditEvent | None:
+    """Record an agent tool call. Inside buffered_audit the row is queued and None is returned."""
+    row = {
+        "user_id": user_id,
+        "action": AuditAction.AGENT_TOOL,
+        "entity_type": "agent_tool",
+        "entity_id": tool_name,
+        "event_metadata": json.dumps({"args_hash": _args_hash(args), "result_summary": result_summary[:500]}),
+        "ip_address": None,
+        "created_at": datetime.utcnow(),
+    }
+    buffer = _current_buffer.get()
+    if buffer is not None:
+        buffer.add(row)
+        return None
+    event = AuditEvent(**row)
     db.add(event)
     db.commit()
     db.refresh(event)
@@ -1,22 +1,82 @@
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Iterable
+from typing import Iterable, Iterator, Protocol
 
 from app.models.audit import AuditAction, AuditEvent
 
 
+class _LoginEvent(Protocol):
+    action: AuditAction
+    user_id: int | None
+    ip_address: str | None
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class FailedLoginBurst:
+    """At least `threshold` failed logins from one (user_id, ip_address) with no gap wider than the window."""
+
+    user_id: int | None
+    ip_address: str | None
+    start: datetime
+    end: datetime
+    failures: int
+
+
+def iter_failed_login_bursts(
+    events: Iterable[_LoginEvent],
+    threshold: int = 5,
+    window_minutes: int = 15,
+) -> Iterator[FailedLoginBurst]:
+    """
+    Sliding-window detector over a time-ordered event stream, O(n) overall: each (user_id, ip_address) keeps a
+    deque of its failures inside the window. A burst opens when a deque reaches `threshold` and stays open while
+    new failures keep it there; it is yielded once it closes (or at the end of the stream).
+    """
+    window = timedelta(minutes=window_minutes)
+    recent: dict[tuple[int | None, str | None], deque[datetime]] = {}
+    open_bursts: dict[tuple[int | None, str | None], list] = {}
+
+    def close(key):
+        start, end, failures = open_bursts.pop(key)
+        return FailedLoginBurst(key[0], key[1], start, end, failures)
+
+    for e in events:
+        if e.action != AuditAction.LOGIN_FAILURE:
+            continue
+        key = (e.user_id, e.ip_address)
+        times = recent.setdefault(key, deque())
+        times.append(e.created_at)
+        while e.created_at - times[0] > window:
+            times.popleft()
+        burst = open_bursts.get(key)
+        if len(times) >= threshold:
+            if burst is None:
+                open_bursts[key] = [times[0], e.created_at, len(times)]
+            else:
+                burst[1] = e.created_at
+                burst[2] += 1
+        elif burst is not None:
+            yield close(key)
+    for key in list(open_bursts):
+        yield close(key)
+
+
+def find_failed_login_bursts(
+    events: Iterable[_LoginEvent],
+    threshold: int = 5,
+    window_minutes: int = 15,
+) -> list[FailedLoginBurst]:
+    """All bursts in a time-ordered stream, earliest first."""
+    return sorted(iter_failed_login_bursts(events, threshold, window_minutes), key=lambda b: (b.start, b.end))
+
+
 def detect_repeated_failed_logins(
     events: Iterable[AuditEvent],
     threshold: int = 5,
     window_minutes: int = 15,
 ) -> bool:
-    """Flag suspicious bursts of failed logins within a short time window."""
-    failures = [e for e in events if e.action == AuditAction.LOGIN_FAILURE]
-    failures.sort(key=lambda e: e.created_at)
-    for i in range(len(failures)):
-        window_start = failures[i].created_at
-        window_end = window_start + timedelta(minutes=window_minutes)
-        count = sum(1 for e in failures if window_start <= e.created_at <= window_end)
-        if count >= threshold:
-            return True
-    return False
-
+    """Flag suspicious bursts of failed logins within a short time window. Accepts events in any order."""
+    failures = sorted((e for e in events if e.action == AuditAction.LOGIN_FAILURE), key=lambda e: e.created_at)
+    return next(iter_failed_login_bursts(failures, threshold, window_minutes), None) is not None
@@ -0,0 +1,145 @@
+"""
+Audit event store maintenance: period bounds for partition-pruned queries, monthly partition upkeep and
+retention. Months older than the retention window are written to gzip JSONL under data/archive/audit and
+then removed from the database (on PostgreSQL by detaching and dropping the month's partition).
+"""
+
+import gzip
+import json
+import os
+import shutil
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Select, delete, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.functions import month_start
+from app.db.partitioning import ARCHIVING_SETTING, add_months, ensure_month_partitions, existing_month_partitions
+from app.models import AuditEvent
+
+ARCHIVE_ROOT = Path(__file__).resolve().parents[2] / "data" / "archive" / "audit"
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def period_of(day: date) -> str:
+    return day.strftime("%Y-%m")
+
+
+def period_bounds(period: str) -> tuple[datetime, datetime]:
+    """Half-open [start, end) datetimes of a YYYY-MM period."""
+    start = datetime.strptime(period, "%Y-%m")
+    end_month = add_months(start.date(), 1)
+    return start, datetime(end_month.year, end_month.month, 1)
+
+
+def audit_events_in_period(period: str) -> Select:
+    """AuditEvent rows of one month, in time order. The range predicate lets PostgreSQL prune to one partition."""
+    start, end = period_bounds(period)
+    return (
+        select(AuditEvent)
+        .where(AuditEvent.created_at >= start, AuditEvent.created_at < end)
+        .order_by(AuditEvent.created_at, AuditEvent.id)
+    )
+
+
+def ensure_audit_partitions(db: Session, months_ahead: int | None = None, today: date | None = None) -> list[str]:
+    """Create audit_events partitions for this month and the next months_ahead months (PostgreSQL only)."""
+    months_ahead = settings.audit_partition_months_ahead if months_ahead is None else months_ahead
+    first = (today or date.today()).replace(day=1)
+    created = ensure_month_partitions(db.connection(), AuditEvent.__table__, first, months_ahead + 1)
+    db.commit()
+    return created
+
+
+def _event_record(event: AuditEvent) -> dict[str, Any]:
+    return {
+        "id": event.id,
+        "user_id": event.user_id,
+        "action": event.action.value,
+        "entity_type": event.entity_type,
+        "entity_id": event.entity_id,
+        "metadata": event.event_metadata,
+        "ip_address": event.ip_address,
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def _archived_ids(path: Path) -> set[int]:
+    if not path.exists():
+        return set()
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return {json.loads(line)["id"] for line in fh if line.strip()}
+
+
+def _write_archive(db: Session, period: str, archive_dir: Path) -> tuple[Path, int]:
+    """
+    Append the period's rows to its archive as a new gzip member, via a temp file and an atomic rename.
+    Rows already in the archive are skipped: they are still in the database if a run archived them and
+    then failed to delete them, and rows that arrive after a month was archived are appended later.
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"audit_events_{period}.jsonl.gz"
+    tmp = path.with_name(path.name + ".tmp")
+    archived = _archived_ids(path)
+    if path.exists():
+        shutil.copyfile(path, tmp)
+    count = 0
+    with gzip.open(tmp, "at", encoding="utf-8") as fh:
+        for event in db.scalars(audit_events_in_period(period).execution_options(yield_per=ARCHIVE_BATCH_SIZE)):
+            if event.id in archived:
+                continue
+            fh.write(json.dumps(_event_record(event)) + "\n")
+            count += 1
+    os.replace(tmp, path)
+    return path, count
+
+
+def archive_audit_events(
+    db: Session,
+    retention_months: int | None = None,
+    archive_dir: Path | None = None,
+    today: date | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Archive and remove every month older than the retention window (the current month counts as one).
+    Each month is archived before anything is deleted, so a failure leaves the data in the database.
+    """
+    retention_months = settings.audit_retention_months if retention_months is None else retention_months
+    archive_dir = archive_dir or ARCHIVE_ROOT
+    cutoff_month = add_months((today or date.today()).replace(day=1), -(retention_months - 1))
+    cutoff = datetime(cutoff_month.year, cutoff_month.month, 1)
+    table = AuditEvent.__table__
+    partitions = existing_month_partitions(db.connection(), table)
+
+    # PostgreSQL's date_trunc yields datetimes, SQLite dates; normalise to the first of the month.
+    months = {
+        date(m.year, m.month, 1)
+        for m in db.scalars(
+            select(month_start(AuditEvent.created_at)).where(AuditEvent.created_at < cutoff).distinct()
+        )
+    }
+    months |= {m for m in partitions if m < cutoff_month}
+
+    archived = []
+    for month in sorted(months):
+        period = period_of(month)
+        path, count = _write_archive(db, period, archive_dir)
+        start, end = period_bounds(period)
+        conn = db.connection()
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f"SET LOCAL {ARCHIVING_SETTING} = 'on'"))
+        if month in partitions:
+            conn.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {partitions[month]}"))
+            conn.execute(text(f"DROP TABLE {partitions[month]}"))
+        # Rows of months without their own partition (older data, or the DEFAULT partition).
+        db.execute(
+            delete(AuditEvent).where(AuditEvent.created_at >= start, AuditEvent.created_at < end),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        archived.append({"period": period, "rows": count, "archive": str(path)})
+    return archived
@@ -0,0 +1,174 @@
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import Select, and_, case, delete, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.functions import epoch_days, month_start
+from app.models import Case, CaseMonthlyRollup, CaseStatus
+from app.services import data_versions
+
+
+DISPOSED_STATUSES = (CaseStatus.DISPOSED, CaseStatus.DISMISSED, CaseStatus.PAID)
+EPOCH = date(1970, 1, 1)
+
+
+def _next_month(d: date) -> date:
+    return date(d.year + 1, 1, 1) if d.month == 12 else date(d.year, d.month + 1, 1)
+
+
+def monthly_aggregates_query(months: list[date] | None = None) -> Select:
+    """
+    One GROUP BY over filing month returning raw sums per month.
+
+    Sums (rather than averages) are returned so that age-dependent values can be
+    derived for any reference date without touching the cases again. When months
+    are given (first-of-month dates) only those filing months are scanned.
+    """
+    month = month_start(Case.filing_date).label("month")
+    is_disposed = Case.status.in_(DISPOSED_STATUSES)
+    has_ttd = and_(is_disposed, Case.disposition_date.isnot(None))
+    ttd_days = epoch_days(Case.disposition_date) - epoch_days(Case.filing_date)
+    stmt = (
+        select(
+            month,
+            func.count(Case.id).label("total_cases"),
+            func.sum(case((is_disposed, 1), else_=0)).label("disposed_cases"),
+            func.sum(epoch_days(Case.filing_date)).label("filing_day_sum"),
+            func.sum(case((has_ttd, ttd_days), else_=0)).label("ttd_day_sum"),
+            func.sum(case((has_ttd, 1), else_=0)).label("ttd_count"),
+            func.max(Case.updated_at).label("max_updated_at"),
+        )
+        .group_by(month)
+        .order_by(month)
+    )
+    if months:
+        stmt = stmt.where(
+            or_(*[and_(Case.filing_date >= m, Case.filing_date < _next_month(m)) for m in months])
+        )
+    return stmt
+
+
+def metrics_from_sums(
+    month: str,
+    total_cases: int,
+    disposed_cases: int,
+    filing_day_sum: int,
+    ttd_day_sum: int,
+    ttd_count: int,
+    today: date | None = None,
+) -> dict[str, Any]:
+    """Turn per-month sums into the CaseMetrics payload."""
+    today = today or date.today()
+    total = total_cases or 0
+    disposed = disposed_cases or 0
+    avg_age = ((today - EPOCH).days - filing_day_sum / total) if total > 0 else 0.0
+    return {
+        "month": month,
+        "total_cases": total,
+        "disposed_cases": disposed,
+        "non_disposed_cases": total - disposed,
+        "disposed_pct": (disposed / total * 100.0) if total > 0 else 0.0,
+        "avg_case_age_days": avg_age,
+        "avg_time_to_disposition_days": (ttd_day_sum / ttd_count) if ttd_count else None,
+    }
+
+
+def _sums_from_row(row: Any) -> dict[str, Any]:
+    return {
+        "month": row.month.strftime("%Y-%m"),
+        "total_cases": int(row.total_cases),
+        "disposed_cases": int(row.disposed_cases or 0),
+        "filing_day_sum": int(row.filing_day_sum or 0),
+        "ttd_day_sum": int(row.ttd_day_sum or 0),
+        "ttd_count": int(row.ttd_count or 0),
+    }
+
+
+def monthly_case_metrics(db: Session, today: date | None = None) -> list[dict[str, Any]]:
+    """Monthly case metrics computed directly from cases, oldest month first."""
+    return [metrics_from_sums(**_sums_from_row(row), today=today) for row in db.execute(monthly_aggregates_query())]
+
+
+def _changed_months(db: Session, watermark: datetime) -> list[date]:
+    """First-of-month dates of the filing months holding a case updated at or after watermark."""
+    changed = db.scalars(select(month_start(Case.filing_date)).where(Case.updated_at >= watermark).distinct()).all()
+    return [date(m.year, m.month, 1) for m in changed]
+
+
+def refresh_case_monthly_rollup(db: Session, full: bool = False) -> list[str]:
+    """
+    Bring case_monthly_rollup up to date and return the months that were recomputed.
+
+    Only filing months containing a case whose updated_at reached the rollup's
+    high-water mark are re-aggregated; closed months with no edits are left alone.
+    The mark itself is included (>=), since another row may have been committed
+    with the same timestamp after the last refresh; re-merging a month is harmless.
+    A case whose filing_date moves to another month leaves its old month stale, as
+    does a write that bypasses updated_at, so a full refresh (run daily by the
+    case-monthly-rollup-rebuild beat task, or whenever the rollup is empty)
+    rebuilds every month.
+    """
+    watermark = None if full else db.scalar(select(func.max(CaseMonthlyRollup.source_updated_at)))
+    if watermark is None:
+        months = None
+    else:
+        months = _changed_months(db, watermark)
+        if not months:
+            return []
+
+    rows = db.execute(monthly_aggregates_query(months)).all()
+    refreshed = [row.month.strftime("%Y-%m") for row in rows]
+    try:
+        if months is None:
+            db.execute(delete(CaseMonthlyRollup))
+        else:
+            stale = {m.strftime("%Y-%m") for m in months} - set(refreshed)
+            if stale:
+                db.execute(delete(CaseMonthlyRollup).where(CaseMonthlyRollup.month.in_(stale)))
+        for row in rows:
+            db.merge(CaseMonthlyRollup(**_sums_from_row(row), source_updated_at=row.max_updated_at, refreshed_at=datetime.utcnow()))
+        db.commit()
+    except IntegrityError:
+        # A concurrent refresh wrote the same months first; its result is equivalent.
+        db.rollback()
+    else:
+        data_versions.bump(CaseMonthlyRollup.__tablename__)
+    return refreshed
+
+
+def read_case_monthly_metrics(db: Session, today: date | None = None, refresh: bool = True) -> list[dict[str, Any]]:
+    """
+    Monthly case metrics served from case_monthly_rollup, oldest month first.
+
+    With refresh=False nothing is written: months changed since the rollup's
+    high-water mark are re-aggregated from cases in memory and replace their
+    stored rows, and an empty rollup falls back to aggregating every month. The
+    result matches what a refresh would store, however long ago the beat task ran.
+    """
+    if refresh:
+        refresh_case_monthly_rollup(db)
+    rollups = db.scalars(select(CaseMonthlyRollup).order_by(CaseMonthlyRollup.month)).all()
+    sums = {
+        r.month: {
+            "month": r.month,
+            "total_cases": r.total_cases,
+            "disposed_cases": r.disposed_cases,
+            "filing_day_sum": r.filing_day_sum,
+            "ttd_day_sum": r.ttd_day_sum,
+            "ttd_count": r.ttd_count,
+        }
+        for r in rollups
+    }
+    if not refresh:
+        watermark = max((r.source_updated_at for r in rollups if r.source_updated_at), default=None)
+        months = None if watermark is None else _changed_months(db, watermark)
+        if months is None:
+            sums = {}
+        for m in months or []:
+            sums.pop(m.strftime("%Y-%m"), None)
+        if months != []:
+            for row in db.execute(monthly_aggregates_query(months)):
+                sums[row.month.strftime("%Y-%m")] = _sums_from_row(row)
+    return [metrics_from_sums(**sums[month], today=today) for month in sorted(sums)]
@@ -0,0 +1,58 @@
+import threading
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+# Per-table change counters for this process. Readers snapshot the counters of the tables they read;
+# a cached result is valid only while its snapshot still matches.
+_versions: dict[str, int] = {}
+_lock = threading.Lock()
+
+_PENDING_KEY = "data_versions_pending_tables"
+
+
+def bump(*tables: str) -> None:
+    with _lock:
+        for table in tables:
+            _versions[table] = _versions.get(table, 0) + 1
+
+
+def snapshot(tables: Iterable[str]) -> tuple[int, ...]:
+    with _lock:
+        return tuple(_versions.get(t, 0) for t in tables)
+
+
+def _pending(session: Session) -> set[str]:
+    return session.info.setdefault(_PENDING_KEY, set())
+
+
+# Tables written through a Session are bumped when the transaction commits, so a reader can never
+# snapshot a new version while still seeing the old rows.
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session: Session, flush_context) -> None:
+    pending = _pending(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            pending.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _pending(orm_execute_state.session).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        bump(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tables(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,210 @@
+import csv
+import io
+import json
+from enum import Enum
+from io import StringIO
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+from sqlalchemy import Date, DateTime, Enum as SqlEnum, Float, Integer, Select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.schemas.reports import QuerySpec
+from app.services.query_builder import compile_query
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    JSONL = "jsonl"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ExportFormat.JSONL: "application/x-ndjson",
+}
+
+COLUMNAR_FORMATS = (ExportFormat.PARQUET, ExportFormat.ARROW)
+
+
+def export_header(columns: Sequence[Any]) -> list[str]:
+    return [col.key for col in columns]
+
+
+def iter_export_batches(db: Session, stmt: Select, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Sequence[Any]]:
+    """Yield batches of projected rows through a server-side cursor."""
+    for batch in db.execute(stmt.execution_options(yield_per=batch_size)).partitions():
+        yield batch
+
+
+def _csv_cell(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def iter_csv(header: list[str], batches: Iterable[Iterable[Sequence[Any]]]) -> Iterator[str]:
+    """Encode row batches as CSV, yielding one text chunk per batch."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for batch in batches:
+        writer.writerows([_csv_cell(v) for v in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _jsonl_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def iter_jsonl(header: list[str], batches: Iterable[Iterable[Sequence[Any]]]) -> Iterator[str]:
+    for batch in batches:
+        yield "".join(json.dumps(dict(zip(header, map(_jsonl_value, row)))) + "\n" for row in batch)
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _arrow_field(col: Any):
+    import pyarrow as pa
+
+    col_type = col.property.columns[0].type
+    if isinstance(col_type, SqlEnum):
+        arrow_type = pa.dictionary(pa.int32(), pa.string())
+    elif isinstance(col_type, DateTime):
+        arrow_type = pa.timestamp("us")
+    elif isinstance(col_type, Date):
+        arrow_type = pa.date32()
+    elif isinstance(col_type, Float):
+        arrow_type = pa.float64()
+    elif isinstance(col_type, Integer):
+        arrow_type = pa.int64()
+    else:
+        arrow_type = pa.string()
+    return pa.field(col.key, arrow_type)
+
+
+def arrow_schema(columns: Sequence[Any]):
+    import pyarrow as pa
+
+    return pa.schema([_arrow_field(col) for col in columns])
+
+
+def _arrow_column(col: Any, field: Any, values: list[Any]):
+    import pyarrow as pa
+
+    if pa.types.is_dictionary(field.type):
+        # A fixed dictionary of every enum member keeps codes stable across batches.
+        members = [m.value for m in col.property.columns[0].type.enum_class]
+        codes = {m: i for i, m in enumerate(members)}
+        indices = pa.array([None if v is None else codes[v.value] for v in values], type=pa.int32())
+        return pa.DictionaryArray.from_arrays(indices, pa.array(members, type=pa.string()))
+    return pa.array(values, type=field.type)
+
+
+def to_record_batch(columns: Sequence[Any], schema: Any, rows: Sequence[Sequence[Any]]):
+    import pyarrow as pa
+
+    values_by_column = list(zip(*rows)) if rows else [() for _ in schema]
+    arrays = [
+        _arrow_column(col, field, list(values))
+        for col, field, values in zip(columns, schema, values_by_column)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_columnar(columns: Sequence[Any], fmt: ExportFormat, batches: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    """Encode row batches as Parquet or an Arrow IPC stream, one output chunk per batch."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    out = pa.PythonFile(sink, mode="w")
+    if fmt == ExportFormat.PARQUET:
+        writer = pq.ParquetWriter(out, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(out, schema)
+    try:
+        for batch in batches:
+            writer.write_batch(to_record_batch(columns, schema, batch))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def iter_query_export(db: Session, spec: QuerySpec, fmt: ExportFormat) -> Iterator[bytes]:
+    """Encoded export chunks for every row matching a query spec (up to spec.limit)."""
+    compiled = compile_query(spec)
+    stmt = compiled.stmt.limit(spec.limit) if spec.limit else compiled.stmt
+    batches = iter_export_batches(db, stmt)
+    if fmt in COLUMNAR_FORMATS:
+        yield from iter_columnar(compiled.columns, fmt, batches)
+        return
+    encode = iter_jsonl if fmt == ExportFormat.JSONL else iter_csv
+    for chunk in encode(export_header(compiled.columns), batches):
+        yield chunk.encode("utf-8")
+
+
+def stream_query_export(spec: QuerySpec, fmt: ExportFormat) -> Iterator[bytes]:
+    """Export for an HTTP response; owns its session for the life of the stream."""
+    db = SessionLocal()
+    try:
+        yield from iter_query_export(db, spec, fmt)
+    finally:
+        db.close()
+
+
+def write_query_export(db: Session, spec: QuerySpec, fmt: ExportFormat, path: Path) -> Path:
+    with path.open("wb") as f:
+        for chunk in iter_query_export(db, spec, fmt):
+            f.write(chunk)
+    return path
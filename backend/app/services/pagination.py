@@ -0,0 +1,108 @@
+import base64
+import json
+import time
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Sequence
+
+from sqlalchemy import Date, DateTime, Enum as SqlEnum, Select, func, select, text, tuple_
+from sqlalchemy.orm import Session
+
+
+COUNT_ESTIMATE_TTL_SECONDS = 60.0
+
+_count_estimates: dict[str, tuple[float, int]] = {}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque keyset cursor for the last row of a page (sort key values plus id)."""
+    raw = json.dumps([_plain(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> list[Any]:
+    """Decode a cursor back into typed values for the given key columns; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    return [_typed(col, v) for col, v in zip(columns, values)]
+
+
+def _typed(col: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    col_type = col.property.columns[0].type if hasattr(col, "property") else col.type
+    if isinstance(col_type, SqlEnum):
+        return col_type.enum_class(value)
+    if isinstance(col_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(col_type, Date):
+        return date.fromisoformat(value)
+    return value
+
+
+def apply_keyset(stmt: Select, key_columns: Sequence[Any], cursor: str | None, descending: bool = False) -> Select:
+    """Order by the key columns and, given a cursor, resume strictly after it."""
+    if cursor:
+        keys, bound = tuple_(*key_columns), tuple_(*decode_cursor(cursor, key_columns))
+        stmt = stmt.where(keys < bound if descending else keys > bound)
+    return stmt.order_by(*[c.desc() if descending else c.asc() for c in key_columns])
+
+
+def keyset_page(
+    db: Session,
+    stmt: Select,
+    key_columns: Sequence[Any],
+    limit: int,
+    cursor: str | None = None,
+    descending: bool = False,
+) -> tuple[list[Any], str | None]:
+    """
+    Fetch one page of ORM entities ordered by key_columns (last one unique, usually id).
+
+    Resumes after the cursor with a row-value comparison so every page costs the
+    same index range scan regardless of how deep into the table it is.
+    """
+    stmt = apply_keyset(stmt, key_columns, cursor, descending).limit(limit + 1)
+    items = list(db.scalars(stmt))
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor([getattr(items[-1], c.key) for c in key_columns])
+
+
+def estimated_row_count(db: Session, model: Any) -> int:
+    """
+    Approximate row count for a table, cached for COUNT_ESTIMATE_TTL_SECONDS.
+
+    PostgreSQL answers from planner statistics (pg_class.reltuples); other databases,
+    or tables that have never been analyzed, fall back to COUNT(*).
+    """
+    table = model.__tablename__
+    cached = _count_estimates.get(table)
+    now = time.monotonic()
+    if cached and now - cached[0] < COUNT_ESTIMATE_TTL_SECONDS:
+        return cached[1]
+    estimate = -1
+    if db.get_bind().dialect.name == "postgresql":
+        estimate = db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table},
+        )
+        estimate = -1 if estimate is None else int(estimate)
+    if estimate < 0:
+        estimate = db.scalar(select(func.count()).select_from(model)) or 0
+    _count_estimates[table] = (now, estimate)
+    return estimate
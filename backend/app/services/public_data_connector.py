@@ -1,60 +1,268 @@
+import asyncio
 import csv
+import os
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Literal
+from typing import BinaryIO, Literal
 
 import httpx
 
+from app.core.config import settings
+
 
 CACHE_ROOT = Path(__file__).resolve().parents[2] / "data" / "cache"
 CITATIONS_FILENAME = "somerville_traffic_citations.csv"
-METADATA_FILENAME = "somerville_traffic_citations.meta"
 
 SOMERVILLE_CITATIONS_URL = (
     "https://data.somervillema.gov/api/views/3mqx-eye9/rows.csv?accessType=DOWNLOAD"
 )
 
+SOMERVILLE_METADATA = {
+    "description": "Somerville, MA Police Data: Traffic Citations (public open data).",
+    "license": "ODbL 1.0 (see Somerville open data portal).",
+}
 
-def ensure_cache_dir() -> None:
-    CACHE_ROOT.mkdir(parents=True, exist_ok=True)
 
+# Statuses worth another attempt: throttling and gateway/overload errors from the portal.
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+MAX_RETRY_DELAY_SECONDS = 60.0
 
-def get_cached_paths() -> tuple[Path, Path]:
-    ensure_cache_dir()
-    data_path = CACHE_ROOT / CITATIONS_FILENAME
-    meta_path = CACHE_ROOT / METADATA_FILENAME
-    return data_path, meta_path
 
+@dataclass
+class DownloadResult:
+    path: Path
+    status: Literal["downloaded", "resumed", "not_modified"]
+    bytes_transferred: int
+    attempts: int
 
-def download_somerville_citations(force: bool = False) -> Path:
-    """
-    Download a public traffic citations dataset from Somerville, MA open data portal.
 
-    The data is stored under data/cache with a simple metadata sidecar describing
-    source URL and download timestamp. This is used only as a supplemental public
-    dataset; no Corpus Christi or proprietary data is used.
-    """
-    data_path, meta_path = get_cached_paths()
-
-    if data_path.exists() and not force:
-        return data_path
-
-    with httpx.stream("GET", SOMERVILLE_CITATIONS_URL, timeout=120.0) as resp:
-        resp.raise_for_status()
-        with data_path.open("wb") as f:
-            for chunk in resp.iter_bytes():
-                f.write(chunk)
-
-    meta = {
-        "source": SOMERVILLE_CITATIONS_URL,
-        "downloaded_at_utc": datetime.utcnow().isoformat(),
-        "description": "Somerville, MA Police Data: Traffic Citations (public open data).",
-        "license": "ODbL 1.0 (see Somerville open data portal).",
-    }
-    with meta_path.open("w", encoding="utf-8", newline="") as f:
+def read_metadata(meta_path: Path) -> dict[str, str]:
+    """The .meta sidecar is a two-column CSV of key, value."""
+    if not meta_path.exists():
+        return {}
+    with meta_path.open(encoding="utf-8", newline="") as f:
+        return {row[0]: row[1] for row in csv.reader(f) if len(row) == 2}
+
+
+def write_metadata(meta_path: Path, meta: dict[str, str]) -> None:
+    tmp = meta_path.with_name(meta_path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f)
         for key, value in meta.items():
             writer.writerow([key, value])
+    os.replace(tmp, meta_path)
+
+
+def _validators(headers: httpx.Headers) -> dict[str, str]:
+    return {k: headers[h] for k, h in (("etag", "etag"), ("last_modified", "last-modified")) if h in headers}
+
+
+def _retry_delay(attempt: int, resp: httpx.Response | None = None) -> float:
+    """Exponential backoff from PUBLIC_DATA_RETRY_BACKOFF_SECONDS, or the server's Retry-After (in seconds)."""
+    delay = settings.public_data_retry_backoff_seconds * 2 ** (attempt - 1)
+    retry_after = resp.headers.get("retry-after", "") if resp is not None else ""
+    if retry_after.isdigit():
+        delay = float(retry_after)
+    return min(delay, MAX_RETRY_DELAY_SECONDS)
+
+
+def _request_headers(data_path: Path, part_path: Path, meta: dict[str, str]) -> tuple[dict[str, str], int]:
+    """Range request to resume a validated partial file, else a conditional request against the cache."""
+    # The .part file holds the bytes as written to disk, so offsets must count the same bytes the server
+    # ranges over: ask for the unencoded representation rather than letting httpx decode gzip on the fly.
+    headers: dict[str, str] = {"Accept-Encoding": "identity"}
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    partial_validator = meta.get("partial_etag") or meta.get("partial_last_modified")
+    if offset and partial_validator:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = partial_validator
+    elif data_path.exists():
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    return headers, offset
+
+
+def _body_mode(resp: httpx.Response, offset: int, part_path: Path, meta_path: Path, meta: dict[str, str]) -> str | None:
+    """File mode for the response body ("ab" to resume, "wb" to restart), or None to retry from scratch."""
+    if resp.status_code == 416:
+        # The partial file no longer matches anything the server can continue; start over.
+        part_path.unlink(missing_ok=True)
+        return None
+    resp.raise_for_status()
+    if resp.status_code == 206:
+        if not resp.headers.get("content-range", "").startswith(f"bytes {offset}-"):
+            part_path.unlink(missing_ok=True)
+            return None
+        return "ab"
+    meta.pop("partial_etag", None)
+    meta.pop("partial_last_modified", None)
+    meta.update({f"partial_{k}": v for k, v in _validators(resp.headers).items()})
+    write_metadata(meta_path, meta)
+    return "wb"
+
+
+# What an attempt's response calls for, besides a body to write in file mode "ab" or "wb".
+NOT_MODIFIED = "not_modified"
+BACKOFF = "backoff"
+RESTART = "restart"
+
+
+class _Transfer:
+    """
+    State and decisions of one download, shared by download_file and adownload_file so that only their
+    HTTP calls differ: request headers per attempt, what to do with a response, writing the body to the
+    .part file and finishing (the rename and the sidecar update).
+    """
+
+    def __init__(self, url: str, data_path: Path, meta_path: Path, extra_metadata: dict[str, str] | None) -> None:
+        self.url = url
+        self.data_path = data_path
+        self.meta_path = meta_path
+        self.extra_metadata = extra_metadata
+        self.part_path = data_path.with_name(data_path.name + ".part")
+        self.meta = read_metadata(meta_path)
+        self.transferred = 0
+        self.resumed = False
+        self.offset = 0
+        self.delay = 0.0
+        self.validators: dict[str, str] = {}
+
+    def request_headers(self) -> dict[str, str]:
+        headers, self.offset = _request_headers(self.data_path, self.part_path, self.meta)
+        return headers
+
+    def on_response(self, resp: httpx.Response, attempt: int, max_attempts: int) -> str:
+        """NOT_MODIFIED, BACKOFF (sleep self.delay, then retry), RESTART (retry now) or the body's file mode."""
+        if resp.status_code == 304:
+            self.meta["checked_at_utc"] = datetime.utcnow().isoformat()
+            write_metadata(self.meta_path, self.meta)
+            return NOT_MODIFIED
+        if resp.status_code in RETRYABLE_STATUSES and attempt < max_attempts:
+            return self.backoff(attempt, resp)
+        mode = _body_mode(resp, self.offset, self.part_path, self.meta_path, self.meta)
+        if mode is None:
+            return RESTART
+        self.resumed = self.resumed or mode == "ab"
+        self.validators = _validators(resp.headers)
+        return mode
+
+    def backoff(self, attempt: int, resp: httpx.Response | None = None) -> str:
+        self.delay = _retry_delay(attempt, resp)
+        return BACKOFF
+
+    def open_part(self, mode: str) -> BinaryIO:
+        return self.part_path.open(mode)
+
+    def write(self, f: BinaryIO, chunk: bytes) -> None:
+        f.write(chunk)
+        self.transferred += len(chunk)
+
+    def result(self, action: str, attempt: int) -> DownloadResult:
+        if action == NOT_MODIFIED:
+            return DownloadResult(self.data_path, "not_modified", self.transferred, attempt)
+        os.replace(self.part_path, self.data_path)
+        meta = self.meta
+        # A 206 may omit validators; the ones recorded when the transfer started describe the same body.
+        validators = self.validators or {
+            k: meta[f"partial_{k}"] for k in ("etag", "last_modified") if f"partial_{k}" in meta
+        }
+        for key in ("partial_etag", "partial_last_modified", "etag", "last_modified"):
+            meta.pop(key, None)
+        now = datetime.utcnow().isoformat()
+        meta.update(
+            {
+                "source": self.url,
+                "downloaded_at_utc": now,
+                "checked_at_utc": now,
+                **(self.extra_metadata or {}),
+                **validators,
+                "bytes": str(self.data_path.stat().st_size),
+            }
+        )
+        write_metadata(self.meta_path, meta)
+        return DownloadResult(self.data_path, "resumed" if self.resumed else "downloaded", self.transferred, attempt)
+
+
+def download_file(
+    url: str,
+    data_path: Path,
+    meta_path: Path,
+    extra_metadata: dict[str, str] | None = None,
+    timeout: float | None = None,
+    max_attempts: int | None = None,
+    client: httpx.Client | None = None,
+) -> DownloadResult:
+    """
+    Refresh a cached download with as little transfer as possible:
+    - a conditional GET (If-None-Match / If-Modified-Since from the sidecar) skips the body when unchanged;
+    - the body goes to <file>.part and is renamed over the cache only once complete, so a failed transfer
+      never leaves a truncated cache behind;
+    - an interrupted transfer is resumed with a Range request (If-Range guards against the source having
+      changed in between), on the next attempt or the next refresh;
+    - 429/5xx responses and dropped connections are retried with exponential backoff.
+    The body is written as sent (iter_raw), so .part offsets count the same bytes the server ranges over.
+    """
+    timeout = settings.public_data_timeout_seconds if timeout is None else timeout
+    max_attempts = max_attempts or settings.public_data_max_attempts
+    transfer = _Transfer(url, data_path, meta_path, extra_metadata)
+    own_client = client is None
+    client = client or httpx.Client(timeout=httpx.Timeout(timeout, connect=10.0), follow_redirects=True)
+    try:
+        for attempt in range(1, max_attempts + 1):
+            try:
+                with client.stream("GET", url, headers=transfer.request_headers()) as resp:
+                    action = transfer.on_response(resp, attempt, max_attempts)
+                    if action in ("ab", "wb"):
+                        with transfer.open_part(action) as f:
+                            for chunk in resp.iter_raw():
+                                transfer.write(f, chunk)
+            except httpx.TransportError:
+                # Timeouts and dropped connections keep the .part file for the next attempt to resume.
+                if attempt == max_attempts:
+                    raise
+                action = transfer.backoff(attempt)
+            if action == BACKOFF:
+                time.sleep(transfer.delay)
+            elif action != RESTART:
+                return transfer.result(action, attempt)
+        raise RuntimeError(f"Download of {url} did not complete after {max_attempts} attempt(s)")
+    finally:
+        if own_client:
+            client.close()
 
-    return data_path
 
+async def adownload_file(
+    client: httpx.AsyncClient,
+    url: str,
+    data_path: Path,
+    meta_path: Path,
+    extra_metadata: dict[str, str] | None = None,
+    timeout: float | None = None,
+    max_attempts: int | None = None,
+) -> DownloadResult:
+    """download_file on a shared AsyncClient, for refreshing several sources concurrently."""
+    timeout = settings.public_data_timeout_seconds if timeout is None else timeout
+    max_attempts = max_attempts or settings.public_data_max_attempts
+    transfer = _Transfer(url, data_path, meta_path, extra_metadata)
+    for attempt in range(1, max_attempts + 1):
+        try:
+            request_timeout = httpx.Timeout(timeout, connect=10.0)
+            async with client.stream("GET", url, headers=transfer.request_headers(), timeout=request_timeout) as resp:
+                action = transfer.on_response(resp, attempt, max_attempts)
+                if action in ("ab", "wb"):
+                    with transfer.open_part(action) as f:
+                        async for chunk in resp.aiter_raw():
+                            transfer.write(f, chunk)
+        except httpx.TransportError:
+            if attempt == max_attempts:
+                raise
+            action = transfer.backoff(attempt)
+        if action == BACKOFF:
+            await asyncio.sleep(transfer.delay)
+        elif action != RESTART:
+            return transfer.result(action, attempt)
+    raise RuntimeError(f"Download of {url} did not complete after {max_attempts} attempt(s)")
@@ -0,0 +1,210 @@
+"""
+Registry of public data sources. Each source declares where its data lives, the columns it must provide,
+how to parse the download and how often it goes stale. refresh_all_sources fetches every due source
+concurrently on one AsyncClient, bounded by PUBLIC_DATA_MAX_CONCURRENCY, so a slow portal only delays itself.
+"""
+
+import asyncio
+import csv
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+from app.core.config import settings
+from app.services.exports import pyarrow_available
+from app.services.public_data_connector import (
+    CACHE_ROOT,
+    CITATIONS_FILENAME,
+    SOMERVILLE_CITATIONS_URL,
+    SOMERVILLE_METADATA,
+    DownloadResult,
+    adownload_file,
+    download_file,
+    read_metadata,
+)
+from app.services.public_data_store import ingest_csv
+
+# parser(data_path, meta_path) -> summary dict, run after a download that changed the file.
+Parser = Callable[[Path, Path], dict[str, Any]]
+
+
+def parse_csv_to_parquet(data_path: Path, meta_path: Path) -> dict[str, Any]:
+    if not pyarrow_available():
+        return {"ingest": "skipped", "reason": "pyarrow is not installed"}
+    result = ingest_csv(data_path, meta_path)
+    return {"ingest": result.status, "rows": result.rows, "columnar_path": str(result.path)}
+
+
+@dataclass(frozen=True)
+class PublicDataSource:
+    source_id: str
+    url: str
+    filename: str
+    description: str
+    license: str
+    columns: tuple[str, ...] = ()
+    parser: Parser | None = parse_csv_to_parquet
+    refresh_interval: timedelta = timedelta(days=1)
+    timeout_seconds: float | None = None
+    max_attempts: int | None = None
+
+    @property
+    def data_path(self) -> Path:
+        return CACHE_ROOT / self.filename
+
+    @property
+    def meta_path(self) -> Path:
+        return (CACHE_ROOT / self.filename).with_suffix(".meta")
+
+    def metadata(self) -> dict[str, str]:
+        return {"description": self.description, "license": self.license}
+
+    def is_due(self, now: datetime | None = None) -> bool:
+        checked = read_metadata(self.meta_path).get("checked_at_utc")
+        if not self.data_path.exists() or not checked:
+            return True
+        return datetime.fromisoformat(checked) + self.refresh_interval <= (now or datetime.utcnow())
+
+
+@dataclass
+class SourceRefreshStats:
+    source_id: str
+    status: str  # downloaded | resumed | not_modified | skipped | failed
+    bytes_transferred: int = 0
+    duration_ms: float = 0.0
+    attempts: int = 0
+    error: str | None = None
+    missing_columns: list[str] = field(default_factory=list)
+    parsed: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def cache_hit(self) -> bool:
+        return self.status in ("not_modified", "skipped")
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "cache_hit": self.cache_hit}
+
+
+SOURCES: dict[str, PublicDataSource] = {}
+
+
+def register_source(source: PublicDataSource) -> PublicDataSource:
+    SOURCES[source.source_id] = source
+    return source
+
+
+# Supplemental public datasets only; no Corpus Christi or proprietary data is used.
+register_source(
+    PublicDataSource(
+        source_id="somerville",
+        url=SOMERVILLE_CITATIONS_URL,
+        filename=CITATIONS_FILENAME,
+        description=SOMERVILLE_METADATA["description"],
+        license=SOMERVILLE_METADATA["license"],
+    )
+)
+
+
+def get_source(source_id: str) -> PublicDataSource:
+    try:
+        return SOURCES[source_id.strip().lower()]
+    except KeyError:
+        raise KeyError(f"Unknown source_id: {source_id}. Known sources: {', '.join(sorted(SOURCES))}") from None
+
+
+def _missing_columns(source: PublicDataSource) -> list[str]:
+    if not source.columns or not source.data_path.exists():
+        return []
+    with source.data_path.open(encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f), [])
+    return [c for c in source.columns if c not in header]
+
+
+def _finish(source: PublicDataSource, result: DownloadResult, started: float) -> SourceRefreshStats:
+    """Check and parse a finished download. Errors here fail this source only; the download itself is kept."""
+    stats = SourceRefreshStats(
+        source_id=source.source_id,
+        status=result.status,
+        bytes_transferred=result.bytes_transferred,
+        attempts=result.attempts,
+    )
+    try:
+        if result.status != "not_modified":
+            stats.missing_columns = _missing_columns(source)
+        if source.parser is not None and not stats.missing_columns:
+            # Parsers skip unchanged files themselves, so a 304 still builds a missing columnar copy.
+            stats.parsed = source.parser(source.data_path, source.meta_path)
+    except Exception as e:
+        stats.error = f"{result.status}, but parsing failed: {str(e) or type(e).__name__}"
+        stats.status = "failed"
+    stats.duration_ms = (time.perf_counter() - started) * 1000.0
+    return stats
+
+
+def _failed(source: PublicDataSource, started: float, error: Exception) -> SourceRefreshStats:
+    duration_ms = (time.perf_counter() - started) * 1000.0
+    return SourceRefreshStats(source.source_id, "failed", duration_ms=duration_ms, error=str(error) or type(error).__name__)
+
+
+def refresh_source(source_id: str) -> SourceRefreshStats:
+    """Revalidate one source now, whatever its cadence."""
+    source = get_source(source_id)
+    source.data_path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    try:
+        result = download_file(
+            source.url,
+            source.data_path,
+            source.meta_path,
+            extra_metadata=source.metadata(),
+            timeout=source.timeout_seconds,
+            max_attempts=source.max_attempts,
+        )
+    except Exception as e:
+        return _failed(source, started, e)
+    return _finish(source, result, started)
+
+
+async def _refresh_one(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    source: PublicDataSource,
+    force: bool,
+) -> SourceRefreshStats:
+    if not force and not source.is_due():
+        return SourceRefreshStats(source.source_id, "skipped")
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            result = await adownload_file(
+                client,
+                source.url,
+                source.data_path,
+                source.meta_path,
+                extra_metadata=source.metadata(),
+                timeout=source.timeout_seconds,
+                max_attempts=source.max_attempts,
+            )
+        except Exception as e:
+            return _failed(source, started, e)
+    # Parsing is CPU-bound: run it off the event loop and outside the download slot.
+    return await asyncio.to_thread(_finish, source, result, started)
+
+
+async def refresh_all_sources(
+    source_ids: list[str] | None = None,
+    force: bool = False,
+    max_concurrency: int | None = None,
+) -> list[SourceRefreshStats]:
+    """Refresh the given (default: all) sources concurrently; sources not yet due are skipped unless force."""
+    sources = [get_source(s) for s in source_ids] if source_ids else list(SOURCES.values())
+    limit = max_concurrency or settings.public_data_max_concurrency
+    for source in sources:
+        source.data_path.parent.mkdir(parents=True, exist_ok=True)
+    semaphore = asyncio.Semaphore(limit)
+    async with httpx.AsyncClient(follow_redirects=True, limits=httpx.Limits(max_connections=limit)) as client:
+        return list(await asyncio.gather(*(_refresh_one(client, semaphore, s, force) for s in sources)))
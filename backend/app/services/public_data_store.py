@@ -0,0 +1,182 @@
+"""
+Columnar store for the public datasets cached by public_data_connector. The raw CSV is stream-parsed in
+blocks with pyarrow and written to a zstd-compressed Parquet file next to it, with a JSON sidecar holding
+per-column stats and the fingerprint of the CSV it was built from. Ingestion is skipped while the CSV is
+unchanged, so refreshing an unchanged source costs a stat() call.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Literal
+
+from app.services.public_data_connector import read_metadata
+
+INGEST_BLOCK_SIZE = 4 << 20
+
+# Socrata exports dates as "01/31/2024 12:00:00 AM"; ISO-8601 is tried first.
+TIMESTAMP_FORMATS = ["%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y"]
+
+_CONVERSION_ERROR = re.compile(r"CSV column #(\d+)")
+
+
+@dataclass
+class IngestResult:
+    path: Path
+    status: Literal["ingested", "unchanged"]
+    rows: int
+    stats: dict[str, Any]
+
+
+def columnar_paths(csv_path: Path) -> tuple[Path, Path]:
+    return csv_path.with_suffix(".parquet"), csv_path.with_suffix(".stats.json")
+
+
+def source_fingerprint(csv_path: Path, meta_path: Path | None = None) -> str:
+    """Identifies one version of the CSV: file size and mtime, plus the HTTP validators it was downloaded with."""
+    st = csv_path.stat()
+    meta = read_metadata(meta_path) if meta_path else {}
+    return f"{st.st_size}:{st.st_mtime_ns}:{meta.get('etag', '')}:{meta.get('last_modified', '')}"
+
+
+def normalize_column_names(names: list[str]) -> list[str]:
+    """snake_case names that are safe to use as identifiers, de-duplicated with a numeric suffix."""
+    seen: dict[str, int] = {}
+    out = []
+    for i, name in enumerate(names):
+        base = re.sub(r"[^0-9a-z]+", "_", name.strip().lower()).strip("_") or f"column_{i}"
+        seen[base] = seen.get(base, 0) + 1
+        out.append(base if seen[base] == 1 else f"{base}_{seen[base]}")
+    return out
+
+
+class _ColumnStats:
+    def __init__(self, arrow_type: Any) -> None:
+        self.type = str(arrow_type)
+        self.nulls = 0
+        self.min: Any = None
+        self.max: Any = None
+
+    def update(self, array: Any) -> None:
+        import pyarrow.compute as pc
+
+        self.nulls += array.null_count
+        if array.null_count == len(array):
+            return
+        bounds = pc.min_max(array)
+        lo, hi = bounds["min"].as_py(), bounds["max"].as_py()
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"type": self.type, "nulls": self.nulls, "min": self.min, "max": self.max}
+
+
+def _csv_column_names(csv_path: Path, block_size: int) -> list[str]:
+    """Header names as pyarrow reads them (BOM stripped, for one), so column_types keys match its schema."""
+    import pyarrow.csv as pacsv
+
+    return pacsv.open_csv(csv_path, read_options=pacsv.ReadOptions(block_size=block_size)).schema.names
+
+
+def _write_parquet(csv_path: Path, parquet_path: Path, column_types: dict[str, Any], block_size: int) -> tuple[int, dict[str, Any]]:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types,
+            timestamp_parsers=[pacsv.ISO8601, *TIMESTAMP_FORMATS],
+            strings_can_be_null=True,
+        ),
+    )
+    names = normalize_column_names(reader.schema.names)
+    schema = pa.schema([pa.field(n, f.type) for n, f in zip(names, reader.schema)])
+    stats = {n: _ColumnStats(f.type) for n, f in zip(names, reader.schema)}
+    rows = 0
+    tmp = parquet_path.with_name(parquet_path.name + ".tmp")
+    try:
+        with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+            for batch in reader:
+                batch = pa.RecordBatch.from_arrays(batch.columns, schema=schema)
+                for name, column in zip(names, batch.columns):
+                    stats[name].update(column)
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, parquet_path)
+    return rows, {name: s.as_dict() for name, s in stats.items()}
+
+
+def ingest_csv(
+    csv_path: Path,
+    meta_path: Path | None = None,
+    force: bool = False,
+    block_size: int = INGEST_BLOCK_SIZE,
+) -> IngestResult:
+    """
+    Convert csv_path to Parquet unless the stats sidecar shows it was already built from this version.
+    Column types are inferred from the first block; a column that later fails to convert (e.g. mostly
+    numeric IDs with the odd letter) is re-read as text.
+    """
+    import pyarrow as pa
+
+    parquet_path, stats_path = columnar_paths(csv_path)
+    fingerprint = source_fingerprint(csv_path, meta_path)
+    if not force and parquet_path.exists() and stats_path.exists():
+        previous = json.loads(stats_path.read_text(encoding="utf-8"))
+        if previous.get("source_fingerprint") == fingerprint:
+            return IngestResult(parquet_path, "unchanged", previous["rows"], previous)
+
+    header = _csv_column_names(csv_path, block_size)
+    column_types: dict[str, Any] = {}
+    while True:
+        try:
+            rows, columns = _write_parquet(csv_path, parquet_path, column_types, block_size)
+            break
+        except pa.ArrowInvalid as e:
+            match = _CONVERSION_ERROR.search(str(e))
+            if not match:
+                raise
+            name = header[int(match.group(1))]
+            if name in column_types:
+                raise
+            column_types[name] = pa.string()
+
+    stats = {
+        "source": str(csv_path.name),
+        "source_fingerprint": fingerprint,
+        "ingested_at_utc": datetime.utcnow().isoformat(),
+        "rows": rows,
+        "parquet_bytes": parquet_path.stat().st_size,
+        "columns": columns,
+    }
+    # Swapped in like the Parquet file, so a reader never sees a truncated sidecar.
+    tmp = stats_path.with_name(stats_path.name + ".tmp")
+    tmp.write_text(json.dumps(stats, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, stats_path)
+    return IngestResult(parquet_path, "ingested", rows, stats)
+
+
+def read_columnar(parquet_path: Path, columns: list[str] | None = None):
+    """Load (a projection of) an ingested dataset as a pyarrow Table."""
+    import pyarrow.parquet as pq
+
+    return pq.read_table(parquet_path, columns=columns)
+
+
+def top_values(parquet_path: Path, column: str, limit: int = 10) -> list[tuple[Any, int]]:
+    """Most frequent values of one column, read from the Parquet file alone."""
+    import pyarrow.compute as pc
+
+    counts = pc.value_counts(read_columnar(parquet_path, [column]).column(column).combine_chunks())
+    ranked = sorted(((c["values"].as_py(), c["counts"].as_py()) for c in counts), key=lambda vc: -vc[1])
+    return ranked[:limit]
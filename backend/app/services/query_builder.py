@@ -0,0 +1,161 @@
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import DateTime, Enum as SqlEnum, Select, select
+from sqlalchemy.orm import Session
+
+from app.models import Case, Device, Ticket
+from app.schemas.reports import QueryFilters, QuerySpec
+from app.services.pagination import apply_keyset, encode_cursor
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class QueryEntity:
+    """What the custom query builder may select, filter and sort on for one entity."""
+
+    model: Any
+    columns: tuple[Any, ...]
+    default_columns: tuple[str, ...]
+    date_column: Any
+    filters: dict[str, Any] = field(default_factory=dict)
+    default_sort: str = "id"
+
+    def column(self, name: str) -> Any:
+        for col in self.columns:
+            if col.key == name:
+                return col
+        raise ValueError(f"Unknown column for {self.model.__tablename__}: {name}")
+
+
+QUERY_ENTITIES: dict[str, QueryEntity] = {
+    "cases": QueryEntity(
+        model=Case,
+        columns=(
+            Case.id, Case.case_number, Case.defendant_name, Case.charge_type, Case.status, Case.court,
+            Case.courtroom, Case.clerk, Case.judge, Case.filing_date, Case.hearing_date,
+            Case.disposition_date, Case.fine_amount, Case.amount_paid,
+        ),
+        default_columns=("case_number", "status", "court", "filing_date", "disposition_date", "fine_amount"),
+        date_column=Case.filing_date,
+        filters={"status": Case.status, "court": Case.court, "charge_type": Case.charge_type},
+        default_sort="filing_date",
+    ),
+    "tickets": QueryEntity(
+        model=Ticket,
+        columns=(
+            Ticket.id, Ticket.title, Ticket.category, Ticket.priority, Ticket.status, Ticket.assignee_id,
+            Ticket.created_at, Ticket.due_at, Ticket.resolved_at,
+        ),
+        default_columns=("id", "title", "category", "priority", "status", "created_at", "due_at"),
+        date_column=Ticket.created_at,
+        filters={"status": Ticket.status, "category": Ticket.category, "priority": Ticket.priority},
+        default_sort="created_at",
+    ),
+    "devices": QueryEntity(
+        model=Device,
+        columns=(
+            Device.asset_tag, Device.type, Device.location, Device.assigned_user, Device.warranty_end,
+            Device.last_patch_date, Device.status,
+        ),
+        default_columns=("asset_tag", "type", "location", "assigned_user", "warranty_end", "last_patch_date"),
+        date_column=Device.warranty_end,
+        filters={"status": Device.status, "location": Device.location},
+        default_sort="asset_tag",
+    ),
+}
+
+
+@dataclass
+class CompiledQuery:
+    stmt: Select
+    columns: list[Any]
+    key_columns: list[Any]
+    descending: bool
+
+
+def resolve_columns(spec: QuerySpec) -> list[Any]:
+    entity = QUERY_ENTITIES[spec.entity]
+    names = spec.columns or list(entity.default_columns)
+    return [entity.column(name) for name in names]
+
+
+def _coerce(col: Any, value: str) -> Any:
+    col_type = col.property.columns[0].type
+    if isinstance(col_type, SqlEnum):
+        try:
+            return col_type.enum_class(value.strip().lower())
+        except ValueError as e:
+            raise ValueError(f"Invalid {col.key} value: {value}") from e
+    return value
+
+
+def _filter_clauses(entity: QueryEntity, filters: QueryFilters) -> list[Any]:
+    clauses = []
+    values = filters.model_dump(exclude_none=True)
+    date_from = values.pop("date_from", None)
+    date_to = values.pop("date_to", None)
+    for name, value in values.items():
+        col = entity.filters.get(name)
+        if col is None:
+            raise ValueError(f"Filter '{name}' is not supported for {entity.model.__tablename__}")
+        if isinstance(value, list):
+            clauses.append(col.in_([_coerce(col, v) for v in value]))
+        else:
+            clauses.append(col == _coerce(col, value))
+
+    is_datetime = isinstance(entity.date_column.property.columns[0].type, DateTime)
+    if date_from is not None:
+        clauses.append(entity.date_column >= (datetime.combine(date_from, time.min) if is_datetime else date_from))
+    if date_to is not None:
+        end = date_to + timedelta(days=1)
+        clauses.append(entity.date_column < (datetime.combine(end, time.min) if is_datetime else end))
+    return clauses
+
+
+def compile_query(spec: QuerySpec, paginate: bool = False) -> CompiledQuery:
+    """
+    Compile a declarative spec into one SELECT over the projected columns.
+
+    Ordering is (sort column, primary key) so keyset pagination can resume from a
+    cursor with a row-value comparison instead of OFFSET. When paginating, the
+    key columns are appended after the projected columns.
+    """
+    entity = QUERY_ENTITIES[spec.entity]
+    columns = resolve_columns(spec)
+    sort = spec.sort or entity.default_sort
+    descending = sort.startswith("-")
+    sort_name = sort.lstrip("-")
+    sort_col = entity.model.id if sort_name == "id" else entity.column(sort_name)
+    if sort_col.property.columns[0].nullable:
+        raise ValueError(f"Cannot sort on nullable column: {sort_col.key}")
+    id_col = entity.model.id
+    key_columns = [id_col] if sort_col is id_col else [sort_col, id_col]
+
+    selected = columns + key_columns if paginate else columns
+    stmt = select(*selected).where(*_filter_clauses(entity, spec.filters))
+    stmt = apply_keyset(stmt, key_columns, spec.cursor if paginate else None, descending)
+    return CompiledQuery(stmt=stmt, columns=columns, key_columns=key_columns, descending=descending)
+
+
+def run_query_page(db: Session, spec: QuerySpec) -> dict[str, Any]:
+    """Execute one keyset page of a spec; returns column names, rows and the next cursor."""
+    compiled = compile_query(spec, paginate=True)
+    page_size = min(spec.limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    rows = db.execute(compiled.stmt.limit(page_size + 1)).all()
+    width = len(compiled.columns)
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][width:])
+    names = [c.key for c in compiled.columns]
+    return {
+        "entity": spec.entity,
+        "columns": names,
+        "rows": [dict(zip(names, row[:width])) for row in rows],
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,80 @@
+"""
+Content-addressed cache for rendered report files. A report's fingerprint hashes its inputs (period,
+parameters) with a cheap summary of every table it reads: row count, max id and max updated_at. Any
+insert, delete or ORM/Core update changes one of those, so a matching fingerprint means the file
+under reports/YYYY-MM/ would render the same. Each period directory keeps a manifest.json recording,
+per file, the fingerprint, when and how long it took to render, and its size.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def table_summary(db: Session, model: Any) -> list[Any]:
+    """[row count, max id, max updated_at] in one aggregate query; the last two only where the columns exist."""
+    table = model.__table__
+    columns = [func.count()]
+    for name in ("id", "updated_at"):
+        if name in table.c:
+            columns.append(func.max(table.c[name]))
+    return [v.isoformat() if isinstance(v, datetime) else v for v in db.execute(select(*columns).select_from(table)).one()]
+
+
+def report_fingerprint(db: Session, report: str, models: list[Any], **inputs: Any) -> str:
+    payload = {
+        "report": report,
+        "inputs": inputs,
+        "tables": {m.__tablename__: table_summary(db, m) for m in models},
+    }
+    canonical = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def read_manifest(report_dir: Path) -> dict[str, dict[str, Any]]:
+    path = report_dir / MANIFEST_FILENAME
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        # A corrupt manifest only costs a re-render.
+        return {}
+
+
+def cached_artifact(report_dir: Path, filename: str, fingerprint: str) -> Path | None:
+    """The existing file if the manifest says it was rendered from this fingerprint and it is still intact."""
+    entry = read_manifest(report_dir).get(filename)
+    path = report_dir / filename
+    if entry is None or entry.get("fingerprint") != fingerprint or not path.exists():
+        return None
+    if path.stat().st_size != entry.get("bytes"):
+        return None
+    return path
+
+
+def record_artifact(report_dir: Path, filename: str, fingerprint: str, render_ms: float) -> dict[str, Any]:
+    """
+    Add or replace a file's manifest entry; the manifest is rewritten via a temp file and an atomic rename.
+    Two reports of one period finishing together may drop each other's entry, which only costs a re-render.
+    """
+    entry = {
+        "fingerprint": fingerprint,
+        "rendered_at_utc": datetime.utcnow().isoformat(),
+        "render_ms": round(render_ms, 1),
+        "bytes": (report_dir / filename).stat().st_size,
+    }
+    manifest = read_manifest(report_dir)
+    manifest[filename] = entry
+    tmp = report_dir / (MANIFEST_FILENAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, report_dir / MANIFEST_FILENAME)
+    return entry
@@ -0,0 +1,189 @@
+"""
+Report PDFs render on the Celery worker instead of inside the request. A job is keyed by (report type,
+period, params): the first request for a key takes a Redis lock (SET NX) holding its job id and enqueues
+the render; identical requests made while that job is queued or running get the same job id back. The
+job record (status, output file, error) lives in Redis next to the lock, so polling does not depend on
+the Celery result backend. Rendering overwrites the period's files, so re-running a job is harmless.
+The worker must write to the reports/ directory the API serves (a shared volume); where it cannot,
+REPORT_JOBS_INLINE renders on a background thread of the API process instead.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable, Protocol
+
+from sqlalchemy.orm import Session
+
+from app.celery_app import celery_app
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.reporting import run_monthly_report, run_revenue_at_risk_report
+
+RENDER_TASK = "app.tasks.report_jobs.render_report"
+LOCK_PREFIX = "courtops:report-lock:"
+JOB_PREFIX = "courtops:report-job:"
+
+logger = logging.getLogger(__name__)
+
+
+class LockStore(Protocol):
+    """The subset of the redis-py client used here (with decode_responses=True)."""
+
+    def set(self, name: str, value: str, ex: int | None = None, nx: bool = False) -> bool | None: ...
+
+    def get(self, name: str) -> str | None: ...
+
+    def delete(self, *names: str) -> int: ...
+
+
+def _render_monthly(db: Session, period: str, params: dict[str, Any]) -> str:
+    return f"monthly_operations_{run_monthly_report(db, period=period)}.pdf"
+
+
+def _render_revenue_at_risk(db: Session, period: str, params: dict[str, Any]) -> str:
+    return run_revenue_at_risk_report(db, period=period, min_days_overdue=int(params.get("min_days_overdue", 90))).name
+
+
+# report type -> renderer(db, period, params) returning the PDF's file name under reports/<period>/.
+REPORT_RENDERERS: dict[str, Callable[[Session, str, dict[str, Any]], str]] = {
+    "monthly": _render_monthly,
+    "revenue_at_risk": _render_revenue_at_risk,
+}
+
+_store: LockStore | None = None
+_inline_pool: ThreadPoolExecutor | None = None
+_inline_pool_lock = threading.Lock()
+
+
+def get_lock_store() -> LockStore:
+    global _store
+    if _store is None:
+        import redis
+
+        _store = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _store
+
+
+def _abandon_job(job_id: str, lock_key: str, store: LockStore, error: Exception) -> None:
+    """Mark a job that failed before run_report_job could record it, and free its lock."""
+    job = get_report_job(job_id, store)
+    if job is not None and job["status"] in ("queued", "running"):
+        job.update(status="failed", error=str(error) or type(error).__name__, finished_at_utc=datetime.utcnow().isoformat())
+        _save_job(store, job)
+    if store.get(lock_key) == job_id:
+        store.delete(lock_key)
+
+
+def _render_inline(job_id: str, lock_key: str, store: LockStore) -> None:
+    try:
+        db = SessionLocal()
+        try:
+            run_report_job(db, job_id, lock_key, store)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.exception("Inline render of report job %s failed", job_id)
+        try:
+            _abandon_job(job_id, lock_key, store, e)
+        except Exception:
+            logger.exception("Could not record the failure of report job %s", job_id)
+
+
+def _enqueue(job_id: str, lock_key: str, store: LockStore) -> None:
+    global _inline_pool
+    if not settings.report_jobs_inline:
+        celery_app.send_task(RENDER_TASK, args=[job_id, lock_key], task_id=job_id)
+        return
+    with _inline_pool_lock:
+        if _inline_pool is None:
+            _inline_pool = ThreadPoolExecutor(
+                max_workers=settings.report_jobs_inline_workers, thread_name_prefix="report-render"
+            )
+    _inline_pool.submit(_render_inline, job_id, lock_key, store)
+
+
+def report_job_key(report_type: str, period: str, params: dict[str, Any]) -> str:
+    canonical = json.dumps([report_type, period, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def get_report_job(job_id: str, store: LockStore | None = None) -> dict[str, Any] | None:
+    raw = (store or get_lock_store()).get(JOB_PREFIX + job_id)
+    return json.loads(raw) if raw else None
+
+
+def _save_job(store: LockStore, job: dict[str, Any]) -> None:
+    store.set(JOB_PREFIX + job["job_id"], json.dumps(job), ex=settings.report_job_ttl_seconds)
+
+
+def submit_report_job(
+    report_type: str,
+    period: str | None = None,
+    params: dict[str, Any] | None = None,
+    store: LockStore | None = None,
+) -> tuple[dict[str, Any], bool]:
+    """
+    Enqueue a render unless an identical one is already queued or running.
+    Returns the job record and whether it was deduplicated onto an existing job.
+    """
+    if report_type not in REPORT_RENDERERS:
+        raise ValueError(f"Unknown report type: {report_type}")
+    store = store or get_lock_store()
+    period = period or date.today().strftime("%Y-%m")
+    params = params or {}
+    lock_key = LOCK_PREFIX + report_job_key(report_type, period, params)
+
+    # Two rounds: the holder may release the lock between our SET NX and GET.
+    for _ in range(2):
+        job_id = uuid.uuid4().hex
+        if store.set(lock_key, job_id, nx=True, ex=settings.report_job_lock_seconds):
+            job = {
+                "job_id": job_id,
+                "report_type": report_type,
+                "period": period,
+                "params": params,
+                "status": "queued",
+                "submitted_at_utc": datetime.utcnow().isoformat(),
+                "file": None,
+                "error": None,
+            }
+            _save_job(store, job)
+            try:
+                _enqueue(job_id, lock_key, store)
+            except Exception:
+                store.delete(lock_key, JOB_PREFIX + job_id)
+                raise
+            return job, False
+        holder = store.get(lock_key)
+        existing = get_report_job(holder, store) if holder else None
+        if existing is not None:
+            return existing, True
+    raise RuntimeError(f"Could not acquire the {report_type} report lock for {period}")
+
+
+def run_report_job(db: Session, job_id: str, lock_key: str, store: LockStore | None = None) -> dict[str, Any]:
+    """Render a submitted job and record the outcome; the lock is released either way."""
+    store = store or get_lock_store()
+    job = get_report_job(job_id, store)
+    if job is None:
+        raise LookupError(f"Report job {job_id} not found (expired?)")
+    job.update(status="running", started_at_utc=datetime.utcnow().isoformat())
+    _save_job(store, job)
+    try:
+        job["file"] = REPORT_RENDERERS[job["report_type"]](db, job["period"], job["params"])
+        job["status"] = "succeeded"
+    except Exception as e:
+        job.update(status="failed", error=str(e) or type(e).__name__)
+        raise
+    finally:
+        job["finished_at_utc"] = datetime.utcnow().isoformat()
+        _save_job(store, job)
+        # Only release our own lock: if it expired mid-render, a newer job may hold it now.
+        if store.get(lock_key) == job_id:
+            store.delete(lock_key)
+    return job
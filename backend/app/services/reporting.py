@@ -1,14 +1,23 @@
-from collections import defaultdict
+import time
 from datetime import date, datetime
+from itertools import groupby
+from operator import attrgetter
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, NamedTuple
 
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+from sqlalchemy import Select, case as sa_case, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.models import AuditEvent, Case, Ticket, Device
-from app.models.cases import CaseStatus, violation_group
+from app.db.functions import epoch_days
+from app.models import AuditEvent, Case, ChargeTypeGroup, Ticket, Device, User
+from app.models.cases import VIOLATION_GROUP_ORDER, CaseStatus, violation_group, violation_group_expr
+from app.services.audit_store import period_bounds
+from app.services.case_metrics import EPOCH
+from app.services.exports import EXPORT_BATCH_SIZE
+from app.services.report_cache import cached_artifact, record_artifact, report_fingerprint
 
 
 REPORT_ROOT = Path(__file__).resolve().parents[2] / "reports"
@@ -65,62 +74,133 @@ def generate_monthly_operations_pdf(
 def run_monthly_report(
     db: Session,
     period: str | None = None,
+    force: bool = False,
 ) -> str:
     """
     Generate the monthly operations report bundle (PDF + summary) for the given
     period. If period is None, uses current month (YYYY-MM). Returns the period.
+    The existing bundle is kept if cases, tickets and devices are unchanged since
+    it was rendered, unless force is set.
     """
     if period is None:
         period = date.today().strftime("%Y-%m")
+    reports_dir = ensure_report_dir(period)
+    fingerprint = report_fingerprint(db, "monthly_operations", [Case, Ticket, Device], period=period)
+    if not force and cached_artifact(reports_dir, f"monthly_operations_{period}.pdf", fingerprint):
+        return period
+    started = time.perf_counter()
     cases = db.query(Case).all()
     tickets = db.query(Ticket).all()
     devices = db.query(Device).all()
     pdf_path = generate_monthly_operations_pdf(period, cases, tickets, devices)
-    reports_dir = ensure_report_dir(period)
     (reports_dir / "summary.txt").write_text(
         f"Monthly report generated for {period}\nPDF: {pdf_path.name}\n",
         encoding="utf-8",
     )
+    record_artifact(reports_dir, pdf_path.name, fingerprint, (time.perf_counter() - started) * 1000.0)
     return period
 
 
+class RevenueAtRiskRow(NamedTuple):
+    group_name: str
+    case_id: int
+    case_number: str
+    defendant_name: str
+    charge_type: str
+    days_overdue: int
+    outstanding: float
+    subtotal: float
+
+
+def sync_charge_type_groups(db: Session) -> int:
+    """
+    Classify charge types not yet in charge_type_groups. Case flushes classify their own charge types;
+    this full scan catches rows written outside the ORM and runs with the daily rollup rebuild, never on reads.
+    """
+    unseen = db.execute(
+        select(Case.charge_type)
+        .distinct()
+        .outerjoin(ChargeTypeGroup, ChargeTypeGroup.charge_type == Case.charge_type)
+        .where(ChargeTypeGroup.charge_type.is_(None))
+    ).scalars().all()
+    if not unseen:
+        return 0
+    db.add_all(ChargeTypeGroup(charge_type=ct, violation_group=violation_group(ct)) for ct in unseen)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another writer classified the same charge types first.
+        db.rollback()
+    return len(unseen)
+
+
+def revenue_at_risk_query(today: date, min_days_overdue: int = 90) -> Select:
+    """
+    FTA/WARRANT cases with a positive balance that are at least min_days_overdue past due,
+    ordered by violation group. Due date is the hearing date, else filing date + 90 days.
+    """
+    due_day = func.coalesce(epoch_days(Case.hearing_date), epoch_days(Case.filing_date) + 90)
+    overdue = (today - EPOCH).days - due_day
+    days_overdue = sa_case((overdue < 0, 0), else_=overdue)
+    outstanding = Case.fine_amount - Case.amount_paid
+    # Outer join: a charge type not classified yet (written outside the ORM, e.g. a bulk import) is grouped
+    # by the same rules in SQL until the daily sync stores it.
+    group_name = func.coalesce(ChargeTypeGroup.violation_group, violation_group_expr(Case.charge_type))
+    group_rank = sa_case(
+        {name: rank for rank, name in enumerate(VIOLATION_GROUP_ORDER)},
+        value=group_name,
+        else_=len(VIOLATION_GROUP_ORDER),
+    )
+    stmt = (
+        select(
+            group_name.label("group_name"),
+            Case.id.label("case_id"),
+            Case.case_number,
+            Case.defendant_name,
+            Case.charge_type,
+            days_overdue.label("days_overdue"),
+            outstanding.label("outstanding"),
+            func.sum(outstanding).over(partition_by=group_name).label("subtotal"),
+        )
+        .outerjoin(ChargeTypeGroup, ChargeTypeGroup.charge_type == Case.charge_type)
+        .where(Case.status.in_([CaseStatus.FTA, CaseStatus.WARRANT]), outstanding > 0)
+        .order_by(group_rank, group_name, Case.id)
+    )
+    if min_days_overdue > 0:
+        stmt = stmt.where(overdue >= min_days_overdue)
+    return stmt
+
+
+def iter_revenue_at_risk_rows(
+    db: Session,
+    min_days_overdue: int = 90,
+    today: date | None = None,
+) -> Iterator[RevenueAtRiskRow]:
+    """Stream revenue-at-risk rows in group order; each row carries its group subtotal."""
+    stmt = revenue_at_risk_query(today or date.today(), min_days_overdue)
+    for row in db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)):
+        yield RevenueAtRiskRow(*row)
+
+
 def get_revenue_at_risk_cases(
     db: Session,
     min_days_overdue: int = 90,
-) -> list[tuple[str, list[tuple[Case, int, float]], float]]:
+    today: date | None = None,
+) -> list[tuple[str, list[tuple[RevenueAtRiskRow, int, float]], float]]:
     """
     Cases in FTA or WARRANT status with days_overdue >= min_days_overdue,
     grouped by violation group. Returns list of (group_name, [(case, days_overdue, outstanding_balance), ...], subtotal).
     """
-    cases = db.query(Case).filter(Case.status.in_([CaseStatus.FTA, CaseStatus.WARRANT])).all()
-    grouped: dict[str, list[tuple[Case, int, float]]] = defaultdict(list)
-    for c in cases:
-        days = c.days_overdue()
-        if days is None or days < min_days_overdue:
-            continue
-        bal = c.outstanding_balance()
-        if bal <= 0:
-            continue
-        group = violation_group(c.charge_type)
-        grouped[group].append((c, days, bal))
-    order = ["Traffic Violations (High Priority)", "City Ordinance (Code Enforcement)", "Other"]
-    result: list[tuple[str, list[tuple[Case, int, float]], float]] = []
-    for name in order:
-        if name not in grouped:
-            continue
-        rows = grouped[name]
-        subtotal = sum(r[2] for r in rows)
-        result.append((name, rows, subtotal))
-    for name, rows in grouped.items():
-        if name in order:
-            continue
-        result.append((name, rows, sum(r[2] for r in rows)))
+    result: list[tuple[str, list[tuple[RevenueAtRiskRow, int, float]], float]] = []
+    for group_name, rows in groupby(iter_revenue_at_risk_rows(db, min_days_overdue, today), key=attrgetter("group_name")):
+        rows = list(rows)
+        result.append((group_name, [(r, r.days_overdue, r.outstanding) for r in rows], rows[0].subtotal))
     return result
 
 
 def generate_revenue_at_risk_pdf(
     period: str,
-    grouped: list[tuple[str, list[tuple[Case, int, float]], float]],
+    grouped: list[tuple[str, list[tuple[RevenueAtRiskRow, int, float]], float]],
 ) -> Path:
     """Crystal Reports-style PDF: Municipal Court Quarterly Revenue at Risk (FTA)."""
     report_dir = ensure_report_dir(period)
@@ -174,34 +254,122 @@ def run_revenue_at_risk_report(
     db: Session,
     period: str | None = None,
     min_days_overdue: int = 90,
+    force: bool = False,
 ) -> Path:
-    """Generate Revenue at Risk (FTA) PDF for the given period. Returns path to PDF."""
+    """
+    Generate Revenue at Risk (FTA) PDF for the given period. Returns path to PDF.
+    Days overdue depend on today's date, so a cached PDF is reused only on the day it was rendered.
+    """
     if period is None:
         period = date.today().strftime("%Y-%m")
+    fingerprint = report_fingerprint(
+        db,
+        "revenue_at_risk",
+        [Case, ChargeTypeGroup],
+        period=period,
+        min_days_overdue=min_days_overdue,
+        today=date.today(),
+    )
+    cached = None if force else cached_artifact(ensure_report_dir(period), "revenue_at_risk_fta.pdf", fingerprint)
+    if cached is not None:
+        return cached
+    started = time.perf_counter()
     grouped = get_revenue_at_risk_cases(db, min_days_overdue=min_days_overdue)
-    return generate_revenue_at_risk_pdf(period, grouped)
+    pdf_path = generate_revenue_at_risk_pdf(period, grouped)
+    record_artifact(pdf_path.parent, pdf_path.name, fingerprint, (time.perf_counter() - started) * 1000.0)
+    return pdf_path
+
+
+def _audit_period_filter(period: str):
+    start, end = period_bounds(period)
+    return AuditEvent.created_at >= start, AuditEvent.created_at < end
+
+
+def audit_action_counts(db: Session, period: str) -> list[tuple[str, int]]:
+    rows = db.execute(
+        select(AuditEvent.action, func.count())
+        .where(*_audit_period_filter(period))
+        .group_by(AuditEvent.action)
+        .order_by(func.count().desc())
+    )
+    return [(action.value, count) for action, count in rows]
+
+
+def iter_audit_user_counts(db: Session, period: str) -> Iterator[tuple[str, int]]:
+    """(username or '-', events) per user, busiest first."""
+    count = func.count(AuditEvent.id)
+    stmt = (
+        select(AuditEvent.user_id, User.username, count)
+        .outerjoin(User, User.id == AuditEvent.user_id)
+        .where(*_audit_period_filter(period))
+        .group_by(AuditEvent.user_id, User.username)
+        .order_by(count.desc(), AuditEvent.user_id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for user_id, username, n in db.execute(stmt):
+        yield (username or (f"user #{user_id}" if user_id is not None else "-")), n
+
+
+def iter_audit_entity_counts(db: Session, period: str) -> Iterator[tuple[str, str, int]]:
+    """(entity_type, entity_id, events) per entity, busiest first."""
+    count = func.count(AuditEvent.id)
+    stmt = (
+        select(AuditEvent.entity_type, AuditEvent.entity_id, count)
+        .where(*_audit_period_filter(period))
+        .group_by(AuditEvent.entity_type, AuditEvent.entity_id)
+        .order_by(count.desc(), AuditEvent.entity_type, AuditEvent.entity_id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for entity_type, entity_id, n in db.execute(stmt):
+        yield entity_type or "-", entity_id or "-", n
 
 
-def generate_audit_report(db: Session, period: str | None = None) -> Path:
-    """Write a simple audit summary report under reports/YYYY-MM/audit_report.txt."""
+def generate_audit_report(db: Session, period: str | None = None, include_detail: bool = True) -> Path:
+    """
+    Write the audit report for every event in the period to reports/YYYY-MM/audit_report.txt.
+    Aggregates are computed in SQL; the optional detail appendix is streamed from the database in batches,
+    so memory stays flat however busy the month was.
+    """
     if period is None:
         period = date.today().strftime("%Y-%m")
     report_dir = ensure_report_dir(period)
     path = report_dir / "audit_report.txt"
-    events = (
-        db.query(AuditEvent)
-        .order_by(AuditEvent.created_at.desc())
-        .limit(500)
-        .all()
-    )
-    lines = [
-        f"Audit Report - {period}",
-        f"Generated (UTC): {datetime.utcnow().isoformat()}",
-        f"Total events (sample): {len(events)}",
-        "",
-    ]
-    for e in events[:100]:
-        lines.append(f"{e.created_at.isoformat()} | {e.action.value} | entity={e.entity_type or '-'} | {e.entity_id or '-'}")
-    path.write_text("\n".join(lines), encoding="utf-8")
+    tmp = path.with_name(path.name + ".tmp")
+    actions = audit_action_counts(db, period)
+
+    with tmp.open("w", encoding="utf-8") as fh:
+        fh.write(f"Audit Report - {period}\n")
+        fh.write(f"Generated (UTC): {datetime.utcnow().isoformat()}\n")
+        fh.write(f"Total events: {sum(n for _, n in actions)}\n")
+        fh.write("\nEvents by action\n")
+        for action, n in actions:
+            fh.write(f"  {action:<20} {n:>8}\n")
+        fh.write("\nEvents by user\n")
+        for user, n in iter_audit_user_counts(db, period):
+            fh.write(f"  {user:<20} {n:>8}\n")
+        fh.write("\nEvents by entity\n")
+        for entity_type, entity_id, n in iter_audit_entity_counts(db, period):
+            fh.write(f"  {entity_type:<20} {entity_id:<40} {n:>8}\n")
+        if include_detail:
+            fh.write("\nAppendix - all events\n")
+            detail = (
+                select(
+                    AuditEvent.created_at,
+                    AuditEvent.action,
+                    AuditEvent.user_id,
+                    AuditEvent.entity_type,
+                    AuditEvent.entity_id,
+                    AuditEvent.ip_address,
+                )
+                .where(*_audit_period_filter(period))
+                .order_by(AuditEvent.created_at, AuditEvent.id)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            for created_at, action, user_id, entity_type, entity_id, ip in db.execute(detail):
+                fh.write(
+                    f"{created_at.isoformat()} | {action.value} | user={user_id if user_id is not None else '-'}"
+                    f" | entity={entity_type or '-'} | {entity_id or '-'} | ip={ip or '-'}\n"
+                )
+    tmp.replace(path)
     return path
 
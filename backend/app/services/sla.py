@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from sqlalchemy import ColumnElement, and_, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Ticket, TicketPriority, TicketStatus
+
+
+OPEN_TICKET_STATUSES = (TicketStatus.OPEN, TicketStatus.IN_PROGRESS)
+ESCALATION_CHUNK_SIZE = 500
+
+
+def overdue_condition(now: datetime | None = None) -> ColumnElement[bool]:
+    """SQL equivalent of Ticket.is_overdue(), answerable from ix_tickets_status_due_at."""
+    now = now or datetime.utcnow()
+    return and_(Ticket.status.in_(OPEN_TICKET_STATUSES), Ticket.due_at < now)
+
+
+def overdue_ticket_ids(db: Session, now: datetime | None = None) -> list[int]:
+    """Ids of open tickets past their SLA due date, oldest due first."""
+    stmt = select(Ticket.id).where(overdue_condition(now)).order_by(Ticket.due_at, Ticket.id)
+    return list(db.scalars(stmt))
+
+
+def overdue_ticket_count(db: Session, now: datetime | None = None) -> int:
+    return db.scalar(select(func.count()).select_from(Ticket).where(overdue_condition(now))) or 0
+
+
+def bulk_escalate_overdue(
+    db: Session,
+    priority: TicketPriority = TicketPriority.HIGH,
+    now: datetime | None = None,
+) -> list[int]:
+    """
+    Set priority on every overdue ticket with set-based UPDATEs and return the ids.
+
+    PostgreSQL does it in a single UPDATE ... RETURNING id. Other databases select
+    the overdue ids once and update them in ESCALATION_CHUNK_SIZE batches.
+    """
+    now = now or datetime.utcnow()
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = (
+            update(Ticket)
+            .where(overdue_condition(now))
+            .values(priority=priority)
+            .returning(Ticket.id)
+            .execution_options(synchronize_session=False)
+        )
+        ticket_ids = list(db.scalars(stmt))
+    else:
+        ticket_ids = overdue_ticket_ids(db, now)
+        for start in range(0, len(ticket_ids), ESCALATION_CHUNK_SIZE):
+            chunk = ticket_ids[start:start + ESCALATION_CHUNK_SIZE]
+            db.execute(
+                update(Ticket)
+                .where(Ticket.id.in_(chunk))
+                .values(priority=priority)
+                .execution_options(synchronize_session=False)
+            )
+    db.commit()
+    return ticket_ids
@@ -0,0 +1,17 @@
+from celery import shared_task
+
+from app.db.session import SessionLocal
+from app.services.audit_store import archive_audit_events, ensure_audit_partitions
+
+
+@shared_task(name="app.tasks.audit_retention.maintain_audit_store")
+def maintain_audit_store() -> str:
+    """Create upcoming audit_events partitions and archive months past the retention window to JSONL.gz."""
+    db = SessionLocal()
+    try:
+        created = ensure_audit_partitions(db)
+        archived = archive_audit_events(db)
+        rows = sum(a["rows"] for a in archived)
+        return f"audit_store_maintained:partitions_created={len(created)},months_archived={len(archived)},rows={rows}"
+    finally:
+        db.close()
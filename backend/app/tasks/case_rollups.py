@@ -0,0 +1,21 @@
+from celery import shared_task
+
+from app.db.session import SessionLocal
+from app.services.case_metrics import refresh_case_monthly_rollup
+from app.services.reporting import sync_charge_type_groups
+
+
+@shared_task(name="app.tasks.case_rollups.refresh_case_rollups")
+def refresh_case_rollups(full: bool = False) -> str:
+    """
+    Re-aggregate case_monthly_rollup for filing months whose cases changed since the last refresh.
+    The full (daily) rebuild also classifies charge types of cases written outside the ORM.
+    """
+    db = SessionLocal()
+    try:
+        if full:
+            sync_charge_type_groups(db)
+        months = refresh_case_monthly_rollup(db, full=full)
+        return f"case_rollups_refreshed:{len(months)}"
+    finally:
+        db.close()
@@ -1,9 +1,17 @@
+from datetime import date, datetime, timedelta
+
 from celery import shared_task
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
-from app.models import Device, Ticket, TicketStatus, AuditEvent
-from app.services.audit_rules import detect_repeated_failed_logins
+from app.models import Device, AuditEvent
+from app.models.audit import AuditAction
+from app.services.audit_rules import find_failed_login_bursts
+from app.services.sla import overdue_ticket_count
+
+# Failed-login rows fetched per round trip while streaming them through the burst detector.
+FAILED_LOGIN_BATCH_SIZE = 1000
 
 
 @shared_task(name="app.tasks.daily_checks.run_daily_checks")
@@ -16,17 +24,9 @@ def run_daily_checks() -> str:
     """
     db: Session = SessionLocal()
     try:
-        overdue_tickets = [
-            t
-            for t in db.query(Ticket)
-            .filter(Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS]))
-            .all()
-            if t.is_overdue()
-        ]
+        overdue_count = overdue_ticket_count(db)
 
         # Devices with warranty expiring in 30 days or patches older than 90 days
-        from datetime import date, timedelta
-
         today = date.today()
         risky_devices = []
         for d in db.query(Device).all():
@@ -35,18 +35,21 @@ def run_daily_checks() -> str:
             elif d.last_patch_date and (today - d.last_patch_date) > timedelta(days=90):
                 risky_devices.append(d)
 
-        # Suspicious login activity
-        recent_events = (
-            db.query(AuditEvent)
-            .order_by(AuditEvent.created_at.desc())
-            .limit(200)
-            .all()
+        # Suspicious login activity: stream the last day's failed logins in time order through the detector
+        failed_logins = db.execute(
+            select(AuditEvent.action, AuditEvent.user_id, AuditEvent.ip_address, AuditEvent.created_at)
+            .where(
+                AuditEvent.action == AuditAction.LOGIN_FAILURE,
+                AuditEvent.created_at >= datetime.utcnow() - timedelta(days=1),
+            )
+            .order_by(AuditEvent.created_at)
+            .execution_options(yield_per=FAILED_LOGIN_BATCH_SIZE)
         )
-        suspicious_logins = detect_repeated_failed_logins(recent_events)
+        suspicious_logins = find_failed_login_bursts(failed_logins)
 
         # For demo purposes we simply return a summary string; in a real deployment
         # these would create escalation tickets and supervisor notifications.
-        return f"daily_checks_completed:overdue={len(overdue_tickets)},risky_devices={len(risky_devices)},suspicious_logins={int(suspicious_logins)}"
+        return f"daily_checks_completed:overdue={overdue_count},risky_devices={len(risky_devices)},suspicious_logins={len(suspicious_logins)}"
     finally:
         db.close()
 
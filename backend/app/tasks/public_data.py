@@ -0,0 +1,13 @@
+import asyncio
+
+from celery import shared_task
+
+from app.services.public_data_sources import refresh_all_sources
+
+
+@shared_task(name="app.tasks.public_data.refresh_public_data")
+def refresh_public_data(force: bool = False) -> str:
+    """Refresh every public data source whose refresh interval has elapsed, concurrently."""
+    stats = asyncio.run(refresh_all_sources(force=force))
+    summary = ",".join(f"{s.source_id}={s.status}" for s in stats)
+    return f"public_data_refreshed:{summary}"
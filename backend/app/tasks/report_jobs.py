@@ -0,0 +1,15 @@
+from celery import shared_task
+
+from app.db.session import SessionLocal
+from app.services.report_jobs import run_report_job
+
+
+@shared_task(name="app.tasks.report_jobs.render_report")
+def render_report(job_id: str, lock_key: str) -> str:
+    """Render a report PDF submitted through the reports API and record the result on its job."""
+    db = SessionLocal()
+    try:
+        job = run_report_job(db, job_id, lock_key)
+        return f"report_rendered:{job['report_type']}:{job['period']}:{job['file']}"
+    finally:
+        db.close()
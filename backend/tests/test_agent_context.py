@@ -0,0 +1,65 @@
+from app.agent.context import AgentContext, digest_tool_result, estimate_tokens
+
+
+def _tool_turn(ctx: AgentContext, n: int, tool: str, out: dict) -> None:
+    call_id = f"call_{n}"
+    ctx.add_assistant({
+        "role": "assistant",
+        "content": "",
+        "tool_calls": [{"id": call_id, "type": "function", "function": {"name": tool, "arguments": "{}"}}],
+    })
+    ctx.add_tool_result(call_id, tool, {}, out, [])
+
+
+def test_digest_keeps_status_counts_and_ids():
+    out = {"success": True, "result": {"open_count": 12, "access_issues": [{"id": 7, "title": "x" * 200}, {"id": 9, "title": "y"}]}}
+
+    assert digest_tool_result(out) == "ok open_count=12 access_issues=[2: 7, 9]"
+    assert digest_tool_result({"success": False, "error": "Ticket not found"}) == "error: Ticket not found"
+    assert digest_tool_result({"success": True, "dry_run": True, "message": "No changes made (dry run)."}) == "ok (dry run)"
+
+
+def test_answered_tool_outputs_are_compacted_and_pairs_stay_intact():
+    ctx = AgentContext("system", "goal", required_tools=["triage_tickets", "sla_sweep"], token_budget=100_000)
+    big = {"success": True, "result": {"devices": [{"asset_tag": f"PC-{i}", "reason": "patch_overdue"} for i in range(40)]}}
+    _tool_turn(ctx, 1, "inventory_compliance_check", big)
+    _tool_turn(ctx, 2, "triage_tickets", {"success": True, "result": {"open_count": 3, "access_issues": []}})
+
+    prompt = ctx.prompt()
+
+    tool_messages = [m for m in prompt if m["role"] == "tool"]
+    assert tool_messages[0]["content"].startswith("[inventory_compliance_check result, compacted] ok devices=[40: PC-0")
+    assert tool_messages[1]["content"] == str({"success": True, "result": {"open_count": 3, "access_issues": []}})
+    assert len(ctx.history) == 4
+
+
+def test_prompt_drops_oldest_turns_to_fit_budget_and_keeps_progress_note():
+    ctx = AgentContext("system", "goal", required_tools=["sla_sweep", "generate_audit_report"], token_budget=300, keep_turns=2)
+    for n in range(30):
+        _tool_turn(ctx, n, "sla_sweep", {"success": True, "result": {"overdue_count": n, "ticket_ids": list(range(50))}})
+
+    prompt = ctx.prompt()
+
+    assert estimate_tokens(prompt) <= 300
+    assert prompt[0]["content"] == "system" and prompt[1]["content"] == "goal"
+    assert "Required tools still to call (in order): generate_audit_report." in prompt[2]["content"]
+    first_turn = prompt[3]
+    assert first_turn["role"] == "assistant" and first_turn["tool_calls"]
+    assert prompt[-1]["role"] == "tool" and prompt[-1]["tool_call_id"] == "call_29"
+    # The full history is kept for the run result even though the prompt was trimmed.
+    assert len(ctx.history) == 60
+
+
+def test_failed_tools_are_not_reported_as_completed():
+    ctx = AgentContext("system", "goal", required_tools=["triage_tickets", "sla_sweep"], token_budget=100_000)
+    _tool_turn(ctx, 1, "triage_tickets", {"success": True, "result": {"open_count": 3}})
+    _tool_turn(ctx, 2, "sla_sweep", {"success": False, "error": "database is locked"})
+
+    note = ctx.progress_note()
+
+    assert "Completed tools: triage_tickets." in note
+    assert "Failed tools (returned an error; not completed): sla_sweep." in note
+    assert "Required tools still to call (in order): sla_sweep." in note
+
+    _tool_turn(ctx, 3, "sla_sweep", {"success": True, "result": {"overdue_count": 0}})
+    assert ctx.completed_tools == ["triage_tickets", "sla_sweep"] and ctx.failed_tools == []
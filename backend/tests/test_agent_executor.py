@@ -0,0 +1,89 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.agent import executor
+from app.agent.executor import ToolCall, execute_tool_calls, parse_tool_calls, plan_batches
+from app.db.session import Base
+from app.models import AuditEvent
+
+
+def _calls(*names: str) -> list[ToolCall]:
+    return [ToolCall(id=f"call_{i}", name=name) for i, name in enumerate(names)]
+
+
+def test_plan_batches_groups_consecutive_read_only_calls():
+    calls = _calls(
+        "get_case_metrics",
+        "sla_sweep",
+        "escalate_overdue_tickets",
+        "triage_tickets",
+        "inventory_compliance_check",
+        "create_change_request",
+        "generate_change_request_docs",
+    )
+
+    batches = plan_batches(calls)
+
+    assert [[c.name for c in b] for b in batches] == [
+        ["get_case_metrics", "sla_sweep"],
+        ["escalate_overdue_tickets"],
+        ["triage_tickets", "inventory_compliance_check"],
+        ["create_change_request"],
+        ["generate_change_request_docs"],
+    ]
+
+
+def test_parse_tool_calls_tolerates_bad_arguments():
+    raw = [
+        SimpleNamespace(id="a", function=SimpleNamespace(name="sla_sweep", arguments="")),
+        SimpleNamespace(id="b", function=SimpleNamespace(name="resolve_ticket", arguments='{"ticket_id": 3}')),
+        SimpleNamespace(id="c", function=SimpleNamespace(name="triage_tickets", arguments="{not json")),
+    ]
+
+    calls = parse_tool_calls(raw)
+
+    assert [(c.id, c.name, c.args) for c in calls] == [
+        ("a", "sla_sweep", {}),
+        ("b", "resolve_ticket", {"ticket_id": 3}),
+        ("c", "triage_tickets", {}),
+    ]
+
+
+@pytest.fixture()
+def file_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'agent.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = Session(bind=engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_read_only_calls_run_concurrently_in_request_order(file_db, monkeypatch):
+    barrier = threading.Barrier(3, timeout=5)
+    seen_threads: dict[str, str] = {}
+    real_run_tool = executor.run_tool
+
+    def run_tool(db, user_id, tool_name, arguments, dry_run=False):
+        if tool_name != "escalate_overdue_tickets":
+            # All three read-only calls must be in flight at once to pass the barrier.
+            barrier.wait()
+        seen_threads[tool_name] = threading.current_thread().name
+        return real_run_tool(db, user_id, tool_name, arguments, dry_run=dry_run)
+
+    monkeypatch.setattr(executor, "run_tool", run_tool)
+    calls = _calls("inventory_compliance_check", "get_case_metrics", "sla_sweep", "escalate_overdue_tickets")
+
+    results = execute_tool_calls(file_db, None, calls, dry_run=False, max_workers=4)
+
+    assert [c.id for c, _ in results] == ["call_0", "call_1", "call_2", "call_3"]
+    assert all(out["success"] for _, out in results)
+    assert seen_threads["escalate_overdue_tickets"] == threading.current_thread().name
+    assert seen_threads["sla_sweep"].startswith("agent-tool")
+    assert file_db.query(AuditEvent).count() == 4
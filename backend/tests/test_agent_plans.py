@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from app.agent import executor
+from app.agent.plans import (
+    DAILY_OPS_ROBUST_PLAN,
+    PRESET_PLANS,
+    PlanStep,
+    plan_levels,
+    run_plan,
+)
+from app.api.routes.agent import DAILY_OPS_REQUIRED_TOOLS, DAILY_OPS_ROBUST_REQUIRED_TOOLS
+
+
+@pytest.mark.parametrize(
+    "preset, required",
+    [("daily_ops_demo", DAILY_OPS_REQUIRED_TOOLS), ("daily_ops_robust", DAILY_OPS_ROBUST_REQUIRED_TOOLS)],
+)
+def test_preset_plans_cover_required_tools(preset, required):
+    tools = {s.tool for s in PRESET_PLANS[preset]}
+    assert set(required) <= tools
+    assert plan_levels(PRESET_PLANS[preset])
+
+
+def test_plan_levels_rejects_cycles_and_unknown_steps():
+    with pytest.raises(ValueError, match="cycle"):
+        plan_levels([PlanStep("a", "sla_sweep", depends_on=("b",)), PlanStep("b", "sla_sweep", depends_on=("a",))])
+    with pytest.raises(ValueError, match="unknown"):
+        plan_levels([PlanStep("a", "sla_sweep", depends_on=("missing",))])
+
+
+CANNED = {
+    "triage_tickets": {"open_count": 3, "access_issues": [{"id": 7, "title": "Locked out"}, {"id": 9, "title": "Reset"}]},
+    "inventory_compliance_check": {
+        "out_of_compliance_count": 2,
+        "devices": [{"asset_tag": "PC-1", "reason": "patch_overdue"}, {"asset_tag": "PC-2", "reason": "warranty_expiring"}],
+    },
+    "create_change_request": {"change_request_id": 42},
+    "generate_monthly_operations_report": {"period": "2024-05", "path": "reports/2024-05/monthly_operations_summary.pdf"},
+}
+
+
+def test_run_plan_fans_out_over_upstream_results(db, monkeypatch):
+    calls = []
+    patch_ids = iter(range(100, 200))
+
+    def fake_run_tool(db, user_id, tool_name, arguments, dry_run=False):
+        calls.append((tool_name, arguments))
+        if tool_name == "create_patch_record":
+            return {"success": True, "result": {"patch_id": next(patch_ids)}}
+        return {"success": True, "result": CANNED.get(tool_name, {})}
+
+    monkeypatch.setattr(executor, "run_tool", fake_run_tool)
+
+    actions, artifacts = run_plan(db, 1, DAILY_OPS_ROBUST_PLAN, dry_run=False, today=date(2024, 5, 15))
+
+    assert [a["tool"] for a in actions] == [c[0] for c in calls]
+    assert [args for tool, args in calls if tool == "resolve_ticket"] == [{"ticket_id": 7}, {"ticket_id": 9}]
+    assert [args["device_asset_tag"] for tool, args in calls if tool == "create_patch_record"] == ["PC-1", "PC-2"]
+    assert ("mark_patch_status", {"patch_id": 100, "status": "scheduled"}) in calls
+    assert ("generate_change_request_docs", {"change_request_id": 42}) in calls
+    assert ("generate_audit_report", {"period": "2024-05"}) in calls
+    order = [c[0] for c in calls]
+    assert order.index("triage_tickets") < order.index("resolve_ticket") < order.index("generate_monthly_operations_report")
+    assert order.index("generate_audit_report") < order.index("create_change_request")
+    assert artifacts == ["reports/2024-05/monthly_operations_summary.pdf"]
+
+
+def test_run_plan_skips_fan_out_when_upstream_failed(db, monkeypatch):
+    def fake_run_tool(db, user_id, tool_name, arguments, dry_run=False):
+        if tool_name == "create_change_request":
+            return {"success": False, "error": "boom"}
+        return {"success": True, "dry_run": True}
+
+    monkeypatch.setattr(executor, "run_tool", fake_run_tool)
+
+    actions, _ = run_plan(db, 1, PRESET_PLANS["daily_ops_demo"], dry_run=True)
+
+    tools = [a["tool"] for a in actions]
+    assert "resolve_ticket" not in tools
+    assert "generate_change_request_docs" not in tools
+    assert "generate_audit_report" in tools
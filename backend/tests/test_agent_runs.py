@@ -0,0 +1,88 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.agent import executor, plans
+from app.agent.plans import run_preset_plan_async
+from app.agent.runs import AgentRunRegistry, format_sse
+from app.db.session import Base
+
+
+async def _collect(run, after: int = -1) -> list[dict]:
+    return [event async for event in run.stream(after=after)]
+
+
+def test_run_events_stream_in_order_and_resume():
+    async def scenario():
+        registry = AgentRunRegistry()
+
+        async def job(run):
+            for i in range(3):
+                await asyncio.sleep(0)
+                run.emit("tool_call", {"n": i})
+            return {"summary": "done"}
+
+        run = registry.start(job, user_id=1, preset=None, execution="llm", dry_run=True)
+        live = asyncio.create_task(_collect(run))
+        events = await live
+        resumed = await _collect(run, after=2)
+        return run, events, resumed
+
+    run, events, resumed = asyncio.run(scenario())
+
+    assert [e["event"] for e in events] == ["run_started", "tool_call", "tool_call", "tool_call", "run_completed"]
+    assert [e["id"] for e in events] == [0, 1, 2, 3, 4]
+    assert [e["id"] for e in resumed] == [3, 4]
+    assert run.status == "succeeded" and run.result == {"summary": "done"}
+    assert format_sse(events[1]) == 'id: 1\nevent: tool_call\ndata: {"n": 0}\n\n'
+
+
+def test_failed_job_emits_run_failed():
+    async def scenario():
+        registry = AgentRunRegistry()
+
+        async def job(run):
+            raise RuntimeError("llm unreachable")
+
+        run = registry.start(job, user_id=1, preset=None, execution="llm", dry_run=True)
+        return run, await _collect(run)
+
+    run, events = asyncio.run(scenario())
+
+    assert events[-1] == {"id": 1, "event": "run_failed", "data": {"error": "llm unreachable"}}
+    assert run.status == "failed"
+
+
+def test_plan_run_streams_tool_events_from_worker_thread(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'runs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    def fake_run_tool(db, user_id, tool_name, arguments, dry_run=False):
+        return {"success": True, "dry_run": True}
+
+    async def fake_summary(preset, actions_taken, artifact_paths):
+        return f"{preset}: {len(actions_taken)} calls"
+
+    monkeypatch.setattr(executor, "run_tool", fake_run_tool)
+    monkeypatch.setattr(plans, "summarize_plan_run_async", fake_summary)
+
+    async def scenario():
+        registry = AgentRunRegistry()
+        run = registry.start(
+            lambda r: run_preset_plan_async(session_factory, 1, "daily_ops_demo", dry_run=True, emit=r.emit),
+            user_id=1,
+            preset="daily_ops_demo",
+            execution="plan",
+            dry_run=True,
+        )
+        return await _collect(run)
+
+    events = asyncio.run(scenario())
+    engine.dispose()
+
+    kinds = [e["event"] for e in events]
+    assert kinds[0] == "run_started" and kinds[-1] == "run_completed"
+    assert kinds.count("tool_call") == kinds.count("tool_result") > 0
+    assert events[-1]["data"]["summary"] == f"daily_ops_demo: {kinds.count('tool_result')} calls"
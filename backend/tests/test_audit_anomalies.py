@@ -1,19 +1,7 @@
 from datetime import datetime, timedelta
 
 from app.models.audit import AuditAction, AuditEvent
-
-
-def detect_repeated_failed_logins(events: list[AuditEvent], threshold: int = 5, window_minutes: int = 15) -> bool:
-    """Simple helper to flag suspicious bursts of failed logins."""
-    failures = [e for e in events if e.action == AuditAction.LOGIN_FAILURE]
-    failures.sort(key=lambda e: e.created_at)
-    for i in range(len(failures)):
-        window_start = failures[i].created_at
-        window_end = window_start + timedelta(minutes=window_minutes)
-        count = sum(1 for e in failures if window_start <= e.created_at <= window_end)
-        if count >= threshold:
-            return True
-    return False
+from app.services.audit_rules import FailedLoginBurst, detect_repeated_failed_logins, find_failed_login_bursts
 
 
 def test_detect_repeated_failed_logins_flags_burst():
@@ -33,3 +21,43 @@ def test_detect_repeated_failed_logins_ignores_sparse():
     ]
     assert detect_repeated_failed_logins(events) is False
 
+
+def _failure(minute: float, user_id: int | None = 1, ip: str | None = "10.0.0.1") -> AuditEvent:
+    return AuditEvent(
+        user_id=user_id,
+        action=AuditAction.LOGIN_FAILURE,
+        ip_address=ip,
+        created_at=datetime(2024, 1, 1, 8, 0, 0) + timedelta(minutes=minute),
+    )
+
+
+def test_bursts_are_grouped_by_user_and_ip():
+    # Interleaved failures: five per source overall, but only user 1 from 10.0.0.1 bursts on its own.
+    events = []
+    for i in range(5):
+        events.append(_failure(i, user_id=1, ip="10.0.0.1"))
+        events.append(_failure(i + 0.5, user_id=2, ip="10.0.0.2" if i % 2 else "10.0.0.3"))
+
+    bursts = find_failed_login_bursts(events)
+
+    assert bursts == [
+        FailedLoginBurst(user_id=1, ip_address="10.0.0.1", start=events[0].created_at, end=events[8].created_at, failures=5)
+    ]
+
+
+def test_burst_extends_while_failures_continue_and_reopens_later():
+    events = [_failure(m) for m in (0, 1, 2, 3, 4, 10, 16, 100, 101, 102, 103, 104)]
+    events.insert(3, AuditEvent(user_id=1, action=AuditAction.LOGIN_SUCCESS, created_at=events[3].created_at))
+
+    bursts = find_failed_login_bursts(events)
+
+    assert [(b.start.minute, b.end.minute, b.failures) for b in bursts] == [(0, 16, 7), (40, 44, 5)]
+
+
+def test_detector_handles_a_busy_day_of_failures():
+    events = [_failure(i * 0.01, user_id=i % 50, ip=f"10.0.{i % 50}.1") for i in range(20_000)]
+
+    bursts = find_failed_login_bursts(events)
+
+    assert len(bursts) == 50
+    assert sum(b.failures for b in bursts) == 20_000
@@ -0,0 +1,118 @@
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+
+from app.agent.executor import ToolCall, execute_tool_calls
+from app.agent.tools import run_tool
+from app.db.session import Base
+from app.models import AuditEvent
+from app.services import reporting
+from app.services.audit_log import buffered_audit, log_agent_tool
+
+
+def _count(db) -> int:
+    return db.scalar(select(func.count()).select_from(AuditEvent))
+
+
+def test_unbuffered_log_writes_immediately(db):
+    event_row = log_agent_tool(db, 1, "sla_sweep", {}, "ok")
+
+    assert event_row.id is not None
+    assert _count(db) == 1
+
+
+def test_buffered_rows_are_written_in_one_insert_when_the_run_ends(db):
+    engine = db.get_bind()
+    inserts: list[str] = []
+
+    def listener(conn, cursor, statement, *args):
+        if statement.startswith("INSERT"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with buffered_audit(engine, max_rows=100, max_age_seconds=60) as audit:
+            for i in range(5):
+                assert log_agent_tool(db, 1, "resolve_ticket", {"ticket_id": i}, "ok") is None
+            assert _count(db) == 0
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert audit.written == 5
+    assert len(inserts) == 1
+    assert _count(db) == 5
+    assert db.scalars(select(AuditEvent.entity_id)).all() == ["resolve_ticket"] * 5
+
+
+def test_buffer_flushes_on_size_threshold(db):
+    with buffered_audit(db.get_bind(), max_rows=2, max_age_seconds=60):
+        for i in range(3):
+            log_agent_tool(db, None, "sla_sweep", {"n": i}, "ok")
+        assert _count(db) == 2
+
+
+def test_buffer_is_flushed_when_the_run_fails(db):
+    with pytest.raises(RuntimeError):
+        with buffered_audit(db.get_bind(), max_rows=100, max_age_seconds=60):
+            log_agent_tool(db, None, "sla_sweep", {}, "ok")
+            raise RuntimeError("model went away")
+
+    assert _count(db) == 1
+
+
+def test_failed_audit_flush_does_not_fail_the_tool(db, tmp_path, caplog):
+    # The buffer's database has no audit_events table, so every flush fails.
+    broken = create_engine(f"sqlite:///{tmp_path / 'broken.db'}")
+
+    results = []
+    # Only the closing flush raises; the rows it could not write are still reported to the caller.
+    with pytest.raises(Exception, match="audit_events"):
+        with buffered_audit(broken, max_rows=1, max_age_seconds=60) as audit:
+            results.append(run_tool(db, None, "triage_tickets", {}))
+            pending = len(audit._rows)
+
+    assert results[0]["success"] and pending == 1
+    assert "Audit buffer flush failed" in caplog.text
+
+
+def test_parallel_tool_workers_log_into_the_run_buffer(tmp_path):
+    # File-backed so the worker sessions share the tables.
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(bind=engine)
+    calls = [ToolCall(id=str(i), name=name) for i, name in enumerate(["sla_sweep", "triage_tickets", "get_case_metrics"])]
+    with Session(engine) as db:
+        with buffered_audit(engine, max_rows=100, max_age_seconds=60) as audit:
+            execute_tool_calls(db, None, calls, dry_run=True, max_workers=3)
+            assert _count(db) == 0
+        assert audit.written == 3
+        assert _count(db) == 3
+    engine.dispose()
+
+
+def test_pending_rows_are_flushed_once_they_reach_max_age(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        with buffered_audit(engine, max_rows=100, max_age_seconds=0.05):
+            log_agent_tool(db, None, "sla_sweep", {}, "ok")
+            for _ in range(50):
+                if _count(db):
+                    break
+                time.sleep(0.02)
+            assert _count(db) == 1  # written by the timer, before the run ends
+    engine.dispose()
+
+
+def test_audit_report_inside_a_run_includes_the_runs_own_tool_calls(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, "REPORT_ROOT", tmp_path)
+    period = date.today().strftime("%Y-%m")
+    with buffered_audit(db.get_bind(), max_rows=100, max_age_seconds=60):
+        run_tool(db, None, "sla_sweep", {})
+        result = run_tool(db, None, "generate_audit_report", {"period": period})
+
+    assert result["success"]
+    report = (tmp_path / period / "audit_report.txt").read_text(encoding="utf-8")
+    assert "sla_sweep" in report
@@ -0,0 +1,136 @@
+import gzip
+import json
+from datetime import date, datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.db.partitioning import add_months, ensure_month_partitions, existing_month_partitions, month_partition_ddl
+from app.models import AuditEvent, User
+from app.models.audit import AuditAction
+from app.models.user import UserRole
+from app.services import reporting
+from app.services.audit_store import _write_archive, archive_audit_events, audit_events_in_period, period_bounds
+
+
+def _event(created_at: datetime, entity_id: str = "x") -> AuditEvent:
+    return AuditEvent(action=AuditAction.AGENT_TOOL, entity_type="agent_tool", entity_id=entity_id, created_at=created_at)
+
+
+def test_period_bounds_and_month_arithmetic():
+    assert period_bounds("2025-12") == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+    assert add_months(date(2026, 1, 1), -13) == date(2024, 12, 1)
+
+
+def test_postgres_ddl_is_range_partitioned_on_created_at():
+    ddl = str(CreateTable(AuditEvent.__table__).compile(dialect=postgresql.dialect()))
+
+    assert "PRIMARY KEY (id, created_at)" in ddl
+    assert "PARTITION BY RANGE (created_at)" in ddl
+    assert month_partition_ddl("audit_events", date(2026, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS audit_events_y2026m12 PARTITION OF audit_events "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+
+
+class _UnpartitionedPostgres:
+    """A PostgreSQL connection whose audit_events predates partitioning: catalog lookups find nothing."""
+
+    class dialect:
+        name = "postgresql"
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        if "pg_partitioned_table" not in str(statement):
+            raise AssertionError(f"unexpected statement: {statement}")
+        return self
+
+    def first(self):
+        return None
+
+
+def test_partition_upkeep_skips_a_table_that_is_not_partitioned_in_the_database():
+    conn = _UnpartitionedPostgres()
+
+    assert ensure_month_partitions(conn, AuditEvent.__table__, date(2026, 1, 1), 3) == []
+    assert existing_month_partitions(conn, AuditEvent.__table__) == {}
+    assert len(conn.statements) == 2
+
+
+def test_period_query_returns_only_that_month(db):
+    db.add_all([
+        _event(datetime(2026, 2, 28, 23, 59), "feb"),
+        _event(datetime(2026, 3, 1), "mar-1"),
+        _event(datetime(2026, 3, 31, 23, 59), "mar-2"),
+        _event(datetime(2026, 4, 1), "apr"),
+    ])
+    db.commit()
+
+    assert [e.entity_id for e in db.scalars(audit_events_in_period("2026-03"))] == ["mar-1", "mar-2"]
+
+
+def test_archive_moves_months_past_retention_to_jsonl_gz(db, tmp_path):
+    db.add_all([
+        _event(datetime(2025, 1, 5), "old-1"),
+        _event(datetime(2025, 1, 20), "old-2"),
+        _event(datetime(2025, 2, 3), "old-3"),
+        _event(datetime(2025, 3, 1), "kept"),
+    ])
+    db.commit()
+
+    archived = archive_audit_events(db, retention_months=3, archive_dir=tmp_path, today=date(2025, 5, 10))
+
+    assert [(a["period"], a["rows"]) for a in archived] == [("2025-01", 2), ("2025-02", 1)]
+    assert db.scalars(select(AuditEvent.entity_id)).all() == ["kept"]
+    with gzip.open(tmp_path / "audit_events_2025-01.jsonl.gz", "rt") as fh:
+        rows = [json.loads(line) for line in fh]
+    assert [r["entity_id"] for r in rows] == ["old-1", "old-2"]
+    assert rows[0]["action"] == "agent_tool"
+
+    # Late rows for an archived month are appended to the same archive.
+    db.add(_event(datetime(2025, 1, 25), "late"))
+    db.commit()
+    archive_audit_events(db, retention_months=3, archive_dir=tmp_path, today=date(2025, 5, 10))
+    with gzip.open(tmp_path / "audit_events_2025-01.jsonl.gz", "rt") as fh:
+        assert [json.loads(line)["entity_id"] for line in fh] == ["old-1", "old-2", "late"]
+
+
+def test_audit_report_covers_the_whole_period(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, "REPORT_ROOT", tmp_path)
+    db.add(User(username="clerk", full_name="Clerk", email="c@example.com", hashed_password="x", role=UserRole.CLERK))
+    db.add_all([_event(datetime(2026, 3, 1, 8, i), f"case-{i % 3}") for i in range(40)])
+    db.add_all([
+        AuditEvent(action=AuditAction.LOGIN_FAILURE, user_id=1, created_at=datetime(2026, 3, 2), ip_address="10.0.0.1"),
+        _event(datetime(2026, 4, 1), "next-month"),
+    ])
+    db.commit()
+
+    text = reporting.generate_audit_report(db, period="2026-03").read_text()
+
+    assert "Total events: 41" in text
+    assert "agent_tool" in text and "login_failure" in text
+    assert "clerk" in text
+    assert "case-0" in text and "next-month" not in text
+    appendix = text.split("Appendix - all events\n")[1].splitlines()
+    assert len(appendix) == 41
+    assert appendix[0].startswith("2026-03-01T08:00:00")
+
+    summary_only = reporting.generate_audit_report(db, period="2026-03", include_detail=False).read_text()
+    assert "Appendix" not in summary_only
+
+
+def test_rearchiving_a_month_whose_delete_failed_does_not_duplicate_rows(db, tmp_path):
+    db.add_all([_event(datetime(2025, 1, 5), "old-1"), _event(datetime(2025, 1, 20), "old-2")])
+    db.commit()
+
+    # The first run archived the month but did not get to delete it.
+    assert _write_archive(db, "2025-01", tmp_path)[1] == 2
+    archive_audit_events(db, retention_months=3, archive_dir=tmp_path, today=date(2025, 5, 10))
+
+    with gzip.open(tmp_path / "audit_events_2025-01.jsonl.gz", "rt") as fh:
+        assert [json.loads(line)["entity_id"] for line in fh] == ["old-1", "old-2"]
+    assert db.scalars(select(AuditEvent.entity_id)).all() == []
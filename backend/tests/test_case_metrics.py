@@ -0,0 +1,130 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.models import Case, CaseStatus
+from app.services.case_metrics import (
+    monthly_case_metrics,
+    read_case_monthly_metrics,
+    refresh_case_monthly_rollup,
+)
+
+
+def _case(n: int, filed: date, status: CaseStatus, disposed_on: date | None = None) -> Case:
+    return Case(
+        case_number=f"MC-{n:05d}",
+        defendant_name="Test",
+        charge_type="Speeding",
+        status=status,
+        court="Municipal Court",
+        filing_date=filed,
+        disposition_date=disposed_on,
+        fine_amount=100.0,
+        amount_paid=0.0,
+    )
+
+
+def test_monthly_case_metrics_matches_per_case_calculation(db):
+    cases = [
+        _case(1, date(2024, 1, 3), CaseStatus.DISPOSED, date(2024, 1, 20)),
+        _case(2, date(2024, 1, 28), CaseStatus.OPEN),
+        _case(3, date(2024, 1, 31), CaseStatus.PAID, date(2024, 3, 1)),
+        _case(4, date(2024, 2, 1), CaseStatus.DISMISSED),
+        _case(5, date(2024, 2, 14), CaseStatus.FTA),
+    ]
+    db.add_all(cases)
+    db.commit()
+
+    metrics = monthly_case_metrics(db)
+
+    assert [m["month"] for m in metrics] == ["2024-01", "2024-02"]
+    jan, feb = metrics
+    assert (jan["total_cases"], jan["disposed_cases"], jan["non_disposed_cases"]) == (3, 2, 1)
+    assert jan["avg_case_age_days"] == pytest.approx(sum(c.case_age_days() for c in cases[:3]) / 3)
+    assert jan["avg_time_to_disposition_days"] == (17 + 30) / 2
+    assert feb["disposed_pct"] == 50.0
+    assert feb["avg_time_to_disposition_days"] is None
+
+
+def test_monthly_case_metrics_empty(db):
+    assert monthly_case_metrics(db) == []
+
+
+def test_rollup_refresh_only_reprocesses_changed_months(db):
+    jan = _case(1, date(2024, 1, 3), CaseStatus.OPEN)
+    jan.updated_at = datetime(2024, 3, 1, 9, 0)
+    db.add_all([jan, _case(2, date(2024, 2, 3), CaseStatus.OPEN)])
+    db.commit()
+    assert refresh_case_monthly_rollup(db) == ["2024-01", "2024-02"]
+    # Only the month holding the high-water mark is looked at again.
+    assert refresh_case_monthly_rollup(db) == ["2024-02"]
+
+    feb_case = db.query(Case).filter(Case.case_number == "MC-00002").one()
+    feb_case.status = CaseStatus.DISPOSED
+    feb_case.disposition_date = date(2024, 2, 10)
+    db.commit()
+
+    assert refresh_case_monthly_rollup(db) == ["2024-02"]
+    assert read_case_monthly_metrics(db, refresh=False) == monthly_case_metrics(db)
+
+
+def test_case_metrics_tool_reads_without_refreshing_the_rollup(db):
+    from app.agent.tools import run_tool
+    from app.models import CaseMonthlyRollup
+
+    db.add(_case(1, date(2024, 1, 3), CaseStatus.OPEN))
+    db.commit()
+
+    result = run_tool(db, None, "get_case_metrics", {})
+
+    assert result["success"] and result["result"]["last_3_months"][0]["month"] == "2024-01"
+    assert db.query(CaseMonthlyRollup).count() == 0
+
+
+def test_read_only_metrics_include_changes_since_the_last_refresh(db):
+    from app.models import CaseMonthlyRollup
+    from app.services import data_versions
+
+    db.add(_case(1, date(2024, 1, 3), CaseStatus.OPEN))
+    db.commit()
+    before = data_versions.snapshot(["case_monthly_rollup"])
+    refresh_case_monthly_rollup(db)
+    assert data_versions.snapshot(["case_monthly_rollup"]) != before
+
+    db.add_all([_case(2, date(2024, 1, 9), CaseStatus.DISPOSED), _case(3, date(2024, 3, 3), CaseStatus.OPEN)])
+    db.commit()
+
+    assert read_case_monthly_metrics(db, refresh=False) == monthly_case_metrics(db)
+    assert [r.total_cases for r in db.query(CaseMonthlyRollup).order_by(CaseMonthlyRollup.month)] == [1]
+
+
+def test_rollup_picks_up_rows_committed_with_the_watermark_timestamp(db):
+    stamp = datetime(2024, 3, 1, 9, 0)
+    first = _case(1, date(2024, 1, 3), CaseStatus.OPEN)
+    first.updated_at = stamp
+    db.add(first)
+    db.commit()
+    refresh_case_monthly_rollup(db)
+
+    late = _case(2, date(2024, 2, 3), CaseStatus.OPEN)
+    late.updated_at = stamp
+    db.add(late)
+    db.commit()
+
+    assert "2024-02" in refresh_case_monthly_rollup(db)
+    assert read_case_monthly_metrics(db, refresh=False) == monthly_case_metrics(db)
+
+
+def test_full_refresh_moves_a_case_out_of_its_old_filing_month(db):
+    moved = _case(1, date(2024, 1, 3), CaseStatus.OPEN)
+    db.add_all([moved, _case(2, date(2024, 2, 3), CaseStatus.OPEN)])
+    db.commit()
+    refresh_case_monthly_rollup(db)
+
+    moved.filing_date = date(2024, 2, 20)
+    db.commit()
+    refresh_case_monthly_rollup(db)
+    refresh_case_monthly_rollup(db, full=True)
+
+    assert read_case_monthly_metrics(db, refresh=False) == monthly_case_metrics(db)
+    assert [m["month"] for m in monthly_case_metrics(db)] == ["2024-02"]
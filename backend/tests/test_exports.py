@@ -0,0 +1,82 @@
+import csv
+import json
+from datetime import date, datetime
+from io import StringIO
+
+import pytest
+
+from app.models import Case, CaseStatus, Ticket, TicketCategory, TicketPriority, TicketStatus
+from app.schemas.reports import QuerySpec
+from app.services.exports import ExportFormat, export_header, iter_csv, iter_export_batches, iter_query_export
+from app.services.query_builder import compile_query
+
+
+def test_csv_export_streams_every_row_in_batches(db):
+    db.add_all(
+        Case(
+            case_number=f"MC-{i:05d}",
+            defendant_name="Test",
+            charge_type="Parking",
+            status=CaseStatus.OPEN,
+            court="Municipal Court",
+            filing_date=date(2024, 1, 1),
+            fine_amount=50.0,
+            amount_paid=0.0,
+        )
+        for i in range(1203)
+    )
+    db.commit()
+
+    compiled = compile_query(QuerySpec(entity="cases"))
+    chunks = list(iter_csv(export_header(compiled.columns), iter_export_batches(db, compiled.stmt, batch_size=500)))
+
+    assert len(chunks) == 3
+    rows = list(csv.reader(StringIO("".join(chunks))))
+    assert rows[0] == ["case_number", "status", "court", "filing_date", "disposition_date", "fine_amount"]
+    assert len(rows) == 1204
+    assert rows[1][1:4] == ["open", "Municipal Court", "2024-01-01"]
+
+
+def test_csv_export_of_empty_table_has_header_only():
+    assert "".join(iter_csv(["a", "b"], [])) == "a,b\r\n"
+
+
+def _seed_tickets(db, n: int) -> None:
+    db.add_all(
+        Ticket(
+            title=f"T{i}",
+            description="Export",
+            category=TicketCategory.ACCESS,
+            priority=TicketPriority.MEDIUM if i % 2 else TicketPriority.HIGH,
+            status=TicketStatus.OPEN,
+            requester_id=1,
+            created_at=datetime(2024, 1, 1, 8, 0, 0),
+        )
+        for i in range(n)
+    )
+    db.commit()
+
+
+@pytest.mark.parametrize("fmt", [ExportFormat.PARQUET, ExportFormat.ARROW])
+def test_columnar_export_keeps_native_types(db, fmt):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    _seed_tickets(db, 2500)
+    data = b"".join(iter_query_export(db, QuerySpec(entity="tickets"), fmt))
+
+    if fmt == ExportFormat.PARQUET:
+        table = pq.read_table(pa.BufferReader(data))
+    else:
+        table = pa.ipc.open_stream(data).read_all()
+    assert table.num_rows == 2500
+    assert pa.types.is_dictionary(table.schema.field("priority").type)
+    assert pa.types.is_timestamp(table.schema.field("created_at").type)
+    assert table.column("priority").to_pylist()[:2] == ["high", "medium"]
+
+
+def test_jsonl_export_one_object_per_row(db):
+    _seed_tickets(db, 3)
+    lines = b"".join(iter_query_export(db, QuerySpec(entity="tickets"), ExportFormat.JSONL)).decode().splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[0])["created_at"] == "2024-01-01T08:00:00"
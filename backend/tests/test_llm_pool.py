@@ -0,0 +1,145 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError, InternalServerError
+
+from app.agent.llm_client import LLMPool, NoHealthyEndpointError
+
+
+def _fake_client(name: str, calls: list[str], fail: bool = False, error: str = "connection"):
+    def create(**kwargs):
+        calls.append(name)
+        if fail:
+            request = httpx.Request("POST", f"http://{name}/v1/chat/completions")
+            if error == "server":
+                raise InternalServerError("boom", response=httpx.Response(500, request=request), body=None)
+            raise APIConnectionError(request=request)
+        return SimpleNamespace(endpoint=name)
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _pool(
+    monkeypatch, names: list[str], failing: set[str] = frozenset(), error: str = "connection", **kwargs
+) -> tuple[LLMPool, list[str]]:
+    calls: list[str] = []
+    pool = LLMPool([f"http://{n}/v1" for n in names], **kwargs)
+    for endpoint, name in zip(pool.endpoints, names):
+        client = _fake_client(name, calls, fail=name in failing, error=error)
+        monkeypatch.setattr(endpoint, "client", lambda c=client: c)
+    monkeypatch.setattr(pool, "_probe", lambda endpoint: False)
+    return pool, calls
+
+
+def test_round_robin_spreads_requests(monkeypatch):
+    pool, calls = _pool(monkeypatch, ["a", "b", "c"], routing="round_robin")
+
+    for _ in range(6):
+        pool.create_chat_completion(model="m", messages=[])
+
+    assert sorted(calls) == ["a", "a", "b", "b", "c", "c"]
+    assert all(e["served"] == 2 and e["in_flight"] == 0 for e in pool.snapshot())
+
+
+def test_failover_marks_endpoint_unhealthy_and_skips_it(monkeypatch):
+    pool, calls = _pool(monkeypatch, ["down", "up"], failing={"down"}, routing="round_robin")
+
+    responses = [pool.create_chat_completion(model="m", messages=[]) for _ in range(3)]
+
+    assert [r.endpoint for r in responses] == ["up", "up", "up"]
+    assert calls.count("down") == 1
+    down = pool.snapshot()[0]
+    assert down["healthy"] is False and down["failures"] == 1
+
+
+def test_unhealthy_endpoint_is_revived_after_successful_probe(monkeypatch):
+    pool, calls = _pool(monkeypatch, ["down", "up"], failing={"down"}, cooldown_seconds=0)
+    pool.endpoints[1].in_flight = pool.endpoints[1].max_concurrency  # force traffic onto "down" first
+
+    pool.release(pool.acquire(), failed=True, eject=True)
+    assert pool.snapshot()[0]["healthy"] is False
+
+    monkeypatch.setattr(pool, "_probe", lambda endpoint: True)
+    endpoint = pool.acquire()
+    assert endpoint is pool.endpoints[0] and endpoint.healthy and endpoint.in_flight == 1
+
+
+def test_last_healthy_endpoint_keeps_serving_after_a_failure(monkeypatch):
+    pool, calls = _pool(monkeypatch, ["only"], failing={"only"})
+
+    with pytest.raises(APIConnectionError):
+        pool.create_chat_completion(model="m", messages=[])
+
+    # The request failed, but the next one is still routed instead of raising NoHealthyEndpointError.
+    endpoint = pool.acquire()
+    assert endpoint.healthy and pool.snapshot()[0]["failures"] == 1
+
+
+def test_server_error_fails_over_without_ejecting_the_endpoint(monkeypatch):
+    pool, calls = _pool(monkeypatch, ["flaky", "up"], failing={"flaky"}, error="server", routing="round_robin")
+
+    responses = [pool.create_chat_completion(model="m", messages=[]) for _ in range(2)]
+
+    assert [r.endpoint for r in responses] == ["up", "up"]
+    assert calls.count("flaky") == 2  # still in rotation after the first 500
+    assert all(e["healthy"] for e in pool.snapshot())
+
+
+def test_cancelled_waiter_hands_back_the_slot_it_acquires(monkeypatch):
+    pool, _ = _pool(monkeypatch, ["a"], max_concurrency=1)
+    held = pool.acquire()
+
+    async def scenario():
+        waiter = asyncio.ensure_future(pool.acreate_chat_completion(model="m", messages=[]))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        pool.release(held)  # the abandoned acquire() thread now gets the slot...
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if pool.snapshot()[0]["in_flight"] == 0:
+                break
+
+    asyncio.run(scenario())
+    assert pool.snapshot()[0]["in_flight"] == 0  # ...and gives it straight back
+
+
+def test_concurrency_limit_routes_to_least_loaded_and_waits(monkeypatch):
+    pool, _ = _pool(monkeypatch, ["a", "b"], max_concurrency=1, acquire_timeout_seconds=0.2)
+
+    first = pool.acquire()
+    second = pool.acquire()
+    assert {first.base_url, second.base_url} == {"http://a/v1", "http://b/v1"}
+    with pytest.raises(NoHealthyEndpointError, match="Timed out"):
+        pool.acquire()
+
+    pool.release(first)
+    assert pool.acquire() is first
+
+
+def test_async_requests_share_the_pool(monkeypatch):
+    pool = LLMPool(["http://a/v1", "http://b/v1"], max_concurrency=1)
+    calls: list[str] = []
+
+    def async_client_for(name):
+        async def create(**kwargs):
+            calls.append(name)
+            await asyncio.sleep(0.01)
+            return SimpleNamespace(endpoint=name)
+
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    for endpoint, name in zip(pool.endpoints, ["a", "b"]):
+        client = async_client_for(name)
+        monkeypatch.setattr(endpoint, "async_client", lambda c=client: c)
+
+    async def scenario():
+        return await asyncio.gather(*(pool.acreate_chat_completion(model="m", messages=[]) for _ in range(4)))
+
+    responses = asyncio.run(scenario())
+
+    assert len(responses) == 4
+    assert sorted(calls) == ["a", "a", "b", "b"]
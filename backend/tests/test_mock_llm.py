@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.agent.llm_client import reset_llm_pool
+from app.agent.mock_llm import FromResult, MockLLMServer, ScriptedCall
+from app.agent.orchestrator import run_agent
+from app.core.config import settings
+from app.db.session import Base
+from app.models.ticket import Ticket, TicketCategory, TicketPriority, TicketStatus
+
+SCRIPT = [
+    [ScriptedCall("triage_tickets"), ScriptedCall("sla_sweep")],
+    [ScriptedCall("resolve_ticket", {"ticket_id": FromResult("triage_tickets", r"'id': (\d+)", int)})],
+]
+
+
+@pytest.fixture()
+def mock_llm(monkeypatch):
+    server = MockLLMServer(script=SCRIPT).start()
+    monkeypatch.setattr(settings, "llm_endpoints", server.base_url)
+    reset_llm_pool()
+    yield server
+    server.shutdown()
+    server.server_close()
+    reset_llm_pool()
+
+
+def test_run_agent_replays_script_against_mock_server(mock_llm, tmp_path):
+    # File-backed so the parallel read-only batch can open its own connections.
+    engine = create_engine(f"sqlite:///{tmp_path / 'agent.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        for title in ("Locked out", "Password reset"):
+            db.add(Ticket(
+                title=title,
+                description="",
+                category=TicketCategory.ACCESS,
+                priority=TicketPriority.MEDIUM,
+                status=TicketStatus.OPEN,
+                requester_id=1,
+                created_at=datetime.utcnow(),
+            ))
+        db.commit()
+
+        result = run_agent(db, None, "Resolve access tickets", dry_run=False)
+
+    engine.dispose()
+    tools = [a["tool"] for a in result["actions_taken"]]
+    assert tools == ["triage_tickets", "sla_sweep", "resolve_ticket", "resolve_ticket"]
+    assert all(a["result"]["success"] for a in result["actions_taken"])
+    assert all(a["duration_ms"] >= 0 for a in result["actions_taken"])
+    assert result["summary"].startswith("Mock run complete")
+    assert mock_llm.stats["requests"] == 3
+    assert mock_llm.stats["prompt_tokens"] > 0
@@ -0,0 +1,32 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Device, DeviceStatus
+from app.services.pagination import decode_cursor, encode_cursor, estimated_row_count, keyset_page
+
+
+def test_keyset_page_walks_devices_by_asset_tag(db):
+    db.add_all(
+        Device(asset_tag=f"MC-{i:04d}", type="Laptop", location="Clerk", status=DeviceStatus.IN_SERVICE)
+        for i in range(25)
+    )
+    db.commit()
+
+    tags, cursor = [], None
+    while True:
+        items, cursor = keyset_page(db, select(Device), [Device.asset_tag, Device.id], 10, cursor)
+        tags.extend(d.asset_tag for d in items)
+        if cursor is None:
+            break
+
+    assert tags == [f"MC-{i:04d}" for i in range(25)]
+    assert estimated_row_count(db, Device) == 25
+
+
+def test_cursor_round_trips_typed_values():
+    cursor = encode_cursor([date(2024, 5, 1), 42])
+    assert decode_cursor(cursor, [Device.warranty_end, Device.id]) == [date(2024, 5, 1), 42]
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, [Device.id])
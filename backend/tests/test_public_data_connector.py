@@ -0,0 +1,258 @@
+import asyncio
+import gzip
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import public_data_sources
+from app.services.public_data_connector import download_file, read_metadata
+from app.services.public_data_sources import PublicDataSource, refresh_all_sources
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.body = b"citation,amount\n" + b"".join(b"C%05d,100\n" % i for i in range(2000))
+        self.etag = '"v1"'
+        self.truncate_next = 0  # responses to cut off halfway
+        self.delays: dict[str, float] = {}  # path -> seconds before responding
+        self.fail_next: list[int] = []  # error statuses to answer with before serving normally
+        self.content_encoding: str | None = None  # sent even though the client asks for identity
+        self.requests: list[dict[str, str]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/rows.csv"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: _StubServer
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        srv = self.server
+        srv.requests.append(dict(self.headers))
+        if self.path.startswith("/missing"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        time.sleep(srv.delays.get(self.path, 0))
+        if srv.fail_next:
+            self.send_response(srv.fail_next.pop(0))
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == srv.etag:
+            self.send_response(304)
+            self.send_header("ETag", srv.etag)
+            self.end_headers()
+            return
+        start = 0
+        if self.headers.get("Range") and self.headers.get("If-Range") == srv.etag:
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(srv.body) - 1}/{len(srv.body)}")
+        else:
+            self.send_response(200)
+        body = srv.body[start:]
+        self.send_header("ETag", srv.etag)
+        self.send_header("Content-Length", str(len(body)))
+        if srv.content_encoding:
+            self.send_header("Content-Encoding", srv.content_encoding)
+        self.end_headers()
+        if srv.truncate_next:
+            srv.truncate_next -= 1
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "public_data_retry_backoff_seconds", 0.0)
+
+
+@pytest.fixture()
+def stub():
+    server = _StubServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _paths(tmp_path):
+    return tmp_path / "rows.csv", tmp_path / "rows.meta"
+
+
+def test_unchanged_source_is_revalidated_without_transfer(stub, tmp_path):
+    data_path, meta_path = _paths(tmp_path)
+
+    first = download_file(stub.url, data_path, meta_path)
+    second = download_file(stub.url, data_path, meta_path)
+
+    assert first.status == "downloaded" and data_path.read_bytes() == stub.body
+    assert read_metadata(meta_path)["etag"] == '"v1"'
+    assert second.status == "not_modified" and second.bytes_transferred == 0
+    assert stub.requests[-1]["If-None-Match"] == '"v1"'
+
+
+def test_changed_source_is_downloaded_again(stub, tmp_path):
+    data_path, meta_path = _paths(tmp_path)
+    download_file(stub.url, data_path, meta_path)
+    stub.body, stub.etag = b"citation,amount\nNEW,1\n", '"v2"'
+
+    result = download_file(stub.url, data_path, meta_path)
+
+    assert result.status == "downloaded"
+    assert data_path.read_bytes() == b"citation,amount\nNEW,1\n"
+    assert read_metadata(meta_path)["etag"] == '"v2"'
+
+
+def test_interrupted_download_resumes_with_range_request(stub, tmp_path):
+    data_path, meta_path = _paths(tmp_path)
+    stub.truncate_next = 1
+
+    result = download_file(stub.url, data_path, meta_path, max_attempts=2)
+
+    assert result.status == "resumed" and result.attempts == 2
+    assert data_path.read_bytes() == stub.body
+    assert result.bytes_transferred == len(stub.body)
+    assert stub.requests[-1]["Range"].startswith("bytes=")
+    assert all(r["Accept-Encoding"] == "identity" for r in stub.requests)
+    assert not data_path.with_name("rows.csv.part").exists()
+
+
+def test_encoded_body_is_stored_and_resumed_byte_for_byte(stub, tmp_path):
+    data_path, meta_path = _paths(tmp_path)
+    stub.body, stub.content_encoding, stub.truncate_next = gzip.compress(stub.body), "gzip", 1
+
+    result = download_file(stub.url, data_path, meta_path, max_attempts=2)
+
+    # Offsets count the bytes on the wire, so the resumed file is the encoded body, not a decoded mix.
+    assert result.status == "resumed"
+    assert data_path.read_bytes() == stub.body
+
+
+def test_throttled_and_unavailable_responses_are_retried(stub, tmp_path):
+    data_path, meta_path = _paths(tmp_path)
+    stub.fail_next = [429, 503]
+
+    result = download_file(stub.url, data_path, meta_path, max_attempts=3)
+
+    assert result.status == "downloaded" and result.attempts == 3
+    assert data_path.read_bytes() == stub.body
+
+    stub.fail_next = [502]
+    with pytest.raises(httpx.HTTPStatusError):
+        download_file(stub.url, data_path, meta_path, max_attempts=1)
+
+
+def test_failed_refresh_keeps_the_previous_cache(stub, tmp_path):
+    data_path, meta_path = _paths(tmp_path)
+    download_file(stub.url, data_path, meta_path)
+    old = stub.body
+    stub.body, stub.etag, stub.truncate_next = old + b"MORE,2\n", '"v2"', 1
+
+    with pytest.raises(httpx.TransportError):
+        download_file(stub.url, data_path, meta_path, max_attempts=1)
+
+    assert data_path.read_bytes() == old
+    part = data_path.with_name("rows.csv.part")
+    assert 0 < part.stat().st_size < len(stub.body)
+
+    # The next refresh picks up where the failed one stopped.
+    result = download_file(stub.url, data_path, meta_path)
+    assert result.status == "resumed"
+    assert data_path.read_bytes() == stub.body
+
+
+def _source(stub, tmp_path, name: str, **kwargs) -> PublicDataSource:
+    return PublicDataSource(
+        source_id=name,
+        url=stub.url.replace("/rows.csv", f"/{name}.csv"),
+        filename=f"{name}.csv",
+        description=name,
+        license="test",
+        **kwargs,
+    )
+
+
+def test_refresh_all_fetches_sources_concurrently_and_reports_stats(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(public_data_sources, "CACHE_ROOT", tmp_path)
+    stub.delays = {"/slow_a.csv": 0.4, "/slow_b.csv": 0.4}
+    sources = {
+        "slow_a": _source(stub, tmp_path, "slow_a", parser=None),
+        "slow_b": _source(stub, tmp_path, "slow_b", parser=None, columns=("citation", "officer")),
+        "missing": _source(stub, tmp_path, "missing", parser=None, max_attempts=1),
+    }
+    monkeypatch.setattr(public_data_sources, "SOURCES", sources)
+
+    started = time.perf_counter()
+    stats = {s.source_id: s for s in asyncio.run(refresh_all_sources())}
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.8
+    assert stats["slow_a"].status == "downloaded" and stats["slow_a"].bytes_transferred == len(stub.body)
+    assert stats["slow_a"].duration_ms >= 400 and not stats["slow_a"].cache_hit
+    assert stats["slow_b"].missing_columns == ["officer"]
+    assert stats["missing"].status == "failed" and "404" in stats["missing"].error
+    assert (tmp_path / "slow_a.csv").read_bytes() == stub.body
+
+    again = {s.source_id: s for s in asyncio.run(refresh_all_sources(["slow_a"]))}
+    assert again["slow_a"].status == "skipped" and again["slow_a"].cache_hit
+    forced = asyncio.run(refresh_all_sources(["slow_a"], force=True))
+    assert forced[0].status == "not_modified" and forced[0].bytes_transferred == 0
+
+
+def test_source_becomes_due_after_its_refresh_interval(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(public_data_sources, "CACHE_ROOT", tmp_path)
+    source = _source(stub, tmp_path, "hourly", parser=None, refresh_interval=timedelta(hours=1))
+    assert source.is_due()
+
+    download_file(source.url, source.data_path, source.meta_path)
+
+    assert not source.is_due()
+    checked = read_metadata(source.meta_path)["checked_at_utc"]
+    assert source.is_due(datetime.fromisoformat(checked) + timedelta(hours=1))
+
+
+def test_concurrent_refresh_retries_a_throttled_source(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(public_data_sources, "CACHE_ROOT", tmp_path)
+    monkeypatch.setattr(public_data_sources, "SOURCES", {"busy": _source(stub, tmp_path, "busy", parser=None)})
+    stub.fail_next = [429]
+
+    [stats] = asyncio.run(refresh_all_sources())
+
+    assert stats.status == "downloaded" and stats.attempts == 2
+
+
+def test_parse_failure_only_fails_its_own_source(stub, tmp_path, monkeypatch):
+    def broken_parser(data_path, meta_path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(public_data_sources, "CACHE_ROOT", tmp_path)
+    sources = {
+        "bad": _source(stub, tmp_path, "bad", parser=broken_parser),
+        "good": _source(stub, tmp_path, "good", parser=None),
+    }
+    monkeypatch.setattr(public_data_sources, "SOURCES", sources)
+
+    stats = {s.source_id: s for s in asyncio.run(refresh_all_sources())}
+
+    assert stats["bad"].status == "failed" and "disk full" in stats["bad"].error
+    assert stats["good"].status == "downloaded"
+    assert (tmp_path / "bad.csv").read_bytes() == stub.body
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq  # noqa: E402
+
+from app.services.public_data_store import ingest_csv, normalize_column_names, top_values  # noqa: E402
+
+
+def _write_csv(path, rows: int, odd_zip_at: int | None = None) -> None:
+    lines = ["Citation Number,Issue Date,Amount,Violation,Zip"]
+    for i in range(rows):
+        zip_code = "0214X" if i == odd_zip_at else str(2143 + i % 3)
+        violation = "Speeding" if i % 3 else "Parking"
+        lines.append(f"C{i:05d},01/{i % 28 + 1:02d}/2024 10:15:00 AM,{25 + i % 4 * 10}.50,{violation},{zip_code}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_csv_is_ingested_in_blocks_to_typed_parquet_with_stats(tmp_path):
+    csv_path = tmp_path / "citations.csv"
+    _write_csv(csv_path, 3000)
+
+    result = ingest_csv(csv_path, block_size=16 * 1024)
+
+    table = pq.read_table(result.path)
+    assert result.status == "ingested" and result.rows == table.num_rows == 3000
+    assert table.schema.names == ["citation_number", "issue_date", "amount", "violation", "zip"]
+    assert pa.types.is_timestamp(table.schema.field("issue_date").type)
+    assert pa.types.is_floating(table.schema.field("amount").type)
+    assert pq.ParquetFile(result.path).num_row_groups > 1
+    columns = json.loads(result.path.with_suffix(".stats.json").read_text())["columns"]
+    assert columns["amount"]["min"] == 25.5 and columns["amount"]["max"] == 55.5
+    assert columns["citation_number"]["nulls"] == 0
+    assert top_values(result.path, "violation") == [("Speeding", 2000), ("Parking", 1000)]
+
+
+def test_column_that_stops_parsing_late_falls_back_to_text(tmp_path):
+    csv_path = tmp_path / "citations.csv"
+    _write_csv(csv_path, 3000, odd_zip_at=2900)
+
+    result = ingest_csv(csv_path, block_size=16 * 1024)
+
+    zips = pq.read_table(result.path, columns=["zip"]).column("zip")
+    assert pa.types.is_string(zips.type)
+    assert zips[2900].as_py() == "0214X"
+
+
+def test_text_fallback_matches_pyarrow_column_names_behind_a_bom(tmp_path):
+    csv_path = tmp_path / "citations.csv"
+    lines = ["Ticket,Amount"] + [f"{1000 + i},25.50" for i in range(3000)] + ["T9999,25.50"]
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8-sig")
+
+    result = ingest_csv(csv_path, block_size=16 * 1024)
+
+    tickets = pq.read_table(result.path, columns=["ticket"]).column("ticket")
+    assert pa.types.is_string(tickets.type)
+    assert tickets[3000].as_py() == "T9999"
+
+
+def test_reingest_only_when_source_changes(tmp_path):
+    csv_path = tmp_path / "citations.csv"
+    _write_csv(csv_path, 100)
+    first = ingest_csv(csv_path)
+
+    assert ingest_csv(csv_path).status == "unchanged"
+
+    _write_csv(csv_path, 150)
+    os.utime(csv_path, ns=(0, csv_path.stat().st_mtime_ns + 1))
+    second = ingest_csv(csv_path)
+    assert second.status == "ingested" and second.rows == 150
+    assert first.path == second.path
+
+
+def test_normalize_column_names():
+    assert normalize_column_names(["Issue Date", "Amount ($)", "amount", ""]) == ["issue_date", "amount", "amount_2", "column_3"]
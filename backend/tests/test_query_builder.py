@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import Case, CaseStatus
+from app.schemas.reports import QueryFilters, QuerySpec
+from app.services.query_builder import compile_query, run_query_page
+
+
+@pytest.fixture()
+def cases(db):
+    rows = [
+        Case(
+            case_number=f"MC-{i:05d}",
+            defendant_name="Test",
+            charge_type="Parking" if i % 2 else "Speeding",
+            status=CaseStatus.FTA if i % 3 == 0 else CaseStatus.OPEN,
+            court="Municipal Court" if i < 20 else "Traffic Court",
+            filing_date=date(2024, 1, 1) + timedelta(days=i // 2),
+            fine_amount=float(i),
+            amount_paid=0.0,
+        )
+        for i in range(30)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def test_keyset_pages_cover_all_rows_once_in_order(db, cases):
+    spec = QuerySpec(entity="cases", columns=["case_number", "filing_date"], sort="-filing_date", limit=7)
+    seen = []
+    while True:
+        page = run_query_page(db, spec)
+        seen.extend(page["rows"])
+        if not page["next_cursor"]:
+            break
+        spec = spec.model_copy(update={"cursor": page["next_cursor"]})
+
+    assert len(seen) == 30
+    assert len({r["case_number"] for r in seen}) == 30
+    dates = [r["filing_date"] for r in seen]
+    assert dates == sorted(dates, reverse=True)
+
+
+def test_filters_compile_into_the_query(db, cases):
+    spec = QuerySpec(
+        entity="cases",
+        columns=["case_number", "status"],
+        filters=QueryFilters(status=["fta"], court="Municipal Court", charge_type="Speeding", date_to=date(2024, 1, 6)),
+    )
+    page = run_query_page(db, spec)
+    expected = {
+        c.case_number
+        for c in cases
+        if c.status == CaseStatus.FTA and c.court == "Municipal Court" and c.charge_type == "Speeding"
+        and c.filing_date <= date(2024, 1, 6)
+    }
+    assert {r["case_number"] for r in page["rows"]} == expected
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        QuerySpec(entity="cases", columns=["nope"]),
+        QuerySpec(entity="cases", filters=QueryFilters(category="access")),
+        QuerySpec(entity="cases", filters=QueryFilters(status=["bogus"])),
+        QuerySpec(entity="cases", sort="disposition_date"),
+        QuerySpec(entity="cases", cursor="not-a-cursor"),
+    ],
+)
+def test_invalid_specs_raise_value_error(spec):
+    with pytest.raises(ValueError):
+        compile_query(spec, paginate=True)
@@ -0,0 +1,76 @@
+import json
+from datetime import date, timedelta
+
+from app.models import Case, CaseStatus
+from app.services import reporting
+from app.services.report_cache import MANIFEST_FILENAME
+from app.services.reporting import run_monthly_report, run_revenue_at_risk_report
+
+
+def _case(n: int, status: CaseStatus = CaseStatus.FTA) -> Case:
+    due = date.today() - timedelta(days=120)
+    return Case(
+        case_number=f"MC-{n:05d}",
+        defendant_name=f"Defendant {n}",
+        charge_type="Speeding",
+        status=status,
+        court="Municipal Court",
+        filing_date=due,
+        hearing_date=due,
+        fine_amount=250.0,
+        amount_paid=0.0,
+    )
+
+
+def _manifest(report_dir) -> dict:
+    return json.loads((report_dir / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+
+
+def test_unchanged_inputs_reuse_the_rendered_pdf(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, "REPORT_ROOT", tmp_path)
+    db.add_all([_case(1), _case(2)])
+    db.commit()
+
+    first = run_revenue_at_risk_report(db, period="2024-05")
+    entry = _manifest(first.parent)[first.name]
+    second = run_revenue_at_risk_report(db, period="2024-05")
+
+    assert second == first
+    assert _manifest(first.parent)[first.name] == entry
+    assert entry["bytes"] == first.stat().st_size and entry["render_ms"] >= 0
+
+    # Different parameters, a forced run and a changed row each render again.
+    run_revenue_at_risk_report(db, period="2024-05", min_days_overdue=30)
+    assert _manifest(first.parent)[first.name]["fingerprint"] != entry["fingerprint"]
+    entry = _manifest(first.parent)[first.name]
+    run_revenue_at_risk_report(db, period="2024-05", min_days_overdue=30, force=True)
+    assert _manifest(first.parent)[first.name]["rendered_at_utc"] != entry["rendered_at_utc"]
+    entry = _manifest(first.parent)[first.name]
+
+    db.get(Case, 1).amount_paid = 50.0
+    db.commit()
+    run_revenue_at_risk_report(db, period="2024-05", min_days_overdue=30)
+    assert _manifest(first.parent)[first.name]["fingerprint"] != entry["fingerprint"]
+
+
+def test_monthly_bundle_renders_again_after_a_row_is_deleted_or_the_file_changes(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, "REPORT_ROOT", tmp_path)
+    db.add_all([_case(1), _case(2, CaseStatus.OPEN)])
+    db.commit()
+    pdf = tmp_path / "2024-05" / "monthly_operations_2024-05.pdf"
+
+    run_monthly_report(db, period="2024-05")
+    entry = _manifest(pdf.parent)[pdf.name]
+    run_monthly_report(db, period="2024-05")
+    assert _manifest(pdf.parent)[pdf.name] == entry
+
+    db.delete(db.get(Case, 2))
+    db.commit()
+    run_monthly_report(db, period="2024-05")
+    assert _manifest(pdf.parent)[pdf.name]["fingerprint"] != entry["fingerprint"]
+    entry = _manifest(pdf.parent)[pdf.name]
+
+    pdf.write_bytes(b"truncated")
+    run_monthly_report(db, period="2024-05")
+    assert _manifest(pdf.parent)[pdf.name]["rendered_at_utc"] != entry["rendered_at_utc"]
+    assert pdf.stat().st_size == _manifest(pdf.parent)[pdf.name]["bytes"]
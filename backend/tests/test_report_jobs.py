@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.celery_app import celery_app
+from app.core.config import settings
+from app.services import report_jobs, reporting
+from app.services.report_jobs import REPORT_RENDERERS, get_report_job, run_report_job, submit_report_job
+
+
+class _DictStore:
+    """In-process stand-in for the Redis commands the job queue uses (SET NX/EX, GET, DEL)."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    def set(self, name, value, ex=None, nx=False):
+        if nx and name in self.data:
+            return None
+        self.data[name] = value
+        return True
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def delete(self, *names):
+        return sum(self.data.pop(n, None) is not None for n in names)
+
+
+@pytest.fixture()
+def queue(monkeypatch, tmp_path):
+    sent: list[list[str]] = []
+    monkeypatch.setattr(celery_app, "send_task", lambda name, args, task_id: sent.append(args))
+    monkeypatch.setattr(reporting, "REPORT_ROOT", tmp_path)
+    return _DictStore(), sent
+
+
+def test_identical_requests_share_one_job_until_it_finishes(db, queue):
+    store, sent = queue
+
+    first, first_dup = submit_report_job("revenue_at_risk", "2024-05", {"min_days_overdue": 90}, store=store)
+    second, second_dup = submit_report_job("revenue_at_risk", "2024-05", {"min_days_overdue": 90}, store=store)
+    other, other_dup = submit_report_job("revenue_at_risk", "2024-05", {"min_days_overdue": 30}, store=store)
+
+    assert not first_dup and second_dup and not other_dup
+    assert second["job_id"] == first["job_id"] != other["job_id"]
+    assert len(sent) == 2 and first["status"] == "queued"
+
+    job = run_report_job(db, *sent[0], store=store)
+
+    assert job["status"] == "succeeded" and job["file"] == "revenue_at_risk_fta.pdf"
+    assert get_report_job(first["job_id"], store)["status"] == "succeeded"
+    # The lock is gone, so the next request renders fresh data.
+    again, again_dup = submit_report_job("revenue_at_risk", "2024-05", {"min_days_overdue": 90}, store=store)
+    assert not again_dup and again["job_id"] != first["job_id"]
+
+
+def test_failed_render_is_recorded_and_releases_the_lock(db, queue, monkeypatch):
+    store, sent = queue
+
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setitem(REPORT_RENDERERS, "monthly", broken)
+    job, _ = submit_report_job("monthly", "2024-05", store=store)
+
+    with pytest.raises(OSError):
+        run_report_job(db, *sent[0], store=store)
+
+    recorded = get_report_job(job["job_id"], store)
+    assert recorded["status"] == "failed" and recorded["error"] == "disk full"
+    assert not submit_report_job("monthly", "2024-05", store=store)[1]
+
+
+def test_unknown_report_type_is_rejected(queue):
+    with pytest.raises(ValueError):
+        submit_report_job("quarterly", store=queue[0])
+
+
+def test_inline_mode_renders_in_the_api_process(db, queue, monkeypatch):
+    store, sent = queue
+    monkeypatch.setattr(settings, "report_jobs_inline", True)
+    monkeypatch.setattr(report_jobs, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    monkeypatch.setattr(report_jobs, "_inline_pool", None)
+
+    job, _ = submit_report_job("revenue_at_risk", "2024-05", store=store)
+    report_jobs._inline_pool.shutdown(wait=True)
+
+    assert sent == []
+    assert get_report_job(job["job_id"], store)["status"] == "succeeded"
+    assert (reporting.REPORT_ROOT / "2024-05" / "revenue_at_risk_fta.pdf").exists()
+
+
+def test_inline_render_that_fails_before_starting_marks_the_job_failed(queue, monkeypatch, caplog):
+    store, _ = queue
+    monkeypatch.setattr(settings, "report_jobs_inline", True)
+    monkeypatch.setattr(report_jobs, "_inline_pool", None)
+
+    def no_database():
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(report_jobs, "SessionLocal", no_database)
+
+    job, _ = submit_report_job("monthly", "2024-05", store=store)
+    report_jobs._inline_pool.shutdown(wait=True)
+
+    recorded = get_report_job(job["job_id"], store)
+    assert recorded["status"] == "failed" and recorded["error"] == "database unavailable"
+    assert "Inline render of report job" in caplog.text
+    assert not any(key.startswith(report_jobs.LOCK_PREFIX) for key in store.data)
@@ -0,0 +1,103 @@
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, event, insert, literal, select
+
+from app.models import Case, CaseStatus, ChargeTypeGroup
+from app.models.cases import violation_group, violation_group_expr
+from app.services.reporting import get_revenue_at_risk_cases, sync_charge_type_groups
+
+
+def _case(n: int, charge_type: str, status: CaseStatus, due_days_ago: int, fine: float, paid: float = 0.0, hearing: bool = True) -> Case:
+    today = date.today()
+    due = today - timedelta(days=due_days_ago)
+    return Case(
+        case_number=f"MC-{n:05d}",
+        defendant_name=f"Defendant {n}",
+        charge_type=charge_type,
+        status=status,
+        court="Municipal Court",
+        filing_date=due if hearing else due - timedelta(days=90),
+        hearing_date=due if hearing else None,
+        fine_amount=fine,
+        amount_paid=paid,
+    )
+
+
+def test_revenue_at_risk_matches_per_case_calculation(db):
+    cases = [
+        _case(1, "Speeding", CaseStatus.FTA, 120, 250.0),
+        _case(2, "Parking - Expired Meter", CaseStatus.WARRANT, 400, 75.0, paid=25.0, hearing=False),
+        _case(3, "City Ordinance - Weeds", CaseStatus.FTA, 95, 300.0),
+        _case(4, "Public Intoxication", CaseStatus.WARRANT, 200, 150.0),
+        _case(5, "Speeding", CaseStatus.FTA, 30, 250.0),
+        _case(6, "Speeding", CaseStatus.FTA, 150, 100.0, paid=100.0),
+        _case(7, "Speeding", CaseStatus.OPEN, 300, 500.0),
+        _case(8, "Insurance", CaseStatus.FTA, -10, 80.0),
+    ]
+    db.add_all(cases)
+    db.commit()
+
+    expected: dict[str, list[tuple[str, int, float]]] = {}
+    for c in cases:
+        days = c.days_overdue()
+        if days is None or days < 90 or c.outstanding_balance() <= 0:
+            continue
+        expected.setdefault(violation_group(c.charge_type), []).append((c.case_number, days, c.outstanding_balance()))
+
+    grouped = get_revenue_at_risk_cases(db, min_days_overdue=90)
+
+    assert [g[0] for g in grouped] == [
+        "Traffic Violations (High Priority)",
+        "City Ordinance (Code Enforcement)",
+        "Other",
+    ]
+    for group_name, rows, subtotal in grouped:
+        assert [(r.case_number, days, bal) for r, days, bal in rows] == expected[group_name]
+        assert subtotal == sum(bal for _, _, bal in expected[group_name])
+
+    all_rows = get_revenue_at_risk_cases(db, min_days_overdue=0)
+    assert sum(len(rows) for _, rows, _ in all_rows) == 6
+
+
+def test_charge_types_are_classified_when_cases_are_written(db):
+    db.add(_case(1, "Speeding", CaseStatus.FTA, 120, 250.0))
+    db.commit()
+    assert db.get(ChargeTypeGroup, "Speeding").violation_group == "Traffic Violations (High Priority)"
+
+    db.add(_case(2, "Speeding", CaseStatus.FTA, 120, 250.0))
+    db.get(Case, 1).charge_type = "City Ordinance - Weeds"
+    db.commit()
+    assert db.get(ChargeTypeGroup, "City Ordinance - Weeds").violation_group == "City Ordinance (Code Enforcement)"
+    assert sync_charge_type_groups(db) == 0
+
+
+def test_unclassified_cases_are_grouped_in_sql_until_the_sync_runs(db):
+    # A Core insert bypasses the flush hook, as a bulk load would.
+    case = _case(1, "Parking", CaseStatus.FTA, 120, 60.0)
+    db.execute(insert(Case).values({c.key: getattr(case, c.key) for c in Case.__table__.c if getattr(case, c.key) is not None}))
+    db.commit()
+
+    statements: list[str] = []
+    conn = db.connection()
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(conn, "before_cursor_execute", record)
+    try:
+        grouped = get_revenue_at_risk_cases(db)
+    finally:
+        event.remove(conn, "before_cursor_execute", record)
+    assert [g[0] for g in grouped] == ["Traffic Violations (High Priority)"]
+    assert set(statements) == {"SELECT"}
+
+    assert sync_charge_type_groups(db) == 1
+    assert [g[0] for g in get_revenue_at_risk_cases(db)] == ["Traffic Violations (High Priority)"]
+
+
+def test_sql_grouping_matches_violation_group():
+    charge_types = ["Speeding", "  PARKING - expired meter ", "City Ordinance - Weeds", "Vacant properties", "Theft", "", "100%_traffic"]
+    with create_engine("sqlite://").connect() as conn:
+        in_sql = [conn.scalar(select(violation_group_expr(literal(ct)))) for ct in charge_types]
+
+    assert in_sql == [violation_group(ct) for ct in charge_types]
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 
 from app.models.ticket import Ticket, TicketCategory, TicketPriority, TicketStatus
+from app.services.sla import bulk_escalate_overdue, overdue_ticket_count, overdue_ticket_ids
 
 
 def test_ticket_sla_due_date():
@@ -19,3 +20,57 @@ def test_ticket_sla_due_date():
     ticket.set_due_from_sla()
     assert ticket.due_at == created_at + timedelta(hours=ticket.compute_sla_hours())
 
+
+
+def test_overdue_ticket_queries_match_is_overdue(db):
+    now = datetime.utcnow()
+    specs = [
+        (TicketStatus.OPEN, now - timedelta(hours=1)),
+        (TicketStatus.IN_PROGRESS, now - timedelta(days=2)),
+        (TicketStatus.OPEN, now + timedelta(hours=1)),
+        (TicketStatus.RESOLVED, now - timedelta(days=1)),
+        (TicketStatus.OPEN, None),
+    ]
+    tickets = [
+        Ticket(
+            title=f"T{i}",
+            description="SLA",
+            category=TicketCategory.ACCESS,
+            priority=TicketPriority.LOW,
+            status=status,
+            requester_id=1,
+            due_at=due_at,
+        )
+        for i, (status, due_at) in enumerate(specs)
+    ]
+    db.add_all(tickets)
+    db.commit()
+
+    expected = sorted(t.id for t in tickets if t.is_overdue())
+    assert sorted(overdue_ticket_ids(db)) == expected
+    assert overdue_ticket_count(db) == len(expected) == 2
+
+
+def test_bulk_escalate_overdue_updates_only_overdue(db, monkeypatch):
+    monkeypatch.setattr("app.services.sla.ESCALATION_CHUNK_SIZE", 2)
+    now = datetime.utcnow()
+    tickets = [
+        Ticket(
+            title=f"T{i}",
+            description="SLA",
+            category=TicketCategory.HARDWARE,
+            priority=TicketPriority.LOW,
+            status=TicketStatus.OPEN,
+            requester_id=1,
+            due_at=now + timedelta(hours=offset),
+        )
+        for i, offset in enumerate([-5, -4, -3, 2])
+    ]
+    db.add_all(tickets)
+    db.commit()
+
+    escalated = bulk_escalate_overdue(db)
+
+    assert sorted(escalated) == sorted(t.id for t in tickets[:3])
+    db.expire_all()
+    assert [t.priority for t in tickets] == [TicketPriority.HIGH] * 3 + [TicketPriority.LOW]
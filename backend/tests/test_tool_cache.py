@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.agent.tools import ToolResultCache, run_tool, tool_result_cache
+from app.models import Device, DeviceStatus
+from app.models.ticket import Ticket, TicketCategory, TicketPriority, TicketStatus
+from app.services import data_versions
+
+
+def _ticket(title: str, category: TicketCategory = TicketCategory.ACCESS) -> Ticket:
+    return Ticket(
+        title=title,
+        description="",
+        category=category,
+        priority=TicketPriority.MEDIUM,
+        status=TicketStatus.OPEN,
+        requester_id=1,
+        created_at=datetime.utcnow(),
+    )
+
+
+def test_repeated_read_only_call_is_served_from_cache(db):
+    db.add_all([_ticket("Locked out"), _ticket("Printer jam", TicketCategory.HARDWARE)])
+    db.commit()
+
+    first = run_tool(db, None, "triage_tickets", {})
+    second = run_tool(db, None, "triage_tickets", {})
+
+    assert "cached" not in first
+    assert second["cached"] is True
+    assert second["result"] == first["result"]
+    assert tool_result_cache.hits == 1
+
+
+def test_mutating_tool_invalidates_cached_reads(db):
+    db.add(_ticket("Locked out"))
+    db.commit()
+    before = run_tool(db, None, "triage_tickets", {})
+    ticket_id = before["result"]["access_issues"][0]["id"]
+
+    assert run_tool(db, None, "resolve_ticket", {"ticket_id": ticket_id})["success"]
+    after = run_tool(db, None, "triage_tickets", {})
+
+    assert "cached" not in after
+    assert after["result"]["open_count"] == 0
+
+
+def test_committed_session_writes_invalidate_cached_reads(db):
+    db.add(Device(asset_tag="PC-1", type="desktop", location="Clerk office", status=DeviceStatus.IN_SERVICE))
+    db.commit()
+    run_tool(db, None, "inventory_compliance_check", {})
+    assert run_tool(db, None, "inventory_compliance_check", {}).get("cached")
+
+    db.execute(update(Device).where(Device.asset_tag == "PC-1").values(status=DeviceStatus.RETIRED))
+    assert run_tool(db, None, "inventory_compliance_check", {}).get("cached")  # not committed yet
+    db.commit()
+
+    assert "cached" not in run_tool(db, None, "inventory_compliance_check", {})
+
+
+def test_cache_ttl_and_lru_eviction(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.agent.tools.time.monotonic", lambda: clock[0])
+    cache = ToolResultCache(max_entries=2, ttl_seconds=30)
+    versions = data_versions.snapshot(["tickets"])
+    a, b, c = (cache.key("sla_sweep", {"n": n}) for n in range(3))
+
+    cache.put(a, versions, {"v": "a"})
+    cache.put(b, versions, {"v": "b"})
+    assert cache.get(a, versions) == {"v": "a"}
+    cache.put(c, versions, {"v": "c"})
+
+    assert cache.get(b, versions) is None
+    assert cache.get(a, versions) == {"v": "a"}
+    clock[0] += 31
+    assert cache.get(a, versions) is None
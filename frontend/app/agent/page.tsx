@@ -1,7 +1,7 @@
 "use client";
 
 import { useState } from "react";
-import { apiFetch } from "@/lib/api";
+import { apiFetch, apiStreamEvents } from "@/lib/api";
 
 interface AgentRunResponse {
   summary: string;
@@ -10,30 +10,55 @@ interface AgentRunResponse {
   dry_run: boolean;
 }
 
+interface AgentRunStarted {
+  run_id: string;
+  status: string;
+  events_url: string;
+}
+
+type AgentAction = AgentRunResponse["actions_taken"][number];
+
 export default function AgentConsolePage() {
   const [goal, setGoal] = useState("");
   const [mode, setMode] = useState<"demo" | "interactive">("demo");
   const [dryRun, setDryRun] = useState(true);
+  const [planMode, setPlanMode] = useState(false);
   const [running, setRunning] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [result, setResult] = useState<AgentRunResponse | null>(null);
+  const [progress, setProgress] = useState<AgentAction[]>([]);
+  const [pendingTool, setPendingTool] = useState<string | null>(null);
 
   async function handleRun(preset?: string) {
     setError(null);
     setResult(null);
+    setProgress([]);
+    setPendingTool(null);
     setRunning(true);
     try {
       const body = preset
-        ? { goal: "", mode: "demo", dry_run: dryRun, preset }
+        ? { goal: "", mode: "demo", dry_run: dryRun, preset, execution: planMode ? "plan" : "llm" }
         : { goal: goal || "Run daily operations demo.", mode, dry_run: dryRun };
-      const data = await apiFetch<AgentRunResponse>("/agent/run", {
+      const started = await apiFetch<AgentRunStarted>("/agent/runs", {
         method: "POST",
         body: JSON.stringify(body),
       });
-      setResult(data);
+      await apiStreamEvents(started.events_url, (ev) => {
+        if (ev.event === "tool_call") {
+          setPendingTool(ev.data.tool);
+        } else if (ev.event === "tool_result") {
+          setPendingTool(null);
+          setProgress((prev) => [...prev, { tool: ev.data.tool, args: {}, result: ev.data.result }]);
+        } else if (ev.event === "run_completed") {
+          setResult(ev.data as AgentRunResponse);
+        } else if (ev.event === "run_failed") {
+          setError(`Run failed: ${ev.data.error}`);
+        }
+      });
     } catch {
       setError("Run failed. Ensure you are logged in and the backend is running.");
     } finally {
+      setPendingTool(null);
       setRunning(false);
     }
   }
@@ -88,6 +113,15 @@ export default function AgentConsolePage() {
             />
             Dry run (no changes)
           </label>
+          <label className="flex cursor-pointer items-center gap-2 text-sm text-slate-700">
+            <input
+              type="checkbox"
+              checked={planMode}
+              onChange={(e) => setPlanMode(e.target.checked)}
+              className="rounded border-slate-300"
+            />
+            Plan mode for presets (fixed tool sequence, LLM writes the summary only)
+          </label>
         </div>
         <div className="mt-3 flex flex-wrap gap-2">
           <button
@@ -117,6 +151,23 @@ export default function AgentConsolePage() {
         </div>
       </section>
 
+      {running && (
+        <section className="rounded-md border bg-white p-4">
+          <h3 className="text-sm font-semibold text-slate-800">Progress</h3>
+          <p className="mt-1 text-xs text-slate-500">
+            {progress.length} tool call(s) finished
+            {pendingTool ? ` · running ${pendingTool}…` : ""}
+          </p>
+          <ul className="mt-2 space-y-1">
+            {progress.map((action, i) => (
+              <li key={i} className="font-mono text-xs text-slate-700">
+                {action.tool}
+              </li>
+            ))}
+          </ul>
+        </section>
+      )}
+
       {result && (
         <section className="rounded-md border bg-white p-4">
           <h3 className="text-sm font-semibold text-slate-800">Result</h3>
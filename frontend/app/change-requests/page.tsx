@@ -1,7 +1,7 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import { apiFetch } from "@/lib/api";
+import { apiFetch, apiFetchPage } from "@/lib/api";
 
 interface ChangeRequest {
   id: number;
@@ -18,17 +18,25 @@ interface ChangeRequest {
 
 export default function ChangeRequestsPage() {
   const [items, setItems] = useState<ChangeRequest[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [generatingId, setGeneratingId] = useState<number | null>(null);
 
-  useEffect(() => {
-    apiFetch<ChangeRequest[]>("/change-requests")
-      .then(setItems)
+  function loadPage(cursor: string | null) {
+    apiFetchPage<ChangeRequest>("/change-requests/", cursor, 50)
+      .then((page) => {
+        setItems((prev) => (cursor ? [...prev, ...page.items] : page.items));
+        setNextCursor(page.nextCursor);
+      })
       .catch(() =>
         setError(
           "Could not load change requests. Ensure backend is running and you are logged in."
         )
       );
+  }
+
+  useEffect(() => {
+    loadPage(null);
   }, []);
 
   async function handleGenerateDocs(id: number) {
@@ -99,6 +107,14 @@ export default function ChangeRequestsPage() {
             )}
           </ul>
         )}
+        {!error && nextCursor && (
+          <button
+            onClick={() => loadPage(nextCursor)}
+            className="mt-3 rounded border px-2 py-1 text-xs text-slate-700 hover:bg-slate-50"
+          >
+            Load more
+          </button>
+        )}
       </section>
     </div>
   );
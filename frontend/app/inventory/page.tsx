@@ -1,7 +1,7 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import { apiFetch } from "@/lib/api";
+import { apiFetchPage } from "@/lib/api";
 
 interface Device {
   id: number;
@@ -16,16 +16,26 @@ interface Device {
 
 export default function InventoryPage() {
   const [devices, setDevices] = useState<Device[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [total, setTotal] = useState<number | null>(null);
   const [error, setError] = useState<string | null>(null);
 
-  useEffect(() => {
-    apiFetch<Device[]>("/inventory")
-      .then(setDevices)
+  function loadPage(cursor: string | null) {
+    apiFetchPage<Device>("/inventory/", cursor)
+      .then((page) => {
+        setDevices((prev) => (cursor ? [...prev, ...page.items] : page.items));
+        setNextCursor(page.nextCursor);
+        setTotal(page.total);
+      })
       .catch(() =>
         setError(
           "Could not load inventory. Ensure backend is running and you are logged in."
         )
       );
+  }
+
+  useEffect(() => {
+    loadPage(null);
   }, []);
 
   return (
@@ -95,6 +105,22 @@ export default function InventoryPage() {
             </tbody>
           </table>
         )}
+        {!error && (
+          <div className="mt-3 flex items-center justify-between text-xs text-slate-500">
+            <span>
+              Showing {devices.length}
+              {total !== null ? ` of ~${total}` : ""} devices
+            </span>
+            {nextCursor && (
+              <button
+                onClick={() => loadPage(nextCursor)}
+                className="rounded border px-2 py-1 text-slate-700 hover:bg-slate-50"
+              >
+                Load more
+              </button>
+            )}
+          </div>
+        )}
       </section>
     </div>
   );
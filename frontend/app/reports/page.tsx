@@ -8,6 +8,42 @@ interface MonthlyReport {
   pdf_files: string[];
 }
 
+interface ReportJob {
+  job_id: string;
+  period: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  file: string | null;
+  error: string | null;
+  status_url: string;
+  message: string;
+}
+
+const REPORT_JOB_POLL_MS = 2000;
+const REPORT_JOB_MAX_POLLS = 90;
+
+// Polls for up to three minutes; a job still queued or running after that is returned as is.
+async function waitForReportJob(statusUrl: string): Promise<ReportJob> {
+  let job = await apiFetch<ReportJob>(statusUrl);
+  for (let i = 1; i < REPORT_JOB_MAX_POLLS; i++) {
+    if (job.status === "succeeded" || job.status === "failed") {
+      return job;
+    }
+    await new Promise((resolve) => setTimeout(resolve, REPORT_JOB_POLL_MS));
+    job = await apiFetch<ReportJob>(statusUrl);
+  }
+  return job;
+}
+
+function reportJobMessage(job: ReportJob): string {
+  if (job.status === "succeeded") {
+    return `Report generated for ${job.period}.`;
+  }
+  if (job.status === "failed") {
+    return `Report failed: ${job.error}`;
+  }
+  return `Report for ${job.period} is still ${job.status}. Make sure a report worker is running, then refresh the list later.`;
+}
+
 export default function ReportsPage() {
   const [reports, setReports] = useState<MonthlyReport[]>([]);
   const [error, setError] = useState<string | null>(null);
@@ -53,11 +89,13 @@ export default function ReportsPage() {
     setGenerateMessage(null);
     setGenerating(true);
     try {
-      const result = await apiFetch<{ period: string; message: string }>(
+      const queued = await apiFetch<ReportJob>(
         "/reports/monthly/generate",
         { method: "POST" }
       );
-      setGenerateMessage(result.message);
+      setGenerateMessage(queued.message);
+      const job = await waitForReportJob(queued.status_url);
+      setGenerateMessage(reportJobMessage(job));
       loadReports();
     } catch {
       setDownloadError("Generate failed. Make sure you are logged in.");
@@ -86,11 +124,13 @@ export default function ReportsPage() {
     setGenerateRARMessage(null);
     setGeneratingRAR(true);
     try {
-      const result = await apiFetch<{ period: string; message: string }>(
+      const queued = await apiFetch<ReportJob>(
         "/reports/revenue-at-risk/generate",
         { method: "POST" }
       );
-      setGenerateRARMessage(result.message);
+      setGenerateRARMessage(queued.message);
+      const job = await waitForReportJob(queued.status_url);
+      setGenerateRARMessage(reportJobMessage(job));
       loadReports();
     } catch {
       setDownloadError("Generate failed. Make sure you are logged in.");
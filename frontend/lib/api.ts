@@ -32,6 +32,95 @@ export async function apiFetch<T>(
   return res.json();
 }
 
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+  total: number | null;
+}
+
+export async function apiFetchPage<T>(
+  path: string,
+  cursor?: string | null,
+  limit = 100
+): Promise<Page<T>> {
+  const token =
+    typeof window !== "undefined"
+      ? window.localStorage.getItem("courtops_token")
+      : null;
+  const headers: HeadersInit = { "Content-Type": "application/json" };
+  if (token) {
+    (headers as Record<string, string>)["Authorization"] = `Bearer ${token}`;
+  }
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) {
+    params.set("cursor", cursor);
+  }
+  const sep = path.includes("?") ? "&" : "?";
+  const res = await fetch(`${getApiBaseUrl()}${path}${sep}${params}`, {
+    headers,
+  });
+  if (!res.ok) {
+    throw new Error(`API error ${res.status}`);
+  }
+  const total = res.headers.get("X-Total-Count");
+  return {
+    items: await res.json(),
+    nextCursor: res.headers.get("X-Next-Cursor"),
+    total: total !== null ? Number(total) : null,
+  };
+}
+
+export interface ServerEvent {
+  id: number;
+  event: string;
+  data: any;
+}
+
+/** Read a text/event-stream response with fetch (EventSource cannot send the Authorization header). */
+export async function apiStreamEvents(
+  path: string,
+  onEvent: (event: ServerEvent) => void
+): Promise<void> {
+  const token =
+    typeof window !== "undefined"
+      ? window.localStorage.getItem("courtops_token")
+      : null;
+  const headers: HeadersInit = { Accept: "text/event-stream" };
+  if (token) {
+    (headers as Record<string, string>)["Authorization"] = `Bearer ${token}`;
+  }
+  const res = await fetch(`${getApiBaseUrl()}${path}`, { headers });
+  if (!res.ok || !res.body) {
+    throw new Error(`API error ${res.status}`);
+  }
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep = buffer.indexOf("\n\n");
+    while (sep !== -1) {
+      const block = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const fields: Record<string, string> = {};
+      for (const line of block.split("\n")) {
+        const i = line.indexOf(": ");
+        if (i > 0) fields[line.slice(0, i)] = line.slice(i + 2);
+      }
+      if (fields.event) {
+        onEvent({
+          id: Number(fields.id),
+          event: fields.event,
+          data: fields.data ? JSON.parse(fields.data) : null,
+        });
+      }
+      sep = buffer.indexOf("\n\n");
+    }
+  }
+}
+
 export async function downloadWithAuth(
   path: string,
   filename: string